@@ -0,0 +1,153 @@
+# ============================
+# circuitBreaker.py — mağaza başına devre kesici (bot koruması / bloklanma)
+# - Blok sinyalleri: kısa HTML (bot sayfası), 403/429 yanıtları, boş availability JSON
+# - Art arda "threshold" sinyalden sonra mağaza AÇIK: cooldown boyunca URL'leri atlanır
+# - Cooldown her açılışta katlanır (growth), max_cooldown'da durur
+# - Cooldown bitince YARI AÇIK: turda mağazadan tek URL (probe) kontrol edilir;
+#   başarılıysa KAPALI (sayaçlar sıfırlanır), blok sinyali gelirse daha uzun cooldown ile tekrar AÇIK
+# - Ayarlar config["stores"][store]["circuit_breaker"] (default ile birleştirilir)
+# ============================
+
+import time
+import logging
+import threading
+
+log = logging.getLogger(__name__)
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+DEFAULTS = {
+    "threshold": 3,         # art arda bu kadar blok sinyali → açık
+    "cooldown": 120,        # sn; ilk açılış
+    "growth": 2.0,          # her yeni açılışta cooldown çarpanı
+    "max_cooldown": 3600,   # sn; cooldown üst sınırı
+}
+
+
+def store_key(store: str | None) -> str:
+    return "hm" if store == "h&m" else (store or "")
+
+
+class CircuitBreaker:
+    """
+    store → durum. admit() tur başında listeyi süzer; record_block()/record_success()
+    kontrol sonuçlarından çağrılır. Thread-safe (paralel worker'lar sinyal yazabilir).
+    """
+
+    def __init__(self, settings_for=None):
+        self.settings_for = settings_for
+        self._stores: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def _entry(self, store: str | None) -> dict:
+        key = store_key(store)
+        entry = self._stores.get(key)
+        if entry is None:
+            settings = dict(DEFAULTS, **((self.settings_for(store) if self.settings_for else None) or {}))
+            entry = self._stores[key] = {
+                "settings": settings,
+                "state": CLOSED,
+                "strikes": 0,      # art arda blok sinyali
+                "trips": 0,        # kapanmadan art arda açılma sayısı
+                "until": 0.0,      # açık durumun bitişi (monotonic)
+                "reason": None,
+            }
+        return entry
+
+    def _advance(self, entry: dict, now: float) -> str:
+        if entry["state"] == OPEN and now >= entry["until"]:
+            entry["state"] = HALF_OPEN
+        return entry["state"]
+
+    def state(self, store: str | None) -> str:
+        with self._lock:
+            return self._advance(self._entry(store), time.monotonic())
+
+    def is_open(self, store: str | None) -> bool:
+        """Cooldown sürüyor mu? (yarı açık mağazanın probe'u engellenmez)"""
+        return self.state(store) == OPEN
+
+    def suspect(self, store: str | None) -> bool:
+        """Son kontrollerde blok sinyali görüldü mü (ya da probe aşamasında mı)?"""
+        with self._lock:
+            entry = self._entry(store)
+            return entry["strikes"] > 0 or self._advance(entry, time.monotonic()) != CLOSED
+
+    def remaining(self, store: str | None) -> float:
+        with self._lock:
+            return max(0.0, self._entry(store)["until"] - time.monotonic())
+
+    def admit(self, items: list[dict]) -> tuple[list[dict], list[dict]]:
+        """
+        Tur listesini süzer → (kontrol edilecekler, atlananlar).
+        Açık mağazanın URL'leri atlanır; yarı açık mağazadan sadece ilk URL (probe) geçer.
+        """
+        admitted, skipped = [], []
+        probes = set()
+        now = time.monotonic()
+        with self._lock:
+            for item in items:
+                key = store_key(item.get("store"))
+                state = self._advance(self._entry(key), now)
+                if state == CLOSED or (state == HALF_OPEN and key not in probes):
+                    if state == HALF_OPEN:
+                        probes.add(key)
+                        log.info("[BREAKER] store=%s yarı açık → probe: %s", key, item.get("url"))
+                    admitted.append(item)
+                else:
+                    skipped.append(item)
+        if skipped:
+            log.info("[BREAKER] %s URL atlandı (açık mağazalar: %s)", len(skipped),
+                     ", ".join(sorted({store_key(it.get("store")) for it in skipped})))
+        return admitted, skipped
+
+    def record_block(self, store: str | None, reason: str) -> None:
+        """Blok sinyali; eşik aşıldıysa (ya da probe başarısızsa) mağaza açılır."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entry(store)
+            state = self._advance(entry, now)
+            entry["strikes"] += 1
+            entry["reason"] = reason
+            if state == OPEN:
+                return
+            if state == CLOSED and entry["strikes"] < entry["settings"]["threshold"]:
+                log.info("[BREAKER] store=%s blok sinyali (%s) %s/%s", store_key(store), reason,
+                         entry["strikes"], entry["settings"]["threshold"])
+                return
+            s = entry["settings"]
+            entry["trips"] += 1
+            cooldown = min(float(s["max_cooldown"]), float(s["cooldown"]) * float(s["growth"]) ** (entry["trips"] - 1))
+            entry["state"] = OPEN
+            entry["until"] = now + cooldown
+        log.warning("[BREAKER] store=%s AÇIK (%s, %s. kez) → %.0fs boyunca atlanacak",
+                    store_key(store), reason, entry["trips"], cooldown)
+
+    def record_success(self, store: str | None) -> None:
+        """Gerçek veri alındı: sayaçlar sıfırlanır, yarı açık mağaza kapanır."""
+        with self._lock:
+            entry = self._entry(store)
+            was = self._advance(entry, time.monotonic())
+            if was == OPEN:
+                # Cooldown'dan önce başlamış bir kontrolün geç sonucu; devreyi kapatmaz
+                return
+            entry.update(state=CLOSED, strikes=0, trips=0, until=0.0, reason=None)
+        if was == HALF_OPEN:
+            log.info("[BREAKER] store=%s probe başarılı → KAPALI", store_key(store))
+
+    def summary(self) -> dict[str, str]:
+        """Kapalı olmayan / sinyal görmüş mağazalar (döngü sonu logu)."""
+        now = time.monotonic()
+        with self._lock:
+            out = {}
+            for key, entry in sorted(self._stores.items()):
+                state = self._advance(entry, now)
+                if state == CLOSED and not entry["strikes"]:
+                    continue
+                text = f"{state} strikes={entry['strikes']} trips={entry['trips']}"
+                if state == OPEN:
+                    text += f" kalan={entry['until'] - now:.0f}s"
+                if entry["reason"]:
+                    text += f" ({entry['reason']})"
+                out[key or "-"] = text
+        return out
@@ -0,0 +1,874 @@
+# ============================
+# driverHelpers.py — Chrome driver havuzu
+# - Sıcak driver'lar döngüler arasında canlı tutulur
+# - Ucuz execute_script ping ile sağlık kontrolü
+# - N sayfa veya RSS eşiği aşılınca geri dönüşüm (recycle)
+# - Yeniden kurulum sadece hata/limit durumunda
+# - Watchdog: ölü oturum tespiti + önceden kurulmuş yedek (standby) driver
+# - Tek Chrome içinde çok sekmeli (pipeline) navigasyon yardımcıları
+# - Mağaza bazlı CDP kaynak engelleme (görsel/font/medya/analitik)
+# - Sayfanın JSON yanıtlarını CDP Network olaylarından yakalama (sekme bazlı, mağaza pattern'leriyle)
+# - Sayfa yükleme stratejisi (none/eager/normal) hazır-olma predicate'leri
+# - Opsiyonel kalıcı Chrome profili (cookie/consent + disk cache) ve boyut temizliği
+# ============================
+
+import os
+import re
+import json
+import time
+import base64
+import shutil
+import logging
+import itertools
+import threading
+import urllib.request
+
+log = logging.getLogger(__name__)
+
+
+# -----------------------------
+# SAĞLIK / BELLEK
+# -----------------------------
+def _ping(driver) -> bool:
+    try:
+        return driver.execute_script("return 1") == 1
+    except Exception:
+        return False
+
+
+def ping_driver(driver, timeout: float | None = None) -> bool:
+    """
+    Driver oturumu canlı mı? (tek execute_script roundtrip)
+    timeout verilirse ping ayrı thread'de çalışır; chromedriver asılı kalırsa False döner.
+    """
+    if not timeout:
+        return _ping(driver)
+    result = [False]
+    t = threading.Thread(target=lambda: result.__setitem__(0, _ping(driver)), name="driver-ping", daemon=True)
+    t.start()
+    t.join(timeout)
+    return result[0] if not t.is_alive() else False
+
+
+# Oturumun geri gelmeyeceğini gösteren hata sınıfları / mesajları.
+# selenium import etmeden isimden kontrol edilir (urllib3 bağlantı hataları dahil).
+_DEAD_SESSION_ERRORS = ("InvalidSessionIdException", "NoSuchWindowException", "MaxRetryError",
+                        "NewConnectionError", "ProtocolError", "ReadTimeoutError",
+                        "ConnectionRefusedError", "ConnectionResetError", "RemoteDisconnected")
+_DEAD_SESSION_MESSAGES = ("invalid session id", "session deleted", "chrome not reachable",
+                          "disconnected: not connected to devtools", "target window already closed",
+                          "tab crashed", "session not created")
+
+
+def is_dead_session_error(exc: BaseException) -> bool:
+    """Hata driver oturumunun öldüğünü mü gösteriyor? (yeniden denemek için driver değişmeli)"""
+    names = {cls.__name__ for cls in type(exc).__mro__}
+    if names.intersection(_DEAD_SESSION_ERRORS):
+        return True
+    msg = str(exc).lower()
+    return any(m in msg for m in _DEAD_SESSION_MESSAGES)
+
+
+def _proc_children() -> dict[int, list[int]]:
+    """/proc üzerinden ppid -> [pid] haritası (Linux)."""
+    children: dict[int, list[int]] = {}
+    for name in os.listdir("/proc"):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{name}/stat", "r") as f:
+                stat = f.read()
+            # comm parantez içinde boşluk içerebilir; ppid son ')' sonrası 2. alan
+            ppid = int(stat.rsplit(")", 1)[1].split()[1])
+            children.setdefault(ppid, []).append(int(name))
+        except Exception:
+            continue
+    return children
+
+
+def _rss_kb(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except Exception:
+        pass
+    return 0
+
+
+def driver_rss_mb(driver) -> float | None:
+    """chromedriver + tüm Chrome alt süreçlerinin toplam RSS'i (MB). Ölçülemezse None."""
+    try:
+        root = driver.service.process.pid
+    except Exception:
+        return None
+    if not os.path.isdir("/proc"):
+        return None
+    children = _proc_children()
+    total_kb, stack, seen = 0, [root], set()
+    while stack:
+        pid = stack.pop()
+        if pid in seen:
+            continue
+        seen.add(pid)
+        total_kb += _rss_kb(pid)
+        stack.extend(children.get(pid, []))
+    return total_kb / 1024.0
+
+
+# -----------------------------
+# DRIVER HAVUZU
+# -----------------------------
+class DriverPool:
+    """
+    Döngüler arasında sıcak Chrome driver'ları tutan havuz.
+
+    factory    : yeni driver üreten fonksiyon (örn. main.build_driver)
+    size       : havuzda bekletilecek en fazla boşta driver sayısı
+    max_pages  : bu kadar sayfa yüklendikten sonra driver yeniden kurulur (0 = limitsiz)
+    max_rss_mb : driver + Chrome süreçleri bu RSS'i aşarsa yeniden kurulur (0 = limitsiz)
+    on_discard : driver kapatıldıktan sonra çağrılır (örn. profil slotunu serbest bırakmak)
+    standby    : True ise arka planda bir yedek driver hazır tutulur; ölü driver replace()
+                 ile anında bununla değiştirilir (Chrome açılış süresi beklenmez)
+    """
+
+    def __init__(self, factory, size: int = 1, max_pages: int = 0, max_rss_mb: int = 0,
+                 on_discard=None, standby: bool = False):
+        self._factory = factory
+        self._on_discard = on_discard
+        self.standby = bool(standby)
+        self._standby = None
+        self._standby_thread = None
+        self._closed = False
+        self.size = max(1, int(size))
+        self.max_pages = int(max_pages or 0)
+        self.max_rss_mb = int(max_rss_mb or 0)
+        self._idle = []
+        self._in_use = 0
+        self._last_used = time.monotonic()
+        self._pages: dict[int, int] = {}
+        self._born: dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    # --- yaşam döngüsü ---
+    def _build(self):
+        t0 = time.monotonic()
+        driver = self._factory()
+        with self._lock:
+            self._pages[id(driver)] = 0
+            self._born[id(driver)] = time.monotonic()
+        log.info("[POOL] yeni driver kuruldu (%.1fs)", time.monotonic() - t0)
+        return driver
+
+    def _discard(self, driver, reason: str) -> None:
+        with self._lock:
+            pages = self._pages.pop(id(driver), 0)
+            born = self._born.pop(id(driver), None)
+        age = (time.monotonic() - born) if born else 0
+        log.info("[POOL] driver kapatılıyor: %s (sayfa=%s, yaş=%ds)", reason, pages, age)
+        stop_capture(driver)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        if self._on_discard is not None:
+            try:
+                self._on_discard(driver)
+            except Exception as e:
+                log.warning("[POOL] on_discard hatası: %s", e)
+
+    def acquire(self):
+        """Boşta sağlıklı bir driver döndür; yoksa yedeği ya da yenisini kur."""
+        with self._lock:
+            self._in_use += 1
+            self._last_used = time.monotonic()
+        try:
+            return self._acquire()
+        except BaseException:
+            self._mark_returned()
+            raise
+
+    def _mark_returned(self) -> None:
+        with self._lock:
+            self._in_use = max(0, self._in_use - 1)
+            self._last_used = time.monotonic()
+
+    def _acquire(self):
+        while True:
+            with self._lock:
+                driver = self._idle.pop() if self._idle else None
+            if driver is None:
+                break
+            if ping_driver(driver, timeout=10):
+                return driver
+            self._discard(driver, "ping başarısız")
+        driver = self._take_standby() or self._build()
+        self._spawn_standby()
+        return driver
+
+    # --- yedek (standby) driver ---
+    def _spawn_standby(self) -> None:
+        if not self.standby:
+            return
+        with self._lock:
+            if self._closed or self._standby is not None:
+                return
+            if self._standby_thread is not None and self._standby_thread.is_alive():
+                return
+            self._standby_thread = threading.Thread(target=self._build_standby, name="driver-standby", daemon=True)
+            thread = self._standby_thread
+        thread.start()
+
+    def _build_standby(self) -> None:
+        try:
+            driver = self._build()
+        except Exception as e:
+            log.warning("[POOL] yedek driver kurulamadı: %s", e)
+            return
+        with self._lock:
+            if not self._closed and self._standby is None:
+                self._standby, driver = driver, None
+        if driver is not None:
+            self._discard(driver, "yedek gereksiz")
+        else:
+            log.info("[POOL] yedek driver hazır")
+
+    def _take_standby(self):
+        with self._lock:
+            driver, self._standby = self._standby, None
+        if driver is None:
+            return None
+        if ping_driver(driver, timeout=5):
+            log.info("[POOL] yedek driver devreye alındı")
+            return driver
+        self._discard(driver, "yedek ping başarısız")
+        return None
+
+    def replace(self, driver, reason: str):
+        """Ölü/limit aşmış driver'ı kapat, yerine yedeği (yoksa yeni kurulanı) döndür."""
+        if driver is not None:
+            self._discard(driver, reason)
+        try:
+            fresh = self._take_standby() or self._build()
+        except Exception:
+            # Çağıranın elinde driver kalmadı; kullanımda sayacı düşülür
+            self._mark_returned()
+            raise
+        self._spawn_standby()
+        return fresh
+
+    def note_page(self, driver, count: int = 1) -> None:
+        """Driver'da yüklenen sayfa sayısını artır (recycle limiti için)."""
+        with self._lock:
+            self._pages[id(driver)] = self._pages.get(id(driver), 0) + count
+
+    def pages(self, driver) -> int:
+        with self._lock:
+            return self._pages.get(id(driver), 0)
+
+    def memory_reason(self, driver) -> str | None:
+        """RSS tavanı aşıldıysa sebep metni döndürür (0 = limitsiz)."""
+        if self.max_rss_mb:
+            rss = driver_rss_mb(driver)
+            if rss is not None and rss >= self.max_rss_mb:
+                return f"RSS limiti ({rss:.0f}MB >= {self.max_rss_mb}MB)"
+        return None
+
+    def _recycle_reason(self, driver) -> str | None:
+        if self.max_pages and self.pages(driver) >= self.max_pages:
+            return f"sayfa limiti ({self.max_pages})"
+        reason = self.memory_reason(driver)
+        if reason:
+            return reason
+        if not ping_driver(driver, timeout=10):
+            return "ping başarısız"
+        return None
+
+    def release(self, driver, failed: bool = False) -> None:
+        """Driver'ı havuza geri ver; hatalı/limit aşmış driver kapatılır."""
+        if driver is None:
+            return
+        self._mark_returned()
+        reason = "hata bildirildi" if failed else self._recycle_reason(driver)
+        if reason:
+            self._discard(driver, reason)
+            return
+        # Boşta beklerken ürün sayfasının scriptleri CPU yemesin
+        try:
+            driver.get("about:blank")
+        except Exception:
+            pass
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append(driver)
+                return
+        self._discard(driver, "havuz dolu")
+
+    def idle_seconds(self) -> float | None:
+        """Son driver kullanımından beri geçen süre; kullanımda driver varsa None."""
+        with self._lock:
+            return None if self._in_use else time.monotonic() - self._last_used
+
+    def park(self, reason: str = "boşta") -> int:
+        """
+        Boşta bekleyen ve yedek driver'ları kapatır (havuz açık kalır; sonraki acquire
+        yenisini kurar). Kullanımdaki driver'lara dokunulmaz. Kapatılan driver sayısı döner.
+        """
+        with self._lock:
+            idle, self._idle = self._idle, []
+            standby, self._standby = self._standby, None
+        if standby is not None:
+            idle.append(standby)
+        for driver in idle:
+            self._discard(driver, f"park: {reason}")
+        return len(idle)
+
+    def close_all(self) -> None:
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            standby, self._standby = self._standby, None
+        if standby is not None:
+            idle.append(standby)
+        for driver in idle:
+            self._discard(driver, "kapanış")
+
+
+# -----------------------------
+# SEKMELER (tek Chrome içinde pipeline)
+# -----------------------------
+# Eski dokümana işaret koyulur; yeni doküman commit olunca işaret kaybolur.
+# Böylece location.href atamasından hemen sonra eski sayfanın "complete"
+# readyState'i yanlışlıkla "yüklendi" sayılmaz.
+_STALE_ATTR = "data-stock-stale"
+
+# pageLoadStrategy değerleri, "en erken dönen"den "en geç dönen"e
+PAGE_LOAD_STRATEGIES = ("none", "eager", "normal")
+
+# Strateji → yeterli sayılan document.readyState değerleri
+_READY_STATES = {
+    "none": ("loading", "interactive", "complete"),
+    "eager": ("interactive", "complete"),
+    "normal": ("complete",),
+}
+
+_PAGE_STATE_JS = (
+    "return arguments[0].indexOf(document.readyState) !== -1 && "
+    f"!(document.documentElement && document.documentElement.hasAttribute('{_STALE_ATTR}'));"
+)
+
+PAGE_LOADED_JS = (
+    "return document.readyState === 'complete' && "
+    f"!(document.documentElement && document.documentElement.hasAttribute('{_STALE_ATTR}'));"
+)
+
+
+def page_loaded(driver) -> bool:
+    """WebDriverWait predicate: aktif sekmede yeni doküman tamamen yüklendi mi?"""
+    try:
+        return bool(driver.execute_script(PAGE_LOADED_JS))
+    except Exception:
+        return False
+
+
+def page_state(strategy: str):
+    """
+    WebDriverWait predicate üretir: yeni doküman `strategy` seviyesine ulaştı mı?
+      none   : yeni doküman commit oldu (eski sayfa işareti kalktı)
+      eager  : DOMContentLoaded (readyState interactive/complete)
+      normal : load (readyState complete)
+    """
+    states = list(_READY_STATES.get(strategy, _READY_STATES["normal"]))
+
+    def _reached(driver) -> bool:
+        try:
+            return bool(driver.execute_script(_PAGE_STATE_JS, states))
+        except Exception:
+            return False
+    return _reached
+
+
+def normalize_page_load_strategy(value: str | None, default: str = "normal") -> str:
+    value = (value or "").strip().lower()
+    return value if value in PAGE_LOAD_STRATEGIES else default
+
+
+def earliest_page_load_strategy(strategies) -> str:
+    """Driver tek bir strateji alabildiği için mağazaların en erken döneni seçilir."""
+    ranked = [normalize_page_load_strategy(s) for s in strategies] or ["normal"]
+    return min(ranked, key=PAGE_LOAD_STRATEGIES.index)
+
+
+def mark_stale(driver) -> None:
+    """Aktif dokümanı 'eski' diye işaretle (navigasyon öncesi)."""
+    try:
+        driver.execute_script(
+            "if (document.documentElement) { document.documentElement.setAttribute(arguments[0], '1'); }",
+            _STALE_ATTR,
+        )
+    except Exception:
+        pass
+
+
+def open_tabs(driver, count: int, on_new_tab=None) -> list[str]:
+    """
+    Driver'da en az `count` sekme olmasını sağlar ve handle listesini döndürür.
+    on_new_tab(driver): yeni açılan sekmede (aktifken) çağrılır (CDP ayarları vb.)
+    """
+    handles = list(driver.window_handles)
+    while len(handles) < count:
+        driver.switch_to.new_window("tab")
+        if on_new_tab is not None:
+            on_new_tab(driver)
+        handles.append(driver.current_window_handle)
+    return handles[:count]
+
+
+def start_navigation(driver, handle: str, url: str, capture_patterns: list[str] | None = None) -> None:
+    """Sekmede navigasyonu başlatır ve BEKLEMEDEN döner (driver.get'in aksine)."""
+    driver.switch_to.window(handle)
+    reset_capture(driver, handle, capture_patterns)
+    driver.execute_script(
+        "if (document.documentElement) { document.documentElement.setAttribute(arguments[1], '1'); }"
+        "window.location.href = arguments[0];",
+        url, _STALE_ATTR,
+    )
+
+
+def close_extra_tabs(driver, keep: int = 1) -> None:
+    """İlk `keep` sekme dışındakileri kapatır ve ilk sekmeye döner."""
+    try:
+        handles = list(driver.window_handles)
+        for handle in handles[keep:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+    except Exception as e:
+        log.warning("[TABS] sekmeler kapatılamadı: %s", e)
+
+
+# -----------------------------
+# KAYNAK ENGELLEME (CDP Network.setBlockedURLs)
+# -----------------------------
+# Gruplar: beden kontrolü için gereksiz ağır kaynaklar. Scriptler (ürün/beden
+# verisini yükleyen bundle'lar) ve OneTrust (cookie banner'ı helper'lar bekliyor)
+# bilerek engellenmez.
+BLOCK_GROUPS: dict[str, list[str]] = {
+    "images": ["*.jpg*", "*.jpeg*", "*.png*", "*.gif*", "*.webp*", "*.avif*", "*.svg*", "*.ico*"],
+    "fonts": ["*.woff*", "*.woff2*", "*.ttf*", "*.otf*", "*.eot*"],
+    "media": ["*.mp4*", "*.webm*", "*.m3u8*", "*.mp3*", "*.m4s*"],
+    "analytics": [
+        "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+        "*googleadservices.com*", "*facebook.net*", "*connect.facebook.com*",
+        "*hotjar.com*", "*criteo.com*", "*criteo.net*", "*analytics.tiktok.com*",
+        "*bat.bing.com*", "*clarity.ms*", "*ct.pinterest.com*", "*sc-static.net*",
+        "*quantummetric.com*", "*contentsquare.net*", "*yandex.ru/metrika*", "*mc.yandex.ru*",
+    ],
+}
+DEFAULT_BLOCK_GROUPS = ["images", "fonts", "media", "analytics"]
+
+
+def resolve_blocked_urls(profile: dict | None) -> list[str]:
+    """
+    Mağaza profilinden engellenecek URL pattern listesini üretir.
+    profile: {"enabled": bool, "groups": [...], "block": [pattern...], "allow": [grup|pattern...]}
+      - groups: BLOCK_GROUPS anahtarları (varsayılan DEFAULT_BLOCK_GROUPS)
+      - block : ek pattern'ler (örn. öneri carousel endpoint'i)
+      - allow : listeden çıkarılacak grup adları veya birebir pattern'ler
+    """
+    profile = profile or {}
+    if not profile.get("enabled", True):
+        return []
+    allow = set(profile.get("allow") or [])
+    patterns: list[str] = []
+    for group in profile.get("groups", DEFAULT_BLOCK_GROUPS):
+        if group in allow:
+            continue
+        patterns.extend(BLOCK_GROUPS.get(group, []))
+    patterns.extend(profile.get("block") or [])
+    out, seen = [], set()
+    for p in patterns:
+        if p not in allow and p not in seen:
+            seen.add(p)
+            out.append(p)
+    return out
+
+
+def apply_blocked_urls(driver, patterns: list[str]) -> None:
+    """Aktif sekmeye engel listesini uygular (boş liste = engel kaldır)."""
+    try:
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(patterns)})
+    except Exception as e:
+        log.warning("[BLOCK] Network.setBlockedURLs hatası: %s", e)
+
+
+# -----------------------------
+# YANIT YAKALAMA (CDP Network olay kanalı)
+# -----------------------------
+# Driver başına Chrome'un DevTools websocket'ine (chromedriver'ın debuggerAddress'i) ayrı bir
+# bağlantı açılır; sekmelere Target.attachToTarget (flatten) ile bağlanılır. Network domain'i sadece
+# capture pattern'i olan mağazanın sekmesinde açıktır: diğer mağazalarda hiç Network olayı gelmez.
+# Olaylar geldikçe süzülür: responseReceived → pattern'e uyan JSON yanıt işaretlenir, loadingFinished
+# → sadece onun gövdesi Network.getResponseBody ile alınır. Diğer olaylar JSON parse edilmeden atlanır.
+# Performance log ve sayfaya enjekte edilen script kullanılmaz.
+CAPTURE_MAX_PER_TAB = 50
+CAPTURE_EVENTS = ("Network.responseReceived", "Network.loadingFinished", "Network.loadingFailed",
+                  "Target.detachedFromTarget")
+_EVENT_PREFIX = '{"method":"'
+
+
+def _tab_key(handle: str | None) -> str:
+    # Eski chromedriver sürümlerinde handle "CDwindow-<targetId>" biçimindedir
+    return (handle or "").replace("CDwindow-", "")
+
+
+def _is_json_response(response: dict, url: str) -> bool:
+    return "json" in (response.get("mimeType") or "").lower() or "json" in url.lower()
+
+
+class NetworkCapture:
+    """
+    Tek Chrome için CDP bağlantısı; okuyucu thread olayları sekme tamponlarına yazar.
+    configure(handle, patterns) navigasyondan önce çağrılır, responses(handle) gövdeleri döner.
+    """
+
+    def __init__(self, ws_url: str, connect=None):
+        if connect is None:
+            import websocket   # websocket-client (selenium bağımlılığı)
+            connect = websocket.create_connection
+        self._ws = connect(ws_url, timeout=None, suppress_origin=True, enable_multithread=True)
+        self._ids = itertools.count(1)
+        self._cond = threading.Condition()
+        self._callbacks: dict[int, object] = {}    # komut id → callback(yanıt | None)
+        self._sessions: dict[str, str] = {}        # CDP sessionId → sekme
+        self._tabs: dict[str, dict] = {}
+        self.closed = False
+        threading.Thread(target=self._read_loop, name="cdp-capture", daemon=True).start()
+
+    # --- komutlar ---
+    def _send(self, method: str, params: dict | None = None, session: str | None = None, callback=None) -> None:
+        with self._cond:
+            msg_id = next(self._ids)
+            if callback is not None:
+                self._callbacks[msg_id] = callback
+        msg = {"id": msg_id, "method": method, "params": params or {}}
+        if session:
+            msg["sessionId"] = session
+        try:
+            self._ws.send(json.dumps(msg))
+        except Exception:
+            with self._cond:
+                self._callbacks.pop(msg_id, None)
+            raise
+
+    def _call(self, method: str, params: dict | None = None, session: str | None = None,
+              timeout: float = 5.0) -> dict | None:
+        """Senkron komut (okuyucu thread dışından); hata / zaman aşımında None."""
+        done = threading.Event()
+        box = {}
+
+        def on_reply(reply):
+            box["reply"] = reply
+            done.set()
+
+        try:
+            self._send(method, params, session, on_reply)
+        except Exception as e:
+            log.info("[CAPTURE] %s gönderilemedi: %s", method, e)
+            return None
+        if not done.wait(timeout):
+            log.info("[CAPTURE] %s yanıt vermedi (%.0fs)", method, timeout)
+            return None
+        reply = box.get("reply") or {}
+        if "error" in reply or "result" not in reply:
+            log.info("[CAPTURE] %s hatası: %s", method, reply.get("error"))
+            return None
+        return reply["result"]
+
+    # --- okuyucu thread ---
+    def _read_loop(self) -> None:
+        try:
+            while True:
+                raw = self._ws.recv()
+                if not raw:
+                    break
+                if raw.startswith(_EVENT_PREFIX):
+                    # Olay adı JSON parse etmeden okunur; ilgisiz olaylar (requestWillBeSent,
+                    # dataReceived, ...) burada atlanır
+                    method = raw[len(_EVENT_PREFIX):raw.find('"', len(_EVENT_PREFIX))]
+                    if method not in CAPTURE_EVENTS:
+                        continue
+                try:
+                    msg = json.loads(raw)
+                except ValueError:
+                    continue
+                if "id" in msg:
+                    with self._cond:
+                        callback = self._callbacks.pop(msg["id"], None)
+                    if callback is not None:
+                        callback(msg)
+                elif msg.get("method") in CAPTURE_EVENTS:
+                    self._on_event(msg)
+        except Exception as e:
+            if not self.closed:
+                log.info("[CAPTURE] CDP bağlantısı kapandı: %s", e)
+        finally:
+            with self._cond:
+                self.closed = True
+                callbacks = list(self._callbacks.values())
+                self._callbacks.clear()
+                self._cond.notify_all()
+            for callback in callbacks:
+                callback(None)
+
+    def _on_event(self, msg: dict) -> None:
+        method = msg["method"]
+        params = msg.get("params") or {}
+        if method == "Target.detachedFromTarget":
+            with self._cond:
+                key = self._sessions.pop(params.get("sessionId"), None)
+                self._tabs.pop(key, None)
+            return
+        rid = params.get("requestId")
+        with self._cond:
+            tab = self._tabs.get(self._sessions.get(msg.get("sessionId"), ""))
+            if tab is None:
+                return
+            if method == "Network.responseReceived":
+                response = params.get("response") or {}
+                url = response.get("url") or ""
+                if _is_json_response(response, url) and any(r.search(url) for r in tab["regexes"]):
+                    tab["pending"][rid] = url
+                return
+            url = tab["pending"].pop(rid, None)
+            self._cond.notify_all()
+            if url is None or method == "Network.loadingFailed":
+                return
+            tab["fetching"] += 1
+            gen = tab["gen"]
+        try:
+            self._send("Network.getResponseBody", {"requestId": rid}, tab["session"],
+                       lambda reply: self._on_body(tab, gen, url, reply))
+        except Exception:
+            self._on_body(tab, gen, url, None)
+
+    def _on_body(self, tab: dict, gen: int, url: str, reply: dict | None) -> None:
+        result = (reply or {}).get("result")
+        text = None
+        if result is not None:
+            text = result.get("body") or ""
+            if result.get("base64Encoded"):
+                try:
+                    text = base64.b64decode(text).decode("utf-8", "replace")
+                except ValueError:
+                    text = None
+        with self._cond:
+            if tab["gen"] != gen:
+                return   # sekme bu arada yeni sayfaya geçti
+            tab["fetching"] -= 1
+            if text:
+                tab["bodies"].append({"url": url, "body": text})
+                del tab["bodies"][:-CAPTURE_MAX_PER_TAB]
+            self._cond.notify_all()
+
+    # --- sekmeler ---
+    def configure(self, handle: str, patterns: list[str] | None) -> None:
+        """
+        Yeni navigasyondan önce: sekmenin tamponu temizlenir, pattern'ler güncellenir.
+        Pattern varsa sekmeye bağlanılıp Network açılır; yoksa Network kapatılır.
+        """
+        key = _tab_key(handle)
+        regexes = [re.compile(p, re.I) for p in patterns or []]
+        with self._cond:
+            tab = self._tabs.get(key)
+            if tab is not None:
+                tab["gen"] += 1
+                tab.update(regexes=regexes, pending={}, fetching=0, bodies=[])
+                self._cond.notify_all()
+        if tab is None:
+            if not regexes:
+                return
+            result = self._call("Target.attachToTarget", {"targetId": key, "flatten": True})
+            if not result or not result.get("sessionId"):
+                return
+            tab = {"session": result["sessionId"], "enabled": False, "gen": 0,
+                   "regexes": regexes, "pending": {}, "fetching": 0, "bodies": []}
+            with self._cond:
+                self._tabs[key] = tab
+                self._sessions[tab["session"]] = key
+        if bool(regexes) != tab["enabled"]:
+            if self._call("Network.enable" if regexes else "Network.disable", session=tab["session"]) is not None:
+                tab["enabled"] = bool(regexes)
+
+    def responses(self, handle: str, wait: float = 0.0) -> list[dict]:
+        """Sekmede yakalanan gövdeler [{"url", "body"}]; bitmemiş yanıtlar en fazla wait sn beklenir."""
+        deadline = time.monotonic() + wait
+        with self._cond:
+            tab = self._tabs.get(_tab_key(handle))
+        if tab is None:
+            return []
+        if wait > 0 and not self.closed:
+            # Bariyer: yanıtı gelene kadar Chrome'un ondan önce gönderdiği olaylar da okunmuş olur
+            self._call("Target.getTargetInfo", session=tab["session"], timeout=wait)
+        with self._cond:
+            while (tab["pending"] or tab["fetching"]) and not self.closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            return list(tab["bodies"])
+
+    def close(self) -> None:
+        self.closed = True
+        try:
+            self._ws.close()
+        except Exception:
+            pass
+
+
+def _devtools_ws_url(driver) -> str:
+    """Chrome'un tarayıcı düzeyi DevTools websocket adresi (chromedriver debuggerAddress'inden)."""
+    address = ((driver.capabilities or {}).get("goog:chromeOptions") or {}).get("debuggerAddress")
+    if not address:
+        raise RuntimeError("debuggerAddress yok")
+    opener = urllib.request.build_opener(urllib.request.ProxyHandler({}))
+    with opener.open(f"http://{address}/json/version", timeout=3) as resp:
+        return json.load(resp)["webSocketDebuggerUrl"]
+
+
+def _network_capture(driver, create: bool) -> NetworkCapture | None:
+    capture = getattr(driver, "_stock_capture", None)
+    if capture is False:
+        return None   # bağlantı daha önce kurulamadı; her navigasyonda tekrar denenmez
+    if capture is not None and not capture.closed:
+        return capture
+    if not create:
+        return None
+    try:
+        capture = NetworkCapture(_devtools_ws_url(driver))
+    except Exception as e:
+        log.warning("[CAPTURE] CDP bağlantısı kurulamadı, network fallback kapalı: %s", e)
+        capture = False
+    driver._stock_capture = capture
+    return capture or None
+
+
+def reset_capture(driver, handle: str | None = None, patterns: list[str] | None = None) -> None:
+    """
+    Navigasyondan önce: sekmenin tamponu temizlenir (eski sayfanın yanıtları karışmasın) ve
+    yakalama bu sayfanın mağaza pattern'lerine göre açılır/kapatılır.
+    """
+    capture = _network_capture(driver, create=bool(patterns))
+    if capture is None:
+        return
+    try:
+        capture.configure(handle or driver.current_window_handle, patterns)
+    except Exception as e:
+        log.info("[CAPTURE] sekme ayarlanamadı: %s", e)
+
+
+def captured_responses(driver, patterns: list[str] | None, max_entries: int = 20,
+                       max_body: int = 512 * 1024, wait: float = 1.0) -> list[dict]:
+    """
+    Aktif sekmede yüklenen, URL'i patterns'tan birine uyan JSON yanıtlar [{"url", "body"}]
+    (eskiden yeniye, en fazla max_entries). patterns boşsa hiçbir şey döndürülmez.
+    """
+    if not patterns:
+        return []
+    capture = _network_capture(driver, create=False)
+    if capture is None:
+        return []
+    try:
+        handle = driver.current_window_handle
+    except Exception:
+        return []
+    regexes = [re.compile(p, re.I) for p in patterns]
+    out = [entry for entry in capture.responses(handle, wait)
+           if len(entry["body"]) <= max_body and any(r.search(entry["url"]) for r in regexes)]
+    return out[-max_entries:]
+
+
+def stop_capture(driver) -> None:
+    capture = getattr(driver, "_stock_capture", None)
+    if capture:
+        capture.close()
+
+
+# -----------------------------
+# KALICI PROFİL (--user-data-dir + disk cache)
+# -----------------------------
+# Chrome aynı user-data-dir'i iki süreçte açamaz; her canlı driver kendi
+# slot dizinini (base/slot-N) kullanır. Slot'lar driver kapanınca geri verilir.
+# Temizlik yalnızca Chrome kapalıyken yapılır: sadece cache dizinleri silinir,
+# cookie/consent (Cookies, Local Storage) korunur.
+CACHE_DIRS = ("Cache", "Code Cache", "GPUCache", "Service Worker/CacheStorage",
+              "Service Worker/ScriptCache", "ShaderCache", "GrShaderCache", "DawnCache")
+_SINGLETON_FILES = ("SingletonLock", "SingletonSocket", "SingletonCookie")
+
+
+def dir_size_mb(path: str) -> float:
+    total = 0
+    for root, _dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                continue
+    return total / (1024.0 * 1024.0)
+
+
+class ProfileSlots:
+    """
+    Kalıcı Chrome profil dizinleri.
+
+    base_dir : slot dizinlerinin kökü (örn. /data/chrome-profile)
+    max_mb   : slot bu boyutu aşarsa cache dizinleri temizlenir (0 = limitsiz)
+    """
+
+    def __init__(self, base_dir: str, max_mb: int = 0):
+        self.base_dir = os.path.abspath(base_dir)
+        self.max_mb = int(max_mb or 0)
+        self._busy: set[str] = set()
+        self._lock = threading.Lock()
+        os.makedirs(self.base_dir, exist_ok=True)
+
+    def acquire(self) -> str:
+        """Boştaki ilk slot dizinini döndür (yoksa yenisini oluştur)."""
+        with self._lock:
+            n = 0
+            while os.path.join(self.base_dir, f"slot-{n}") in self._busy:
+                n += 1
+            path = os.path.join(self.base_dir, f"slot-{n}")
+            self._busy.add(path)
+        os.makedirs(path, exist_ok=True)
+        # Önceki çökmüş Chrome'dan kalan kilitler yeni süreci engellemesin
+        for name in _SINGLETON_FILES:
+            try:
+                os.unlink(os.path.join(path, name))
+            except OSError:
+                pass
+        self.cleanup(path)
+        return path
+
+    def release(self, path: str | None) -> None:
+        """Chrome kapandıktan sonra slot'u geri ver; limit aşıldıysa cache'i temizle."""
+        if not path:
+            return
+        self.cleanup(path)
+        with self._lock:
+            self._busy.discard(path)
+
+    def cleanup(self, path: str) -> None:
+        if not self.max_mb:
+            return
+        size = dir_size_mb(path)
+        if size < self.max_mb:
+            return
+        for rel in CACHE_DIRS:
+            for profile in ("Default", ""):
+                target = os.path.join(path, profile, rel)
+                if os.path.isdir(target):
+                    shutil.rmtree(target, ignore_errors=True)
+        log.info("[PROFILE] %s cache temizlendi (%.0fMB -> %.0fMB, limit=%sMB)",
+                 path, size, dir_size_mb(path), self.max_mb)
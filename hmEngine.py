@@ -0,0 +1,198 @@
+# ============================
+# hmEngine.py — H&M availability JSON'u için asyncio motoru
+# - İzlenen tüm H&M ürün kodları tek seferde, eşzamanlı çekilir (aiohttp)
+# - Eşzamanlılık sınırı (HM_ASYNC_CONCURRENCY) + host başına hız sınırı (HM_ASYNC_RATE istek/sn);
+#   storeLimiter verilirse ikisi de config["stores"]["hm"]["rate_limit"]'ten gelir (aynı jeton kovası)
+# - 5xx ve bağlantı hatalarında httpHelpers ile aynı retry/backoff politikası;
+#   403/429 tekrar denenmez, httpHelpers.notify_blocked ile bildirilir (devre kesici)
+# - httpHelpers.response_cache ile koşullu istek (ETag/Last-Modified); 304/aynı gövde parse edilmez
+# - Sonuçlar ham JSON olarak döner; beden seçimi httpCheckers.hm_sizes_from_availability ile
+# - aiohttp ilk kullanımda import edilir; kurulu değilse (ya da HM_ASYNC=0) istekler requests havuzundan sırayla atılır
+# ============================
+
+import os
+import time
+import asyncio
+import logging
+from urllib.parse import urlsplit
+
+import httpHelpers
+from httpCheckers import hm_availability_url, hm_availability_headers, parse_hm_availability_text
+
+log = logging.getLogger(__name__)
+
+HM_ASYNC_CONCURRENCY = max(1, int(os.getenv("HM_ASYNC_CONCURRENCY", "8")))
+HM_ASYNC_RATE        = float(os.getenv("HM_ASYNC_RATE", "10"))   # host başına istek/sn (0 = sınırsız)
+
+_missing_logged = False
+
+
+def available() -> bool:
+    """aiohttp kurulu mu? (kurulu değilse bir kez uyarı loglanır)"""
+    global _missing_logged
+    try:
+        import aiohttp  # noqa: F401
+        return True
+    except ImportError:
+        if not _missing_logged:
+            _missing_logged = True
+            log.warning("[H&M-ASYNC] aiohttp kurulu değil – H&M istekleri sırayla atılacak")
+        return False
+
+
+class HostRateLimiter:
+    """Host başına istekleri en az 1/rate saniye aralıkla başlatır."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next: dict[str, float] = {}
+        self._lock = asyncio.Lock()
+
+    async def wait(self, host: str) -> None:
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next.get(host, now))
+            self._next[host] = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class StoreRate:
+    """HostRateLimiter yerine mağaza kovası: her istek storeLimiter'dan bir jeton ayırır."""
+
+    def __init__(self, limiter, store: str):
+        self.limiter = limiter
+        self.store = store
+
+    async def wait(self, host: str) -> None:
+        delay = self.limiter.reserve(self.store)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+async def _fetch_one(session, sem, limiter, code: str, cookie: str, referer: str | None,
+                     conditional: bool = True):
+    """Tek kodun availability JSON'u; alınamazsa None. conditional=False: doğrulayıcı gönderilmez."""
+    import aiohttp
+
+    url = hm_availability_url(code)
+    host = urlsplit(url).netloc
+    cache = httpHelpers.response_cache
+    headers = hm_availability_headers(code, cookie, referer)
+    # aiohttp brotli'yi ek paket olmadan çözemez
+    headers["Accept-Encoding"] = "gzip, deflate"
+    if conditional and cache.max_entries > 0:
+        headers.update(cache.validators(url))
+    status = None
+    for attempt in range(httpHelpers.HTTP_RETRIES + 1):
+        if attempt:
+            await asyncio.sleep(httpHelpers.HTTP_BACKOFF * (2 ** (attempt - 1)))
+        async with sem:
+            await limiter.wait(host)
+            started = time.monotonic()
+            try:
+                async with session.get(url, headers=headers) as resp:
+                    status = resp.status
+                    resp_headers = resp.headers
+                    text = await resp.text()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                elapsed = time.monotonic() - started
+                httpHelpers.record_request(host, elapsed, False)
+                log.info("[HTTP] H&M async GET %s -> %s (%.2fs)", urlsplit(url).path, type(e).__name__, elapsed)
+                continue
+        elapsed = time.monotonic() - started
+        httpHelpers.record_request(host, elapsed, status < 400)
+        if httpHelpers.HTTP_LOG_REQUESTS:
+            log.info("[HTTP] H&M async GET %s -> %s (%.2fs, %s byte)", urlsplit(url).path, status, elapsed, len(text))
+        if status in httpHelpers.RETRY_STATUSES:
+            continue
+        if status not in (200, 304):
+            if status in httpHelpers.BLOCK_STATUSES:
+                httpHelpers.notify_blocked(url, status)
+            return None
+        if status == 304 and not cache.has(url):
+            # Kayıt bu arada LRU'dan atılmış: 304'ün karşılığı yok → koşulsuz tekrar
+            return await _fetch_one(session, sem, limiter, code, cookie, referer, conditional=False)
+        data = cache.resolve(url, status, resp_headers, text, parse_hm_availability_text)
+        if data is None:
+            log.info("[H&M-ASYNC] %s JSON parse edilemedi body[:200]=%s", code, text[:200])
+        return data
+    if status in httpHelpers.BLOCK_STATUSES:
+        httpHelpers.notify_blocked(url, status)
+    return None
+
+
+def _limits(store_limiter) -> tuple[int, float]:
+    """(eşzamanlılık, istek/sn): storeLimiter'daki hm ayarları ya da HM_ASYNC_* ortam değerleri."""
+    if store_limiter is None:
+        return HM_ASYNC_CONCURRENCY, HM_ASYNC_RATE
+    settings = store_limiter.settings("hm")
+    return max(1, settings["max_in_flight"] or HM_ASYNC_CONCURRENCY), settings["rate"]
+
+
+async def _fetch_all(codes: dict[str, str | None], cookie: str, store_limiter=None) -> dict:
+    import aiohttp
+
+    concurrency, _rate = _limits(store_limiter)
+    sem = asyncio.Semaphore(concurrency)
+    limiter = StoreRate(store_limiter, "hm") if store_limiter is not None else HostRateLimiter(HM_ASYNC_RATE)
+    timeout = aiohttp.ClientTimeout(sock_connect=httpHelpers.HTTP_CONNECT_TIMEOUT,
+                                    sock_read=httpHelpers.HTTP_READ_TIMEOUT)
+    connector = aiohttp.TCPConnector(limit_per_host=concurrency)
+    async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+        codes_list = list(codes)
+        results = await asyncio.gather(
+            *(_fetch_one(session, sem, limiter, code, cookie, codes[code]) for code in codes_list),
+            return_exceptions=True,
+        )
+    out = {}
+    for code, res in zip(codes_list, results):
+        if isinstance(res, BaseException):
+            log.warning("[H&M-ASYNC] %s beklenmeyen hata: %s", code, res)
+            res = None
+        out[code] = res
+    return out
+
+
+def _fetch_serial(codes: dict[str, str | None], cookie: str, store_limiter=None) -> dict:
+    """aiohttp yoksa / HM_ASYNC=0 ise: aynı istekler paylaşılan requests havuzundan sırayla."""
+    out = {}
+    for code, referer in codes.items():
+        data = None
+        if store_limiter is not None:
+            store_limiter.wait_token("hm")
+        try:
+            _resp, data = httpHelpers.get_cached(hm_availability_url(code), parse_hm_availability_text,
+                                                 headers=hm_availability_headers(code, cookie, referer),
+                                                 label="H&M availability")
+        except Exception as e:
+            log.info("[H&M-ASYNC] %s sıralı istek hata: %s", code, e)
+        out[code] = data
+    return out
+
+
+def fetch_availability(codes: dict[str, str | None], cookie: str | None, use_async: bool = True,
+                       limiter=None) -> dict:
+    """
+    {ürün kodu: referer URL} için availability JSON'larını çeker (her kod tek istek).
+    Dönüş: {ürün kodu: JSON | None}. Cookie yoksa boş dict.
+    use_async=False ya da aiohttp yoksa istekler sırayla atılır.
+    limiter: storeLimiter.StoreLimiter — istekler "hm" kovasından jeton harcar.
+    Not: kendi event loop'unu açar; senkron döngüden çağrılır.
+    """
+    if not codes or not cookie:
+        return {}
+    started = time.monotonic()
+    if use_async and available():
+        out = asyncio.run(_fetch_all(codes, cookie, limiter))
+        concurrency, rate = _limits(limiter)
+        mode = f"concurrency={concurrency} rate={rate}/s"
+    else:
+        out = _fetch_serial(codes, cookie, limiter)
+        mode = "sıralı"
+    ok = sum(1 for v in out.values() if v is not None)
+    log.info("[H&M-ASYNC] %s kod çekildi (%s başarılı, %.2fs, %s)",
+             len(out), ok, time.monotonic() - started, mode)
+    return out
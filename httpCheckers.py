@@ -0,0 +1,465 @@
+# ============================
+# httpCheckers.py — tarayıcısız (HTTP-only) stok kontrolleri
+# - Mağazanın kendi sayfasının çektiği JSON'u okur (Chrome açılmaz)
+# - HTTP istekleri ortak httpHelpers katmanından (keep-alive havuz, retry, timing)
+# - Sözleşme: stokta bulunan bedenler list[str]; belirlenemezse None
+#   (None → çağıran taraf Selenium helper'ına düşer)
+# - selenium import ETMEZ; HTTP-only döngüde tarayıcı yüklenmez
+# ============================
+
+import os
+import json
+import re
+import threading
+from urllib.parse import urlsplit, parse_qs
+
+import httpHelpers
+
+USER_AGENT = (
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36"
+)
+
+BASE_HEADERS = {
+    "User-Agent": USER_AGENT,
+    "Accept": "application/json, text/plain, */*",
+    "Accept-Language": "tr-TR,tr;q=0.9,en-US;q=0.8,en;q=0.7",
+    "Accept-Encoding": "gzip, deflate, br",
+    "Connection": "keep-alive",
+}
+
+
+def _parse_json(text: str):
+    try:
+        return json.loads(text)
+    except ValueError:
+        return None
+
+
+def _get_json(url: str, params: dict | None = None, referer: str | None = None, label: str = "HTTP"):
+    """Koşullu GET + JSON parse (değişmeyen yanıt yeniden parse edilmez). HTTP hatası / JSON değilse None."""
+    headers = dict(BASE_HEADERS)
+    if referer:
+        headers["Referer"] = referer
+    try:
+        resp, data = httpHelpers.get_cached(url, _parse_json, params=params, headers=headers, label=label)
+    except Exception as e:
+        print(f"[DEBUG] {label} istek hatası: {e}")
+        return None
+    if resp.status_code not in (200, 304):
+        print(f"[DEBUG] {label} HTTP {resp.status_code} body[:200]={resp.text[:200]!r}")
+        return None
+    if data is None:
+        print(f"[DEBUG] {label} JSON değil body[:200]={resp.text[:200]!r}")
+    return data
+
+
+def _wait_token(limiter, store: str) -> None:
+    """Her giden istek mağazanın jetonunu harcar (storeLimiter; None = sınırsız)."""
+    if limiter is not None:
+        limiter.wait_token(store)
+
+
+def _norm_size_name(name) -> str:
+    return str(name or "").replace("\xa0", " ").strip().upper()
+
+
+# ------------------------------------------------------------
+# ZARA: products-details JSON
+# ------------------------------------------------------------
+# Zara ürün sayfası beden durumlarını bu uçtan çeker:
+#   {base}/{ülke}/{dil}/products-details?productIds={v1}&ajax=true
+# Yanıt: [{"id", "detail": {"colors": [{"productId", "sizes": [{"name", "availability"}]}]}}]
+ZARA_BASE_URL = os.getenv("ZARA_API_BASE", "").strip()
+ZARA_IN_STOCK = ("in_stock", "low_on_stock")
+_ZARA_LOCALE_RE = re.compile(r"^/([a-z]{2})/([a-z]{2})/")
+
+
+def zara_product_ref(url: str) -> dict | None:
+    """Zara ürün URL'inden {"base", "locale": "/tr/tr", "v1": "..."} çıkarır."""
+    parts = urlsplit(url)
+    m = _ZARA_LOCALE_RE.match(parts.path or "")
+    if not m:
+        return None
+    v1 = (parse_qs(parts.query).get("v1") or [None])[0]
+    return {
+        "base": f"{parts.scheme}://{parts.netloc}",
+        "locale": f"/{m.group(1)}/{m.group(2)}",
+        "v1": v1,
+    }
+
+
+def _zara_pick_color(product: dict, v1: str | None) -> dict | None:
+    colors = ((product or {}).get("detail") or {}).get("colors") or []
+    if not colors:
+        return None
+    if v1:
+        for color in colors:
+            if str(color.get("productId") or "") == v1 or str(color.get("id") or "") == v1:
+                return color
+    # Tek renk varsa o; birden fazla renk ve eşleşme yoksa belirsiz
+    return colors[0] if len(colors) == 1 else None
+
+
+def check_stock_zara_http(url: str, sizes_to_check, base_url: str | None = None, limiter=None):
+    """
+    Girdi  : ürün URL'i (…-pNNNNNNNN.html?v1=…), sizes_to_check (örn: ["S","M"])
+    Çıktı  : stokta bulunan bedenler (list[str]) — check_stock_zara ile aynı sözleşme
+    Hata   : None (istek/şema hatası) → Selenium helper'ı denenmeli
+    Notlar :
+      - availability "in_stock" / "low_on_stock" → stok VAR (DOM'daki data-qa-action ile aynı)
+      - base_url (veya ZARA_API_BASE) yerel fixture sunucusuna yönlendirmek içindir
+      - limiter: istek öncesi "zara" jetonu harcanır (slotu çağıran taraf tutar)
+    """
+    ref = zara_product_ref(url)
+    if not ref or not ref["v1"]:
+        print(f"[DEBUG] Zara HTTP: URL'de v1 ürün kimliği yok, atlanıyor: {url}")
+        return None
+    base = (base_url or ZARA_BASE_URL or ref["base"]).rstrip("/")
+    _wait_token(limiter, "zara")
+    data = _get_json(
+        f"{base}{ref['locale']}/products-details",
+        params={"productIds": ref["v1"], "ajax": "true"},
+        referer=url,
+        label="Zara",
+    )
+    if data is None:
+        return None
+    products = data if isinstance(data, list) else (data.get("products") or [])
+    product = next((p for p in products if isinstance(p, dict)), None)
+    color = _zara_pick_color(product, ref["v1"])
+    if color is None:
+        print("[DEBUG] Zara HTTP: ürün/renk bulunamadı (şema değişmiş olabilir)")
+        return None
+    sizes = color.get("sizes") or []
+    if not sizes:
+        print("[DEBUG] Zara HTTP: renkte beden listesi yok")
+        return None
+
+    wanted = set(x.strip().upper() for x in (sizes_to_check or []))
+    in_stock = []
+    for size in sizes:
+        name = _norm_size_name(size.get("name"))
+        availability = str(size.get("availability") or "").lower()
+        if not name or (wanted and name not in wanted):
+            continue
+        if availability in ZARA_IN_STOCK:
+            print(f"[DEBUG] ✅ Zara HTTP beden '{name}' stokta ({availability})")
+            in_stock.append(name)
+        else:
+            print(f"[DEBUG] ❌ Zara HTTP beden '{name}' stokta değil ({availability})")
+    return in_stock
+
+
+# ------------------------------------------------------------
+# INDITEX (Bershka / Stradivarius / Oysho): itxrest JSON
+# ------------------------------------------------------------
+# Üç site aynı platformda çalışır; ürün sayfası beden ve stok bilgisini
+#   {host}/itxrest/2/catalog/store/{storeId}/{catalogId}/category/0/product/{id}/detail
+#   {host}/itxrest/2/catalog/store/{storeId}/{catalogId}/product/{id}/stock
+# uçlarından alır. detail → renk/beden/sku, stock → sku başına availability.
+# storeId/catalogId ülke mağazasına özgüdür: config ("inditex" ayarı) ya da
+# ürün sayfası HTML'inden okunur ve (marka, host, ülke) başına önbelleğe alınır.
+INDITEX_BRANDS = {
+    "bershka":      {"host": "https://www.bershka.com",      "app_id": "1", "language_id": "-43"},
+    "stradivarius": {"host": "https://www.stradivarius.com", "app_id": "1", "language_id": "-43"},
+    "oysho":        {"host": "https://www.oysho.com",        "app_id": "1", "language_id": "-43"},
+}
+INDITEX_IN_STOCK = ("in_stock", "low_on_stock")
+
+_INDITEX_ITXREST_RE = re.compile(r"itxrest/\d+/catalog/store/(\d+)/(\d+)")
+_INDITEX_STORE_RE = re.compile(r"[\"']?storeId[\"']?\s*[:=]\s*[\"']?(\d{4,})")
+_INDITEX_CATALOG_RE = re.compile(r"[\"']?catalogId[\"']?\s*[:=]\s*[\"']?(\d{4,})")
+_INDITEX_PRODUCT_RE = re.compile(r"(?:c0p|-p)(\d{6,})(?:\.html)?")
+
+_inditex_ids: dict[tuple[str, str, str], tuple[str, str]] = {}
+_inditex_ids_lock = threading.Lock()
+
+
+def inditex_product_ref(url: str) -> dict | None:
+    """Inditex ürün URL'inden {"product_id", "color_id"} çıkarır (pelement / c0pNNN / colorId)."""
+    parts = urlsplit(url)
+    query = parse_qs(parts.query)
+    product_id = (query.get("pelement") or [None])[0]
+    if not product_id:
+        m = _INDITEX_PRODUCT_RE.search(parts.path or "")
+        product_id = m.group(1) if m else None
+    if not product_id:
+        return None
+    color_id = (query.get("colorId") or query.get("color") or [None])[0]
+    return {"product_id": product_id, "color_id": color_id}
+
+
+def _get_text(url: str, label: str = "HTTP") -> str | None:
+    headers = dict(BASE_HEADERS, Accept="text/html,application/xhtml+xml,*/*;q=0.8")
+    try:
+        resp = httpHelpers.get(url, headers=headers, label=label)
+    except Exception as e:
+        print(f"[DEBUG] {label} istek hatası: {e}")
+        return None
+    if resp.status_code != 200:
+        print(f"[DEBUG] {label} HTTP {resp.status_code}")
+        return None
+    return resp.text
+
+
+def _inditex_ids_key(brand: str, url: str) -> tuple[str, str, str]:
+    """Önbellek anahtarı: aynı markanın farklı ülke mağazaları (ör. /tr/ ve /es/) farklı id'ler taşır."""
+    parts = urlsplit(url)
+    country = next((p for p in (parts.path or "").split("/") if p), "").lower()
+    return brand, parts.netloc.lower(), country
+
+
+def _inditex_store_ids(brand: str, url: str, overrides: dict, limiter=None) -> tuple[str, str] | None:
+    """(storeId, catalogId): config → önbellek (marka, host, ülke) → ürün sayfası HTML'i."""
+    if overrides.get("store_id") and overrides.get("catalog_id"):
+        return str(overrides["store_id"]), str(overrides["catalog_id"])
+    key = _inditex_ids_key(brand, url)
+    with _inditex_ids_lock:
+        cached = _inditex_ids.get(key)
+    if cached:
+        return cached
+    _wait_token(limiter, brand)
+    html = _get_text(url, label=f"{brand} sayfa")
+    if not html:
+        return None
+    m = _INDITEX_ITXREST_RE.search(html)
+    if m:
+        ids = (m.group(1), m.group(2))
+    else:
+        store_m, catalog_m = _INDITEX_STORE_RE.search(html), _INDITEX_CATALOG_RE.search(html)
+        if not (store_m and catalog_m):
+            print(f"[DEBUG] {brand} HTTP: sayfada storeId/catalogId bulunamadı")
+            return None
+        ids = (store_m.group(1), catalog_m.group(1))
+    print(f"[DEBUG] {brand} HTTP: storeId={ids[0]} catalogId={ids[1]} ({key[1]}/{key[2]})")
+    with _inditex_ids_lock:
+        _inditex_ids[key] = ids
+    return ids
+
+
+def _inditex_colors(detail: dict) -> list[dict]:
+    """detail yanıtındaki renk listesi (tekli ürün ya da bundle özeti)."""
+    colors = ((detail or {}).get("detail") or {}).get("colors") or []
+    if colors:
+        return colors
+    for bundle in (detail or {}).get("bundleProductSummaries") or []:
+        colors = (bundle.get("detail") or {}).get("colors") or []
+        if colors:
+            return colors
+    return []
+
+
+def check_stock_inditex_http(brand: str, url: str, sizes_to_check, base_url: str | None = None,
+                             overrides: dict | None = None, limiter=None):
+    """
+    Girdi  : brand ("bershka" | "stradivarius" | "oysho"), ürün URL'i, sizes_to_check
+             overrides: {"store_id", "catalog_id", "language_id", "app_id"} (config'ten)
+    Çıktı  : stokta bulunan bedenler (list[str]) — check_stock_<brand> ile aynı sözleşme
+    Hata   : None (istek/şema hatası) → DOM helper'ı denenmeli
+    Notlar :
+      - availability "in_stock" / "low_on_stock" → stok VAR; "coming_soon"/"out_of_stock" → YOK
+      - colorId verilmişse o renk, yoksa tek renkli üründe tek renk kullanılır
+      - limiter: her istek (ürün sayfası HTML'i, detail, stock) için brand jetonu harcanır
+    """
+    profile = INDITEX_BRANDS.get(brand)
+    if profile is None:
+        return None
+    overrides = overrides or {}
+    ref = inditex_product_ref(url)
+    if not ref:
+        print(f"[DEBUG] {brand} HTTP: URL'den ürün kimliği çıkarılamadı: {url}")
+        return None
+    ids = _inditex_store_ids(brand, url, overrides, limiter)
+    if not ids:
+        return None
+    host = (base_url or overrides.get("base_url") or profile["host"]).rstrip("/")
+    params = {
+        "languageId": str(overrides.get("language_id", profile["language_id"])),
+        "appId": str(overrides.get("app_id", profile["app_id"])),
+    }
+    api = f"{host}/itxrest/2/catalog/store/{ids[0]}/{ids[1]}"
+
+    _wait_token(limiter, brand)
+    detail = _get_json(f"{api}/category/0/product/{ref['product_id']}/detail", params=params,
+                       referer=url, label=f"{brand} detail")
+    if detail is None:
+        return None
+    colors = _inditex_colors(detail)
+    color = None
+    if ref["color_id"]:
+        color = next((c for c in colors if str(c.get("id")) == str(ref["color_id"])), None)
+    elif len(colors) == 1:
+        color = colors[0]
+    if color is None:
+        print(f"[DEBUG] {brand} HTTP: renk seçilemedi (colorId={ref['color_id']}, renk={len(colors)})")
+        return None
+    sku_to_size = {}
+    for size in color.get("sizes") or []:
+        name = _norm_size_name(size.get("name"))
+        if name and size.get("sku") is not None:
+            sku_to_size[str(size["sku"])] = name
+    if not sku_to_size:
+        print(f"[DEBUG] {brand} HTTP: renkte sku/beden yok")
+        return None
+
+    _wait_token(limiter, brand)
+    stock = _get_json(f"{api}/product/{ref['product_id']}/stock", params=params,
+                      referer=url, label=f"{brand} stock")
+    if stock is None:
+        return None
+    availability = {}
+    for entry in stock.get("stocks") or []:
+        for sku in entry.get("stocks") or []:
+            availability[str(sku.get("id"))] = str(sku.get("availability") or "").lower()
+    if not availability:
+        print(f"[DEBUG] {brand} HTTP: stock yanıtı boş")
+        return None
+
+    wanted = set(x.strip().upper() for x in (sizes_to_check or []))
+    in_stock = []
+    for sku, name in sku_to_size.items():
+        if wanted and name not in wanted:
+            continue
+        state = availability.get(sku, "")
+        if state in INDITEX_IN_STOCK and name not in in_stock:
+            print(f"[DEBUG] ✅ {brand} HTTP beden '{name}' stokta ({state})")
+            in_stock.append(name)
+        else:
+            print(f"[DEBUG] ❌ {brand} HTTP beden '{name}' stokta değil ({state or 'bilinmiyor'})")
+    return in_stock
+
+
+# ------------------------------------------------------------
+# SHOPIFY (Roborock): /products/{handle}.js JSON
+# ------------------------------------------------------------
+# Shopify vitrinleri ürün JSON'unu sayfa URL'ine ".js" ekleyerek verir:
+#   {"available": bool, "variants": [{"id", "title", "available", "option1", ...}]}
+def shopify_product_js_url(url: str, base_url: str | None = None) -> str | None:
+    parts = urlsplit(url)
+    path = (parts.path or "").rstrip("/")
+    if "/products/" not in path:
+        return None
+    base = (base_url or f"{parts.scheme}://{parts.netloc}").rstrip("/")
+    return f"{base}{path}.js"
+
+
+def _variant_keys(variant: dict) -> set[str]:
+    keys = {str(variant.get("id") or ""), str(variant.get("title") or "")}
+    for opt in ("option1", "option2", "option3"):
+        if variant.get(opt):
+            keys.add(str(variant[opt]))
+    return {k.strip().casefold() for k in keys if k and k.strip()}
+
+
+def check_stock_shopify_http(url: str, sizes_to_check=None, base_url: str | None = None, limiter=None):
+    """
+    Girdi  : Shopify ürün URL'i (…/products/<handle>[?variant=ID]), sizes_to_check
+             (varyant başlığı, option değeri ya da varyant ID listesi; boş = herhangi)
+    Çıktı  : sizes_to_check boşsa stokta ise ['STOCK'] (check_stock_roborock sözleşmesi), yoksa [];
+             doluysa stokta olan varyantlar için config'te yazıldığı haliyle eşleşen girdiler
+    Hata   : None (istek/şema hatası) → buton kontrolüne (Selenium) düşülmeli
+    Not    : limiter verilirse istek öncesi "roborock" jetonu harcanır
+    """
+    js_url = shopify_product_js_url(url, base_url)
+    if not js_url:
+        print(f"[DEBUG] Shopify HTTP: /products/ URL'i değil: {url}")
+        return None
+    _wait_token(limiter, "roborock")
+    data = _get_json(js_url, referer=url, label="Shopify")
+    return shopify_variants_in_stock(data, url, sizes_to_check)
+
+
+def shopify_variants_in_stock(data, url: str, sizes_to_check=None):
+    """
+    Shopify /products/<handle>.js JSON'undan stok sonucu (HTTP ve tarayıcı yolu ortak).
+    Çıktı check_stock_shopify_http ile aynı; JSON/varyant listesi yoksa None.
+    """
+    if not isinstance(data, dict):
+        return None
+    variants = [v for v in (data.get("variants") or []) if isinstance(v, dict)]
+    if not variants:
+        print("[DEBUG] Shopify: varyant listesi yok")
+        return None
+
+    for v in variants:
+        print(f"[DEBUG] Shopify varyant id={v.get('id')} title='{v.get('title')}' available={v.get('available')}")
+
+    wanted = [x for x in (sizes_to_check or []) if str(x).strip()]
+    if not wanted:
+        # URL belirli bir varyantı gösteriyorsa sadece ona bak
+        variant_id = (parse_qs(urlsplit(url).query).get("variant") or [None])[0]
+        if variant_id:
+            variants = [v for v in variants if str(v.get("id")) == variant_id] or variants
+        available = any(bool(v.get("available")) for v in variants)
+        print(f"[DEBUG] Shopify: stok {'VAR' if available else 'YOK'}")
+        return ['STOCK'] if available else []
+
+    in_stock = []
+    for w in wanted:
+        key = str(w).strip().casefold()
+        if any(bool(v.get("available")) and key in _variant_keys(v) for v in variants):
+            print(f"[DEBUG] ✅ Shopify varyant '{w}' stokta")
+            in_stock.append(w)
+        else:
+            print(f"[DEBUG] ❌ Shopify varyant '{w}' stokta değil")
+    return in_stock
+
+
+# ------------------------------------------------------------
+# H&M: availability JSON (cookie gerekli)
+# ------------------------------------------------------------
+# Senkron (check_stock_hm_requests) ve asenkron (hmEngine) yollar aynı URL,
+# header seti ve parse mantığını kullanır.
+HM_AVAILABILITY_URL = "https://www2.hm.com/hmwebservices/service/product/tr/availability/{code}.json"
+
+
+def hm_availability_url(product_code: str) -> str:
+    return HM_AVAILABILITY_URL.format(code=product_code)
+
+
+def hm_availability_headers(product_code: str, cookie_string: str | None, referer_url: str | None = None) -> dict:
+    """Gerçek tarayıcıya yakın header seti (cookie + referer dahil)."""
+    return {
+        'Cookie': cookie_string or '',
+        'User-Agent': USER_AGENT,
+        'Accept': 'application/json, text/plain, */*',
+        'Accept-Language': 'tr-TR,tr;q=0.9,en-US;q=0.8,en;q=0.7',
+        'Accept-Encoding': 'gzip, deflate, br',
+        'Connection': 'keep-alive',
+        'Cache-Control': 'no-cache',
+        'Pragma': 'no-cache',
+        'Sec-Fetch-Site': 'same-origin',
+        'Sec-Fetch-Mode': 'cors',
+        'Sec-Fetch-Dest': 'empty',
+        'Sec-Ch-Ua': '"Google Chrome";v="131", "Chromium";v="131", "Not_A Brand";v="24"',
+        'Sec-Ch-Ua-Mobile': '?0',
+        'Sec-Ch-Ua-Platform': '"Linux"',
+        'Origin': 'https://www2.hm.com',
+        # Referer yoksa default H&M product page
+        'Referer': referer_url or f'https://www2.hm.com/tr_tr/productpage.{product_code}.html',
+    }
+
+
+def parse_hm_availability_text(text: str):
+    """Yanıt gövdesini JSON'a çevirir (BOM / )]}', ön eki temizlenir). Parse edilemezse None."""
+    text = (text or "").lstrip("﻿ ")
+    if text.startswith(")]}',"):
+        text = text[5:]
+    try:
+        return json.loads(text)
+    except ValueError:
+        return None
+
+
+def hm_sizes_from_availability(data, sizes_to_check) -> list[str]:
+    """availability JSON'undan stokta olan (istenen) bedenler."""
+    available_sizes = []
+    wanted = set(x.upper() for x in (sizes_to_check or []))
+    for size_info in ((data or {}).get('availability', []) or []):
+        size_code = size_info.get('sizeName') or size_info.get('size') or ''
+        size_code_up = str(size_code).upper().replace('BEDEN', '').strip()
+        in_stock = bool(size_info.get('available', False))
+        if in_stock and (not wanted or size_code_up in wanted):
+            available_sizes.append(size_code_up)
+    return available_sizes
@@ -0,0 +1,360 @@
+# ============================
+# httpHelpers.py — ortak HTTP istemci katmanı
+# - Host başına keep-alive requests.Session (HTTPAdapter bağlantı havuzu)
+# - Retry/backoff politikası (bağlantı hataları + 5xx); 429 tekrar denenmez, Retry-After beklenmez
+# - Ortamdan ayarlanan connect/read timeout'ları
+# - İstek başına süre ölçümü ve döngü sonu host özeti (http_stats_summary)
+# - Koşullu istek önbelleği (ETag/Last-Modified + gövde hash'i, LRU): değişmeyen yanıt yeniden parse edilmez
+# - Diske yazılan çerez deposu (CookieStore): yaş/başarı oranı takibi, yeniden başlatmada korunur
+# - Blok yanıtları (403/429) kayıtlı dinleyicilere bildirilir (main: mağaza devre kesicisi)
+# - requests ilk istekte import edilir
+# ============================
+
+import os
+import re
+import json
+import hashlib
+import time
+import logging
+import threading
+from collections import OrderedDict
+from urllib.parse import urlsplit, urlencode
+
+log = logging.getLogger(__name__)
+
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "4"))
+HTTP_READ_TIMEOUT    = float(os.getenv("HTTP_READ_TIMEOUT", os.getenv("HTTP_TIMEOUT", "10")))
+HTTP_RETRIES         = int(os.getenv("HTTP_RETRIES", "2"))
+HTTP_BACKOFF         = float(os.getenv("HTTP_BACKOFF", "0.5"))   # 0.5s, 1s, 2s…
+HTTP_POOL_MAXSIZE    = int(os.getenv("HTTP_POOL_MAXSIZE", "8"))
+HTTP_LOG_REQUESTS    = os.getenv("HTTP_LOG_REQUESTS", "1").strip().lower() in ("1","true","yes","on")
+HTTP_CACHE_ENTRIES   = int(os.getenv("HTTP_CACHE_ENTRIES", "256"))   # 0 = koşullu istek önbelleği kapalı
+
+# 429 burada yok: hız sınırı yanıtı beklenmeden döner, notify_blocked ile devre kesiciye gider
+RETRY_STATUSES = (500, 502, 503, 504)
+BLOCK_STATUSES = (403, 429)   # bot koruması / hız sınırı
+
+_block_listeners: list = []
+
+_sessions: dict[str, object] = {}
+_sessions_lock = threading.Lock()
+
+# host -> [istek sayısı, hata sayısı, toplam süre]
+HTTP_STATS: dict[str, list[float]] = {}
+_stats_lock = threading.Lock()
+
+
+def _new_session():
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    # Bağlantı hataları her metotta tekrar denenir; okuma/status tekrarları sadece
+    # idempotent metotlarda (Telegram POST'u çift mesaj göndermesin)
+    retry = Retry(
+        total=HTTP_RETRIES,
+        connect=HTTP_RETRIES,
+        read=HTTP_RETRIES,
+        status=HTTP_RETRIES,
+        backoff_factor=HTTP_BACKOFF,
+        status_forcelist=RETRY_STATUSES,
+        respect_retry_after_header=False,   # sunucunun Retry-After'ı thread'i dakikalarca uyutabilir
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_MAXSIZE, max_retries=retry)
+    sess = requests.Session()
+    sess.mount("http://", adapter)
+    sess.mount("https://", adapter)
+    return sess
+
+
+def session_for(url: str):
+    """URL'in host'una ait paylaşılan Session (yoksa oluşturulur)."""
+    parts = urlsplit(url)
+    key = f"{parts.scheme}://{parts.netloc}"
+    with _sessions_lock:
+        sess = _sessions.get(key)
+        if sess is None:
+            sess = _new_session()
+            _sessions[key] = sess
+    return sess
+
+
+_SECRET_PATH_RE = re.compile(r"/bot[^/]+")
+
+
+def _display_path(url: str) -> str:
+    """Log için path (Telegram bot token'ı gizlenir)."""
+    return _SECRET_PATH_RE.sub("/bot***", urlsplit(url).path or "/")
+
+
+def record_request(host: str, elapsed: float, ok: bool) -> None:
+    """Host özetine bir istek ekler (requests dışı istemciler de kullanır, ör. hmEngine)."""
+    with _stats_lock:
+        stat = HTTP_STATS.setdefault(host, [0, 0, 0.0])
+        stat[0] += 1
+        stat[1] += 0 if ok else 1
+        stat[2] += elapsed
+
+
+def add_block_listener(listener) -> None:
+    """listener(url, status): BLOCK_STATUSES yanıtında çağrılır (retry'lar tükendikten sonra)."""
+    _block_listeners.append(listener)
+
+
+def notify_blocked(url: str, status: int) -> None:
+    """Blok yanıtını dinleyicilere iletir (requests dışı istemciler de kullanır, ör. hmEngine)."""
+    for listener in list(_block_listeners):
+        try:
+            listener(url, status)
+        except Exception as e:
+            log.warning("[HTTP] blok dinleyicisi hatası: %s", e)
+
+
+def http_stats_summary(reset: bool = True) -> dict[str, str]:
+    """Host başına 'n=… err=… avg=…s' özeti + önbellek sayaçları (main döngü sonunda loglar)."""
+    with _stats_lock:
+        out = {
+            host: f"n={int(n)} err={int(err)} avg={total / n:.2f}s"
+            for host, (n, err, total) in sorted(HTTP_STATS.items()) if n
+        }
+        if reset:
+            HTTP_STATS.clear()
+    cache = response_cache.stats_summary(reset)
+    if cache:
+        out["cache"] = cache
+    return out
+
+
+class ResponseCache:
+    """
+    URL başına doğrulayıcılar (ETag/Last-Modified), gövde hash'i ve parse edilmiş değer.
+    - Sonraki istekte If-None-Match / If-Modified-Since gönderilir
+    - 304 ya da aynı gövde hash'i → önceki parse sonucu döner (parse atlanır)
+    - En fazla max_entries kayıt; en uzun süredir kullanılmayan atılır (LRU)
+    Dönen değerler paylaşılır; çağıran taraf değiştirmemeli.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, dict] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"304": 0, "same": 0, "parsed": 0}
+
+    @staticmethod
+    def key(url: str, params: dict | None = None) -> str:
+        return f"{url}?{urlencode(sorted(params.items()))}" if params else url
+
+    def has(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def validators(self, key: str) -> dict:
+        """Önbellekteki kayıt için koşullu istek header'ları."""
+        with self._lock:
+            entry = self._entries.get(key)
+        headers = {}
+        if entry:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def resolve(self, key: str, status: int, headers, text: str, parse):
+        """
+        Yanıtı önbellekle birleştirir: 304/aynı gövde → önbellekteki değer,
+        yeni 200 gövdesi → parse(text) (None değilse saklanır). Diğer durumlar None.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if status == 304:
+            if entry is None:
+                return None
+            self._count("304")
+            return entry["value"]
+        if status != 200:
+            return None
+        digest = hashlib.blake2b((text or "").encode("utf-8", "replace"), digest_size=16).digest()
+        if entry is not None and entry["digest"] == digest:
+            self._count("same")
+            value = entry["value"]
+        else:
+            self._count("parsed")
+            value = parse(text)
+            if value is None:
+                return None
+        if self.max_entries > 0:
+            with self._lock:
+                self._entries[key] = {
+                    "etag": headers.get("ETag"),
+                    "last_modified": headers.get("Last-Modified"),
+                    "digest": digest,
+                    "value": value,
+                }
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return value
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    def stats_summary(self, reset: bool = True) -> str | None:
+        with self._lock:
+            stats = dict(self._stats)
+            if reset:
+                self._stats = dict.fromkeys(self._stats, 0)
+            size = len(self._entries)
+        if not any(stats.values()):
+            return None
+        return f"304={stats['304']} same={stats['same']} parsed={stats['parsed']} entries={size}"
+
+
+response_cache = ResponseCache(HTTP_CACHE_ENTRIES)
+
+
+def request(method: str, url: str, label: str | None = None, timeout=None, **kwargs):
+    """
+    Paylaşılan havuzdan istek atar ve süresini kaydeder.
+    timeout verilmezse (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT) kullanılır.
+    Hata: requests istisnaları aynen yükseltilir (çağıran taraf kendi fallback'ini uygular).
+    """
+    host = urlsplit(url).netloc
+    started = time.monotonic()
+    try:
+        resp = session_for(url).request(
+            method, url, timeout=timeout or (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT), **kwargs
+        )
+    except Exception as e:
+        elapsed = time.monotonic() - started
+        record_request(host, elapsed, False)
+        log.info("[HTTP] %s %s %s -> %s (%.2fs)", label or host, method, _display_path(url), type(e).__name__, elapsed)
+        raise
+    elapsed = time.monotonic() - started
+    record_request(host, elapsed, resp.status_code < 400)
+    if HTTP_LOG_REQUESTS:
+        log.info("[HTTP] %s %s %s -> %s (%.2fs, %s byte)", label or host, method, _display_path(url),
+                 resp.status_code, elapsed, len(resp.content))
+    if resp.status_code in BLOCK_STATUSES:
+        notify_blocked(url, resp.status_code)
+    return resp
+
+
+def get(url: str, **kwargs):
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs):
+    return request("POST", url, **kwargs)
+
+
+def get_cached(url: str, parse, params: dict | None = None, headers: dict | None = None, **kwargs):
+    """
+    Koşullu GET: önbellekteki doğrulayıcılar gönderilir, 304/aynı gövdede parse atlanır.
+    Dönüş: (response, değer) — değer parse(text) sonucu ya da önbellekteki değer;
+    200/304 dışı yanıtta veya parse None döndüyse None.
+    """
+    key = response_cache.key(url, params)
+    merged = dict(headers or {})
+    if response_cache.max_entries > 0:
+        merged.update(response_cache.validators(key))
+    resp = request("GET", url, params=params, headers=merged, **kwargs)
+    if resp.status_code == 304 and not response_cache.has(key):
+        # Kayıt istek sırasında LRU'dan atılmış: 304 başarısızlık sayılmasın, doğrulayıcısız tekrar
+        resp = request("GET", url, params=params, headers=dict(headers or {}), **kwargs)
+    return resp, response_cache.resolve(key, resp.status_code, resp.headers, resp.text, parse)
+
+
+class CookieStore:
+    """
+    Tek bir site için Cookie header'ı; JSON dosyasına yazılır, yeniden başlatmada okunur.
+    - ttl saniyeden eski çerez kullanılmaz (0 = süresiz)
+    - record(ok) başarı/başarısızlık sayar; son istek başarısızsa needs_refresh() True döner
+    - Dosya sadece durum değişince (yeni çerez, başarı↔başarısızlık geçişi) ya da sayaçlar için
+      en geç STATS_SAVE_INTERVAL sn'de bir yazılır
+    - path boşsa sadece bellekte tutulur
+    """
+
+    STATS_SAVE_INTERVAL = 300
+
+    def __init__(self, path: str, ttl: float = 0, label: str = "cookie"):
+        self.path = path
+        self.ttl = ttl
+        self.label = label
+        self._lock = threading.Lock()
+        self._state = {"cookie": None, "source": None, "saved_at": 0.0,
+                       "ok": 0, "fail": 0, "last_ok": None}
+        self._written = time.monotonic()
+        if path:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self._state.update(json.load(f))
+            except (OSError, ValueError):
+                pass
+
+    def _save(self) -> None:
+        if not self.path:
+            return
+        tmp = f"{self.path}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._state, f)
+            os.replace(tmp, self.path)
+            self._written = time.monotonic()
+        except OSError as e:
+            log.warning("[COOKIE] %s deposu yazılamadı: %s", self.label, e)
+
+    def age(self) -> float | None:
+        saved_at = self._state.get("saved_at")
+        return time.time() - saved_at if self._state.get("cookie") and saved_at else None
+
+    def expired(self) -> bool:
+        age = self.age()
+        return age is None or (self.ttl > 0 and age > self.ttl)
+
+    def get(self) -> str | None:
+        """Geçerli çerez; yoksa / süresi dolmuşsa None."""
+        with self._lock:
+            return None if self.expired() else self._state["cookie"]
+
+    def set(self, cookie: str, source: str) -> bool:
+        """Yeni çerezi kaydeder (sayaçlar sıfırlanır). Aynı çerezse False."""
+        with self._lock:
+            if not cookie or (cookie == self._state["cookie"] and not self.expired()):
+                return False
+            self._state.update(cookie=cookie, source=source, saved_at=time.time(),
+                               ok=0, fail=0, last_ok=None)
+            self._save()
+        log.info("[COOKIE] %s yenilendi (kaynak=%s, len=%s)", self.label, source, len(cookie))
+        return True
+
+    def record(self, ok: bool) -> None:
+        """Çerezle yapılan isteğin sonucu (200 + dolu yanıt = başarılı)."""
+        with self._lock:
+            flipped = self._state["last_ok"] is not ok
+            self._state["ok" if ok else "fail"] += 1
+            self._state["last_ok"] = ok
+            if flipped or time.monotonic() - self._written >= self.STATS_SAVE_INTERVAL:
+                self._save()
+
+    def failed(self) -> bool:
+        """Son istek başarısız mıydı?"""
+        with self._lock:
+            return self._state.get("last_ok") is False
+
+    def needs_refresh(self) -> bool:
+        """Çerez yok, süresi dolmuş ya da son istek başarısız → tarayıcıdan yenilenmeli."""
+        with self._lock:
+            return self.expired() or self._state.get("last_ok") is False
+
+    def summary(self) -> str:
+        with self._lock:
+            ok, fail = self._state["ok"], self._state["fail"]
+            age = self.age()
+            rate = f"{ok / (ok + fail):.0%}" if ok + fail else "-"
+            return (f"kaynak={self._state['source']} yaş={age / 60:.0f}dk başarı={rate} ({ok}/{ok + fail})"
+                    if age is not None else "yok")
@@ -7,18 +7,21 @@
 # - Always-notify / edge-only + Cooldown
 # ============================
 
-import json
 import time
+PROCESS_START = time.monotonic()  # time-to-first-check ölçümü için (importlardan önce)
+
+import json
 import random
 import os
 import re
-import requests
+import queue
+import threading
 import logging
+from urllib.parse import urlsplit
 
 from dotenv import load_dotenv
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
+# NOT: selenium / requests / scraperHelpers ağır importlardır; ilk ihtiyaç anında yüklenir
+# (build_driver, helpers(), httpHelpers ilk istekte). HTTP-only yollar selenium'u hiç yüklemez.
 
 import shutil
 import platform
@@ -32,20 +35,38 @@ if 'pygame' not in sys.modules:
     sys.modules['pygame'] = pygame_stub
 # --- HOTFIX SONU ---
 
-# Helpers (Zara/Bershka/H&M/Mango/Stradivarius/Oysho/Roborock)
-try:
-    from scraperHelpers import check_stock_zara, check_stock_bershka, check_stock_hm, check_stock_mango, check_stock_stradivarius, check_stock_oysho, check_stock_hm_requests, check_stock_roborock
-except ModuleNotFoundError:
-    from scraperHelpers import check_stock_zara, check_stock_bershka, check_stock_hm, check_stock_mango, check_stock_stradivarius, check_stock_oysho, check_stock_hm_requests, check_stock_roborock
+# Helpers (Zara/Bershka/H&M/Mango/Stradivarius/Oysho/Roborock) — selenium'u da import eder
+def helpers():
+    """scraperHelpers modülü; ilk çağrıda import edilir (sonrası sys.modules'tan gelir)."""
+    import scraperHelpers
+    return scraperHelpers
+
+from driverHelpers import DriverPool, open_tabs, start_navigation, close_extra_tabs, resolve_blocked_urls, apply_blocked_urls
+from driverHelpers import page_state, mark_stale, normalize_page_load_strategy, earliest_page_load_strategy
+from driverHelpers import ProfileSlots, ping_driver, is_dead_session_error, reset_capture
+import httpHelpers
+from httpCheckers import check_stock_zara_http, check_stock_inditex_http, check_stock_shopify_http
+from httpCheckers import hm_sizes_from_availability
+import hmEngine
+from watchScheduler import WatchScheduler
+from watchRegistry import build_registry
+from restockPatterns import RestockHistory
+from storeLimiter import StoreLimiter
+from circuitBreaker import CircuitBreaker
 
 # -----------------------------
 # LOGGING
 # -----------------------------
-logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] [%(threadName)s] %(message)s")
 log = logging.getLogger(__name__)
 
-# Runtime H&M cookie cache (otomatik toplama için)
-hm_cookie_runtime: str | None = None
+# Döngü başında çekilen H&M availability JSON'ları {url: JSON} (aynı koda bağlı URL'ler aynı JSON'u paylaşır)
+hm_prefetched: dict = {}
+# H&M tam kod → API'de çalışan kod (ana ya da tam); boşa giden ikinci istek atlanır
+hm_code_memory: dict[str, str] = {}
+
+# İlk URL kararı loglandı mı? (time-to-first-check)
+first_check_logged = False
 
 # -----------------------------
 # CONFIG
@@ -53,12 +74,16 @@ hm_cookie_runtime: str | None = None
 with open("config.json", "r", encoding="utf-8") as config_file:
     config = json.load(config_file)
 
-urls_to_check     = config["urls"]
+# Aynı ürüne işaret eden girdiler tek kontrol (fetch item) altında toplanır; sonuç her watch'a dağıtılır
+urls_to_check, watches = build_registry(config["urls"])
 sleep_min_seconds = config.get("sleep_min_seconds", 30)
 sleep_max_seconds = config.get("sleep_max_seconds", 90)
 
-last_status  = {item["url"]: None for item in urls_to_check}  # YOK/VAR edge takibi
-next_allowed = {item["url"]: 0 for item in urls_to_check}     # cooldown epoch sn
+# Mağaza bazlı ayarlar: config["stores"]["default"] + config["stores"][store]
+store_config = config.get("stores", {})
+
+last_status  = {w["key"]: None for w in watches}  # YOK/VAR edge takibi (watch anahtarıyla)
+next_allowed = {w["key"]: 0 for w in watches}     # cooldown epoch sn
 
 # -----------------------------
 # ENV
@@ -75,11 +100,210 @@ TELEGRAM_DIAG = os.getenv("TELEGRAM_DIAG", "0").strip().lower() in ("1","true","
 ALWAYS_NOTIFY_ON_TRUE = os.getenv("ALWAYS_NOTIFY_ON_TRUE", "0").strip().lower() in ("1","true","yes","on")
 NOTIFY_EMPTY_RAW      = os.getenv("NOTIFY_EMPTY_RAW", "0").strip().lower() in ("1","true","yes","on")
 COOLDOWN_SECONDS      = int(os.getenv("COOLDOWN_SECONDS", "0"))
-PER_URL_DELAY         = int(os.getenv("PER_URL_DELAY", "2"))
+# Eski global bekleme: verilirse config'de rate_limit olmayan mağazalar için 1/PER_URL_DELAY jeton/sn
+PER_URL_DELAY         = float(os.getenv("PER_URL_DELAY", "0") or 0)
 REQUIRE_DOM_CONFIRM   = os.getenv("REQUIRE_DOM_CONFIRM", "1").strip().lower() in ("1","true","yes","on")
+# CDP ile görsel/font/medya/analitik isteklerini engelle (mağaza profili config["stores"] içinde)
+BLOCK_RESOURCES       = os.getenv("BLOCK_RESOURCES", "1").strip().lower() in ("1","true","yes","on")
+
+# Paralel kontrol: >1 ise URL listesi bu kadar headless Chrome'a dağıtılır
+CHECK_WORKERS         = max(1, int(os.getenv("CHECK_WORKERS", "1")))
+# Sekme pipeline: >1 ise tek Chrome'da bu kadar sekme; biri parse edilirken diğerleri yüklenir
+CHECK_TABS            = max(1, int(os.getenv("CHECK_TABS", "1")))
+
+# Driver havuzu: Chrome döngüler arasında açık kalır, limit aşılınca yeniden kurulur
+DRIVER_POOL_SIZE  = int(os.getenv("DRIVER_POOL_SIZE", str(CHECK_WORKERS)))
+DRIVER_MAX_PAGES  = int(os.getenv("DRIVER_MAX_PAGES", "150"))    # 0 = limitsiz
+DRIVER_MAX_RSS_MB = int(os.getenv("DRIVER_MAX_RSS_MB", "1500"))  # 0 = limitsiz
+
+# Sayfa yükleme stratejisi (none/eager/normal). Boşsa config["stores"] içindeki
+# page_load_strategy değerlerinin en erkeni driver'a verilir.
+PAGE_LOAD_STRATEGY = os.getenv("PAGE_LOAD_STRATEGY", "").strip().lower()
+
+# Kalıcı Chrome profili (opsiyonel): cookie/consent ve JS bundle cache'i yeniden başlatmalarda korunur
+CHROME_PROFILE_DIR    = os.getenv("CHROME_PROFILE_DIR", "").strip()          # boş = kapalı (anonim profil)
+CHROME_PROFILE_MAX_MB = int(os.getenv("CHROME_PROFILE_MAX_MB", "500"))      # aşılınca cache temizlenir, 0 = limitsiz
+CHROME_DISK_CACHE_MB  = int(os.getenv("CHROME_DISK_CACHE_MB", "200"))       # Chrome disk cache üst sınırı
+
+# Watchdog: ölü oturumda yedek driver'a geçiş + komut/sayfa zaman aşımları
+DRIVER_STANDBY          = os.getenv("DRIVER_STANDBY", "1").strip().lower() in ("1","true","yes","on")
+DRIVER_PING_TIMEOUT     = float(os.getenv("DRIVER_PING_TIMEOUT", "5"))
+DRIVER_PAGE_TIMEOUT     = int(os.getenv("DRIVER_PAGE_TIMEOUT", "45"))     # driver.get üst sınırı
+DRIVER_COMMAND_TIMEOUT  = int(os.getenv("DRIVER_COMMAND_TIMEOUT", "150"))  # asılı chromedriver'a tek komut üst sınırı
+
+# Tarayıcısız HTTP kontrolleri (mağaza JSON'u); başarısız olursa Selenium helper'ı çalışır
+HTTP_CHECKS = os.getenv("HTTP_CHECKS", "1").strip().lower() in ("1","true","yes","on")
+
+# Uyarlanabilir takvim: her URL kendi aralığıyla kontrol edilir (watchScheduler; ayarlar config["scheduler"]).
+# 0 = eski davranış: her turda tüm URL'ler + sleep_min/max_seconds arası bekleme
+ADAPTIVE_SCHEDULER = os.getenv("ADAPTIVE_SCHEDULER", "1").strip().lower() in ("1","true","yes","on")
+
+# Restock öğrenme: was=False → now=True geçişleri kaydedilir, takvim tahmin edilen saatlerde sıklaşır
+# (incelemek için: python restockPatterns.py inspect)
+RESTOCK_LEARNING     = os.getenv("RESTOCK_LEARNING", "1").strip().lower() in ("1","true","yes","on")
+RESTOCK_HISTORY_FILE = os.getenv("RESTOCK_HISTORY_FILE", ".restock_history.json").strip()  # boş = sadece bellekte
+
+# Hibrit mod: tarayıcı sadece çerez toplamak için açılır (H&M), kontroller HTTP ile yapılır;
+# tarayıcı DRIVER_PARK_AFTER sn kullanılmazsa döngü sonunda kapatılır (0 = her döngü sonunda)
+HYBRID_MODE       = os.getenv("HYBRID_MODE", "0").strip().lower() in ("1","true","yes","on")
+DRIVER_PARK_AFTER = int(os.getenv("DRIVER_PARK_AFTER", "0"))
+
+# H&M çerez deposu: diske yazılır, yeniden başlatmada korunur; TTL'den eski çerez tarayıcıdan yenilenir
+HM_COOKIE_FILE = os.getenv("HM_COOKIE_FILE", ".hm_cookies.json").strip()   # boş = sadece bellekte
+HM_COOKIE_TTL  = int(os.getenv("HM_COOKIE_TTL", str(6 * 3600)))             # sn, 0 = süresiz
+
+# H&M availability JSON'ları döngü başında çekilir; 1 = eşzamanlı (aiohttp), 0 = sırayla (requests)
+HM_ASYNC = os.getenv("HM_ASYNC", "1").strip().lower() in ("1","true","yes","on")
+
+# Devre kesici: blok sinyalleri (kısa HTML, 403/429, boş availability) art arda gelirse mağaza
+# artan cooldown boyunca atlanır (ayarlar config["stores"] "circuit_breaker")
+CIRCUIT_BREAKER = os.getenv("CIRCUIT_BREAKER", "1").strip().lower() in ("1","true","yes","on")
+# H&M bot sayfasında en fazla yeniden yükleme (blok sinyali görülmüşse hiç yenilenmez)
+HM_PAGE_RELOADS = int(os.getenv("HM_PAGE_RELOADS", "2"))
+
+# Hızlı açılış: driver yolları önbelleği + teşhisler ilk kontrolle paralel
+FAST_START         = os.getenv("FAST_START", "1").strip().lower() in ("1","true","yes","on")
+DRIVER_PATHS_CACHE = os.getenv("DRIVER_PATHS_CACHE", ".driver_paths.json").strip()  # boş = önbellek yok
+
+restock_history = RestockHistory(RESTOCK_HISTORY_FILE, config.get("restock")) if RESTOCK_LEARNING else None
+
+hm_cookies = httpHelpers.CookieStore(HM_COOKIE_FILE, HM_COOKIE_TTL, label="H&M")
+
+profile_slots = ProfileSlots(CHROME_PROFILE_DIR, CHROME_PROFILE_MAX_MB) if CHROME_PROFILE_DIR else None
 
 log.info("TELEGRAM_ENABLED: %s", TELEGRAM_ENABLED)
 
+# -----------------------------
+# MAĞAZA AYARLARI
+# -----------------------------
+def store_settings(store: str | None) -> dict:
+    """config["stores"] içinden "default" + mağazaya özel ayarları birleştirir ("h&m" → "hm")."""
+    key = "hm" if store == "h&m" else (store or "")
+    merged = dict(store_config.get("default", {}))
+    merged.update(store_config.get(key, {}))
+    return merged
+
+def store_section(store: str | None, name: str, base: dict | None = None) -> dict:
+    """config["stores"] altındaki bir bölüm (ör. "rate_limit"): base + default + mağaza, alan bazında birleşik."""
+    key = "hm" if store == "h&m" else (store or "")
+    merged = dict(base or {})
+    merged.update(store_config.get("default", {}).get(name) or {})
+    merged.update(store_config.get(key, {}).get(name) or {})
+    return merged
+
+def rate_limit_for(store: str | None) -> dict:
+    """storeLimiter ayarları; PER_URL_DELAY verilmişse varsayılan hız 1/PER_URL_DELAY."""
+    return store_section(store, "rate_limit", {"rate": 1.0 / PER_URL_DELAY} if PER_URL_DELAY > 0 else None)
+
+# Tüm tarayıcı ve HTTP yolları mağaza başına bu sınırlayıcıdan geçer
+limiter = StoreLimiter(rate_limit_for)
+
+breaker = CircuitBreaker(lambda store: store_section(store, "circuit_breaker")) if CIRCUIT_BREAKER else None
+
+def _base_domain(host: str) -> str:
+    return ".".join((host or "").lower().split(":")[0].split(".")[-2:])
+
+# Blok yanıtının (403/429) geldiği host → mağaza (config URL'lerinin alan adından)
+store_domains = {_base_domain(urlsplit(it["url"]).netloc): it.get("store") for it in urls_to_check}
+
+def note_block(store: str | None, reason: str) -> None:
+    if breaker is not None:
+        breaker.record_block(store, reason)
+
+def note_success(store: str | None) -> None:
+    if breaker is not None:
+        breaker.record_success(store)
+
+def real_product_page(driver, ready: bool | None) -> bool:
+    """
+    Bot/blok sayfası değil gerçek ürün sayfası mı yüklendi? (stok olmasa da)
+    ready: wait_page_ready sonucu; selector tanımsız mağazada HTML uzunluğuna bakılır.
+    """
+    if ready is not None:
+        return ready
+    try:
+        length = driver.execute_script(
+            "return document.documentElement ? document.documentElement.outerHTML.length : 0")
+    except Exception:
+        return False
+    return int(length or 0) >= 1000
+
+def note_page_result(driver, store: str | None, found: bool, blocked: bool, ready: bool | None) -> None:
+    """
+    Tarayıcı kontrolünün devre kesici sinyali: bot sayfası → blok; beden bulunduysa ya da gerçek ürün
+    sayfası yüklendiyse (stokta olmasa da) → başarı (yarı açık probe devreyi kapatır); diğerleri nötr.
+    """
+    if blocked:
+        note_block(store, "kısa HTML")
+    elif found or real_product_page(driver, ready):
+        note_success(store)
+
+def store_open(store: str | None) -> bool:
+    """Mağazanın devresi açık mı (cooldown sürüyor)? Tur ortasında açılan mağazanın URL'leri atlanır."""
+    return breaker is not None and breaker.is_open(store)
+
+def _on_blocked(url: str, status: int) -> None:
+    store = store_domains.get(_base_domain(urlsplit(url).netloc))
+    if store:
+        note_block(store, f"HTTP {status}")
+
+httpHelpers.add_block_listener(_on_blocked)
+
+def capture_patterns_for(store: str | None) -> list[str]:
+    """Mağazanın "capture_patterns" (URL regex): network fallback'inde sadece bunlara uyan JSON yanıtlar okunur."""
+    return list(store_settings(store).get("capture_patterns") or [])
+
+_blocked_urls_cache: dict[str, list[str]] = {}
+
+def blocked_urls_for(store: str | None) -> list[str]:
+    if not BLOCK_RESOURCES:
+        return []
+    key = store or ""
+    if key not in _blocked_urls_cache:
+        _blocked_urls_cache[key] = resolve_blocked_urls(store_settings(store).get("resource_blocking"))
+        log.info("[BLOCK] store=%s %s pattern engellenecek", key, len(_blocked_urls_cache[key]))
+    return _blocked_urls_cache[key]
+
+def page_load_strategy_for(store: str | None) -> str:
+    return normalize_page_load_strategy(store_settings(store).get("page_load_strategy"))
+
+def driver_page_load_strategy() -> str:
+    """Driver tek strateji alır: env verilmişse o, yoksa takip edilen mağazaların en erkeni."""
+    if PAGE_LOAD_STRATEGY:
+        return normalize_page_load_strategy(PAGE_LOAD_STRATEGY)
+    return earliest_page_load_strategy({page_load_strategy_for(item.get("store")) for item in urls_to_check})
+
+def wait_page_ready(driver, store: str | None) -> bool | None:
+    """
+    Mağaza hazır-olma koşulu: ready_selectors varsa yeni doküman commit olur olmaz
+    ürün/beden elementi beklenir (üçüncü parti scriptlerin bitmesi beklenmez);
+    yoksa ya da selector gelmezse mağazanın page_load_strategy seviyesi beklenir.
+    Dönüş: True = ürün/beden DOM'u göründü, False = selector gelmedi, None = mağazada selector tanımsız.
+    """
+    from selenium.webdriver.support.ui import WebDriverWait
+    settings = store_settings(store)
+    timeout = float(settings.get("ready_timeout", 20))
+    strategy = page_load_strategy_for(store)
+    ready_selectors = settings.get("ready_selectors") or []
+    started = time.monotonic()
+    if ready_selectors:
+        try:
+            WebDriverWait(driver, timeout, poll_frequency=0.1).until(page_state("none"))
+            remaining = max(0.5, timeout - (time.monotonic() - started))
+            found = helpers().wait_for_any_selector(driver, ready_selectors, remaining, f"ready.{store}")
+            if found:
+                log.info("[READY] store=%s selector=%s (%.1fs)", store, found, time.monotonic() - started)
+                return True
+            log.info("[READY] store=%s ready selector gelmedi, %s bekleniyor", store, strategy)
+        except Exception:
+            log.warning("[WARN] store=%s yeni doküman commit beklemesi zaman aşımı", store)
+    try:
+        remaining = max(1.0, timeout - (time.monotonic() - started))
+        WebDriverWait(driver, remaining, poll_frequency=0.1).until(page_state(strategy))
+    except Exception:
+        log.warning("[WARN] readyState (%s) wait timed out", strategy)
+    return False if ready_selectors else None
+
 # -----------------------------
 # TELEGRAM
 # -----------------------------
@@ -92,7 +316,7 @@ def send_telegram_message(text: str, parse_mode: str | None = None) -> bool:
     if parse_mode:
         payload["parse_mode"] = parse_mode
     try:
-        r = requests.post(url, data=payload, timeout=10)
+        r = httpHelpers.post(url, data=payload, label="Telegram")
         log.info("[TG] status=%s body=%s", r.status_code, r.text[:500])
         return r.ok
     except Exception as e:
@@ -103,9 +327,9 @@ def telegram_diag() -> None:
     if not TELEGRAM_DIAG or not TELEGRAM_ENABLED:
         return
     try:
-        me = requests.get(f"https://api.telegram.org/bot{BOT_API}/getMe", timeout=10)
+        me = httpHelpers.get(f"https://api.telegram.org/bot{BOT_API}/getMe", label="Telegram")
         log.info("[TG-DIAG] getMe %s %s", me.status_code, me.text[:500])
-        gc = requests.get(f"https://api.telegram.org/bot{BOT_API}/getChat", params={"chat_id": CHAT_ID}, timeout=10)
+        gc = httpHelpers.get(f"https://api.telegram.org/bot{BOT_API}/getChat", params={"chat_id": CHAT_ID}, label="Telegram")
         log.info("[TG-DIAG] getChat %s %s", gc.status_code, gc.text[:500])
         ok = send_telegram_message("🔔 Telegram DIAG: bot ayakta (Railway).")
         log.info("[TG-DIAG] test send ok=%s", ok)
@@ -131,41 +355,8 @@ def diag():
     log.info("[DEBUG] which chromedriver: %s", find_on_path("chromedriver"))
     log.info("=== DIAG END ===")
 
-def build_driver():
-    chrome_options = Options()
-    chrome_options.add_argument("--headless=new")
-    chrome_options.add_argument("--window-size=1920,1080")
-    chrome_options.add_argument("--disable-gpu")
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    chrome_options.add_argument("--disable-software-rasterizer")
-    chrome_options.add_argument("--remote-debugging-port=9222")
-    chrome_options.add_argument("--lang=tr-TR,tr;q=0.9,en-US;q=0.8,en;q=0.7")
-    # Güncel Chrome version (131) - daha gerçekçi
-    chrome_options.add_argument(
-        "--user-agent=Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
-        "(KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36"
-    )
-    # Anti-bot - gelişmiş
-    chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation", "enable-logging"])
-    chrome_options.add_experimental_option("useAutomationExtension", False)
-    # Daha gerçekçi görünmek için
-    chrome_options.add_argument("--disable-features=IsolateOrigins,site-per-process")
-    chrome_options.add_argument("--disable-site-isolation-trials")
-    # Performance logs for network-based fallbacks
-    try:
-        chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
-    except Exception:
-        pass
-
-    env_chrome = os.getenv("CHROME_BIN", "")
-    if env_chrome and os.path.isfile(env_chrome) and os.access(env_chrome, os.X_OK):
-        chrome_options.binary_location = env_chrome
-        log.info("[DEBUG] binary_location set: %s", env_chrome)
-
-    log.info("[DEBUG] Using SELENIUM MANAGER")
-    driver = webdriver.Chrome(options=chrome_options)
+def setup_page_cdp(driver) -> None:
+    """Anti-bot script + header CDP ayarları. Sekme (target) başına uygulanır; yeni sekmelerde tekrar çağrılmalı."""
     try:
         # Gelişmiş anti-bot: navigator ve chrome objelerini gizle
         driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {
@@ -230,9 +421,161 @@ def build_driver():
         })
     except Exception as e:
         log.warning("[DEBUG] CDP script hatası (devam ediliyor): %s", e)
-    log.info("[DEBUG] ChromeDriver READY (Selenium Manager)")
+
+def _is_executable(path: str | None) -> bool:
+    return bool(path) and os.path.isfile(path) and os.access(path, os.X_OK)
+
+_driver_paths: dict | None = None
+_driver_paths_lock = threading.Lock()
+
+def _load_driver_paths_cache() -> dict:
+    if not DRIVER_PATHS_CACHE:
+        return {}
+    try:
+        with open(DRIVER_PATHS_CACHE, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not _is_executable(cached.get("driver")):
+        return {}
+    if cached.get("browser") and not _is_executable(cached.get("browser")):
+        return {}
+    return cached
+
+def _save_driver_paths_cache(paths: dict) -> None:
+    if not DRIVER_PATHS_CACHE:
+        return
+    try:
+        with open(DRIVER_PATHS_CACHE, "w", encoding="utf-8") as f:
+            json.dump(paths, f)
+    except OSError as e:
+        log.warning("[STARTUP] driver yolu önbelleği yazılamadı: %s", e)
+
+def resolve_driver_paths(options, refresh: bool = False) -> dict:
+    """
+    chrome/chromedriver yolları: env (CHROME_BIN/CHROMEDRIVER_PATH) → önbellek dosyası → PATH
+    → Selenium Manager (son çare; ağdan sürücü indirebilir). Çözülen yollar önbelleğe yazılır.
+    Çıktı: {"driver": str|None, "browser": str|None, "source": str}
+    """
+    global _driver_paths
+    with _driver_paths_lock:
+        if _driver_paths is not None and not refresh:
+            return _driver_paths
+        env_driver = os.getenv("CHROMEDRIVER_PATH", "")
+        env_browser = os.getenv("CHROME_BIN", "")
+        paths = None
+        if _is_executable(env_driver):
+            paths = {"driver": env_driver, "browser": env_browser if _is_executable(env_browser) else None, "source": "env"}
+        if paths is None and not refresh:
+            cached = _load_driver_paths_cache()
+            if cached:
+                paths = dict(cached, source="cache")
+        if paths is None and not refresh:
+            which_driver = find_on_path("chromedriver")
+            if which_driver:
+                browser = env_browser if _is_executable(env_browser) else (
+                    find_on_path("chromium") or find_on_path("google-chrome") or find_on_path("chrome"))
+                paths = {"driver": which_driver, "browser": browser, "source": "PATH"}
+        if paths is None:
+            try:
+                from selenium.webdriver.chrome.service import Service
+                from selenium.webdriver.common.driver_finder import DriverFinder
+                finder = DriverFinder(Service(), options)
+                paths = {"driver": finder.get_driver_path(), "browser": finder.get_browser_path() or None,
+                         "source": "selenium-manager"}
+            except Exception as e:
+                log.warning("[STARTUP] Selenium Manager yol çözümü başarısız: %s", e)
+                paths = {"driver": None, "browser": None, "source": "selenium-manager"}
+        if paths["source"] in ("PATH", "selenium-manager") and paths.get("driver"):
+            _save_driver_paths_cache({"driver": paths["driver"], "browser": paths.get("browser")})
+        _driver_paths = paths
+        log.info("[STARTUP] driver yolları (%s): driver=%s browser=%s",
+                 paths["source"], paths.get("driver"), paths.get("browser"))
+        return paths
+
+def build_driver():
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+    from selenium.webdriver.remote.remote_connection import RemoteConnection
+
+    chrome_options = Options()
+    chrome_options.add_argument("--headless=new")
+    chrome_options.add_argument("--window-size=1920,1080")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--disable-software-rasterizer")
+    # Debug portunu Chrome seçer: yedek driver / replace / paralel worker'lar aynı anda
+    # birden fazla Chrome açar, sabit port (9222) çakışır
+    chrome_options.add_argument("--remote-debugging-port=0")
+    chrome_options.add_argument("--lang=tr-TR,tr;q=0.9,en-US;q=0.8,en;q=0.7")
+    # Güncel Chrome version (131) - daha gerçekçi
+    chrome_options.add_argument(
+        "--user-agent=Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36"
+    )
+    # Anti-bot - gelişmiş
+    chrome_options.add_argument("--disable-blink-features=AutomationControlled")
+    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation", "enable-logging"])
+    chrome_options.add_experimental_option("useAutomationExtension", False)
+    # Daha gerçekçi görünmek için
+    chrome_options.add_argument("--disable-features=IsolateOrigins,site-per-process")
+    chrome_options.add_argument("--disable-site-isolation-trials")
+    # driver.get'in ne zaman döneceği (hazır olma kontrolü wait_page_ready'de mağaza bazlı)
+    chrome_options.page_load_strategy = driver_page_load_strategy()
+    # Kalıcı profil: her canlı driver kendi slot dizinini kullanır
+    profile_dir = profile_slots.acquire() if profile_slots else None
+    if profile_dir:
+        chrome_options.add_argument(f"--user-data-dir={profile_dir}")
+        if CHROME_DISK_CACHE_MB > 0:
+            chrome_options.add_argument(f"--disk-cache-size={CHROME_DISK_CACHE_MB * 1024 * 1024}")
+        log.info("[PROFILE] user-data-dir=%s", profile_dir)
+
+    # Asılı chromedriver komutları sonsuza kadar beklemesin (watchdog ping/replace devreye girsin)
+    RemoteConnection.set_timeout(DRIVER_COMMAND_TIMEOUT)
+    try:
+        if FAST_START:
+            # Önbellekli yollar: Selenium Manager'a (ağ) her açılışta gidilmez
+            paths = resolve_driver_paths(chrome_options)
+            if paths.get("browser"):
+                chrome_options.binary_location = paths["browser"]
+            try:
+                driver = webdriver.Chrome(service=Service(executable_path=paths.get("driver")), options=chrome_options)
+            except Exception as e:
+                if paths["source"] not in ("cache", "PATH"):
+                    raise
+                # Chrome güncellendiyse önbellekteki chromedriver uyumsuz olabilir → yeniden çöz
+                log.warning("[STARTUP] %s yolları ile açılamadı (%s), yeniden çözülüyor", paths["source"], e)
+                paths = resolve_driver_paths(chrome_options, refresh=True)
+                if paths.get("browser"):
+                    chrome_options.binary_location = paths["browser"]
+                driver = webdriver.Chrome(service=Service(executable_path=paths.get("driver")), options=chrome_options)
+        else:
+            env_chrome = os.getenv("CHROME_BIN", "")
+            if _is_executable(env_chrome):
+                chrome_options.binary_location = env_chrome
+                log.info("[DEBUG] binary_location set: %s", env_chrome)
+            log.info("[DEBUG] Using SELENIUM MANAGER")
+            driver = webdriver.Chrome(options=chrome_options)
+    except Exception:
+        if profile_slots:
+            profile_slots.release(profile_dir)
+        raise
+    driver.profile_dir = profile_dir
+    try:
+        driver.set_page_load_timeout(DRIVER_PAGE_TIMEOUT)
+    except Exception:
+        pass
+    setup_page_cdp(driver)
+    log.info("[DEBUG] ChromeDriver READY")
     return driver
 
+def release_profile(driver) -> None:
+    """DriverPool on_discard: Chrome kapandıktan sonra profil slotunu geri ver."""
+    if profile_slots:
+        profile_slots.release(getattr(driver, "profile_dir", None))
+
 # -----------------------------
 # PARSING / FALLBACK
 # -----------------------------
@@ -273,6 +616,17 @@ def fallback_sizes_from_text(text: str) -> list[str]:
             seen.add(u); uniq.append(u)
     return uniq
 
+def enabled_sizes_from_snapshot(groups) -> list[str]:
+    """size_snapshot çıktısından aktif (disabled olmayan) buton metinleri."""
+    sizes = []
+    for group in groups or []:
+        for b in group.get("items") or []:
+            txt = (b.get("text") or "").strip() or (b.get("aria") or "").strip()
+            disabled = ("disabled" in (b.get("cls") or "")) or b.get("aria_disabled")
+            if txt and not disabled:
+                sizes.append(txt)
+    return sizes
+
 def zara_get_enabled_sizes(driver) -> list[str]:
     selectors = [
         "[data-qa='size-selector'] button",
@@ -284,28 +638,13 @@ def zara_get_enabled_sizes(driver) -> list[str]:
         "button[aria-label*='Size']",
         "button[aria-label*='Talla']",
     ]
-    sizes = []
-
     try:
         driver.execute_script("window.scrollTo(0, document.body.scrollHeight * 0.4);")
-        time.sleep(1.5)
+        helpers().wait_for_any_selector(driver, selectors, 1.5, "dom_confirm.zara")
     except Exception:
         pass
 
-    for sel in selectors:
-        try:
-            btns = driver.find_elements("css selector", sel)
-            for b in btns:
-                txt = (b.text or "").strip() or (b.get_attribute("aria-label") or "").strip()
-                cls = (b.get_attribute("class") or "").lower()
-                aria = (b.get_attribute("aria-disabled") or "").lower()
-                disabled = ("disabled" in cls) or (aria == "true")
-                if txt and not disabled:
-                    sizes.append(txt)
-        except Exception:
-            pass
-
-    return normalize_found(sizes)
+    return normalize_found(enabled_sizes_from_snapshot(helpers().size_snapshot(driver, selectors)))
 
 def extract_sizes_with_fallback(driver) -> list[str]:
     
@@ -382,29 +721,14 @@ def get_enabled_size_buttons(driver) -> list[str]:
         "button[aria-label*='Size']",
         "button[aria-label*='Talla']",
     ]
-    sizes = []
-
     try:
         # Sayfanın orta-altına kaydır
         driver.execute_script("window.scrollTo(0, document.body.scrollHeight * 0.4);")
-        time.sleep(1.5)  # bedenlerin yüklenmesini bekle
+        helpers().wait_for_any_selector(driver, selectors, 1.5, "dom_confirm.generic")  # bedenlerin yüklenmesini bekle
     except Exception:
         pass
 
-    for sel in selectors:
-        try:
-            btns = driver.find_elements("css selector", sel)
-            for b in btns:
-                txt = (b.text or "").strip() or (b.get_attribute("aria-label") or "").strip()
-                cls = (b.get_attribute("class") or "").lower()
-                aria = (b.get_attribute("aria-disabled") or "").lower()
-                disabled = ("disabled" in cls) or (aria == "true")
-                if txt and not disabled:
-                    sizes.append(txt)
-        except Exception:
-            pass
-
-    return normalize_found(sizes)
+    return normalize_found(enabled_sizes_from_snapshot(helpers().size_snapshot(driver, selectors)))
 
 
 # -----------------------------
@@ -423,8 +747,13 @@ def decide_and_notify(url: str,
                       always_notify_on_true: bool,
                       now_ts: int,
                       cooldown_seconds: int,
-                      store: str | None = None) -> bool:
-    """wanted boş DEĞİLSE: yalnızca intersection varsa bildir; wanted boşsa found boş değilse bildir."""
+                      store: str | None = None,
+                      state_key: str | None = None) -> bool:
+    """
+    wanted boş DEĞİLSE: yalnızca intersection varsa bildir; wanted boşsa found boş değilse bildir.
+    state_key: cooldown kaydının anahtarı (watch anahtarı; verilmezse url).
+    """
+    state_key = state_key or url
     w = _norm_list(wanted_sizes)
     f = _norm_list(found_sizes)
 
@@ -441,7 +770,7 @@ def decide_and_notify(url: str,
     if not now_available:
         return False
 
-    if now_ts < next_allowed.get(url, 0):
+    if now_ts < next_allowed.get(state_key, 0):
         log.info("[NOTIFY] cooldown aktif -> atlanıyor (url=%s)", url)
         return False
 
@@ -454,6 +783,8 @@ def decide_and_notify(url: str,
     # Not: f normalize edilmiş (casefold), bu yüzden 'stock' kontrol ediyoruz
     if store == "roborock" and 'stock' in f:
         msg = f"🛍️ Roborock ürünü stokta!!!!\nLink: {url}"
+    elif store == "roborock":
+        msg = f"🛍️ Roborock ürünü stokta ({', '.join(found_sizes)})!!!!\nLink: {url}"
     else:
         # Mesaj: yalnızca eşleşen bedenleri yaz (wanted varsa)
         if w:
@@ -465,8 +796,8 @@ def decide_and_notify(url: str,
     ok = send_telegram_message(msg)
 
     if ok and cooldown_seconds > 0:
-        next_allowed[url] = now_ts + cooldown_seconds
-        log.info("[NOTIFY] cooldown set: url=%s until=%s (+%ss)", url, next_allowed[url], cooldown_seconds)
+        next_allowed[state_key] = now_ts + cooldown_seconds
+        log.info("[NOTIFY] cooldown set: url=%s until=%s (+%ss)", url, next_allowed[state_key], cooldown_seconds)
     return ok
 
 # -----------------------------
@@ -486,7 +817,7 @@ def dismiss_overlays(driver):
             if els:
                 try:
                     els[0].click()
-                    time.sleep(0.4)
+                    helpers().wait_until_gone(driver, sel, 0.4, "overlay_gone")
                     log.info("[COOKIE] clicked: %s", sel)
                     break
                 except Exception:
@@ -495,289 +826,871 @@ def dismiss_overlays(driver):
             pass
 
 # -----------------------------
-# MAIN LOOP
+# URL KONTROLÜ (worker thread'lerinde paralel çalışabilir)
 # -----------------------------
-if __name__ == "__main__":
-    if TELEGRAM_TEST_ON_START and TELEGRAM_ENABLED:
-        send_telegram_message("✅ Bot çalıştı – Railway başlangıç testi.")
+# Mağaza → HTTP-only checker (url, sizes) -> list[str] | None
+def _inditex_checker(brand: str):
+    """Bershka/Stradivarius/Oysho ortak itxrest backend'i; config["stores"][brand]["inditex"] ile ayarlanır."""
+    def check(url, sizes, limiter=None):
+        return check_stock_inditex_http(brand, url, sizes, overrides=store_settings(brand).get("inditex"),
+                                        limiter=limiter)
+    return check
+
+def hm_product_codes(url: str) -> tuple[str | None, str | None]:
+    """URL'den (tam kod, ana kod). H&M API çoğu zaman 7 haneli ana kodu ister (renk/sürüm soneki olmadan)."""
+    m = re.search(r"productpage\.(\d+)", url or "")
+    if not m:
+        return None, None
+    full = m.group(1)
+    return full, full[:7] if len(full) >= 7 else full
+
+def hm_cookie() -> str | None:
+    """Geçerli H&M çerezi: depodaki (tarayıcıdan toplanan) ya da HM_COOKIE."""
+    return hm_cookies.get() or os.environ.get('HM_COOKIE') or None
+
+def harvest_hm_cookie(driver) -> bool:
+    """Açık H&M sayfasının çerezlerini depoya yazar; yeni bir çerez alındıysa True."""
+    try:
+        cookies = driver.get_cookies()
+    except Exception:
+        return False
+    harvested = "; ".join([f"{c.get('name')}={c.get('value')}" for c in cookies or [] if c.get('name') and c.get('value')])
+    return hm_cookies.set(harvested, "browser")
+
+def mint_hm_cookie(pool: DriverPool, items: list[dict]) -> bool:
+    """
+    Hibrit mod: bu turda H&M URL'i varsa ve çerez yoksa / son istek başarısızsa tarayıcıda
+    bir H&M sayfası açıp çerezi depoya yazar. Yeni çerez alındıysa True.
+    """
+    url = next((it.get("url") for it in items if it.get("store") in ("hm", "h&m")), None)
+    if not url or not (HTTP_CHECKS and store_settings("hm").get("http", True)):
+        return False
+    if hm_cookie() and not hm_cookies.failed():
+        return False
+    log.info("[HYBRID] H&M çerezi tarayıcıdan alınıyor: %s", url)
+    driver = None
+    failed = False
+    try:
+        driver = pool.acquire()
+        apply_blocked_urls(driver, blocked_urls_for("hm"))
+        mark_stale(driver)
+        with limiter.slot("hm"):
+            driver.get(url)
+        pool.note_page(driver)
+        wait_page_ready(driver, "hm")
+        dismiss_overlays(driver)
+        return harvest_hm_cookie(driver)
+    except Exception as e:
+        failed = driver is not None and bool(driver_failure(driver, e))
+        log.warning("[HYBRID] çerez alınamadı: %s", e)
+        return False
+    finally:
+        pool.release(driver, failed=failed)
+
+def hm_requests(full: str | None, base: str | None, sizes, cookie_string: str, referer: str):
+    """
+    check_stock_hm_requests'i aday kodlarla dener (çalıştığı bilinen kod varsa sadece o).
+    Dönüş: bulunan bedenler; hiçbir istek başarılı olmadıysa None.
+    """
+    codes = hm_code_candidates(full, base)
+    if full in hm_code_memory:
+        codes = codes[:1]
+    result = None
+    for code in codes:
+        # Tarayıcı kontrolünün slotu zaten tutuluyor; API isteği sadece jeton harcar
+        limiter.wait_token("hm")
+        try:
+            res = helpers().check_stock_hm_requests(code, sizes, cookie_string, referer_url=referer)
+        except Exception as _e:
+            log.warning("[H&M] requests(%s) hata: %s", code, _e)
+            res = None
+        if res is not None:
+            result = res
+            if res:
+                break
+    return result
+
+def hm_code_candidates(full: str | None, base: str | None) -> list[str]:
+    """Denenecek kodlar: önceki turlarda çalışan kod (biliniyorsa) önce, sonra ana → tam."""
+    return [c for c in dict.fromkeys((hm_code_memory.get(full), base, full)) if c]
+
+def _hm_usable(data) -> bool:
+    # Boş availability listesi yanlış kod da olabilir → sıradaki kod denenir
+    return bool(data and data.get("availability"))
+
+def prefetch_hm(items: list[dict]) -> None:
+    """
+    Bu turda kontrol edilecek H&M URL'lerinin availability JSON'unu döngü başında çeker (istek birleştirme):
+    aynı koda bağlı tüm URL'ler (renk/varyant) tek istek paylaşır, sonuç her URL'e dağıtılır;
+    beden filtresi URL bazında check_stock_hm_prefetched'de uygulanır.
+    1. tur: her URL için ilk aday kod (çalıştığı bilinen kod ya da ana kod).
+    2. tur: sadece sonuç vermeyen URL'lerin sıradaki aday kodu.
+    """
+    global hm_prefetched
+    hm_prefetched = {}
+    if not HTTP_CHECKS or not store_settings("hm").get("http", True):
+        return
+    cookie_string = hm_cookie()
+    pending = {}  # url -> (tam kod, kalan aday kodlar)
+    for item in items:
+        if item.get("store") not in ("hm", "h&m"):
+            continue
+        full, base = hm_product_codes(item.get("url"))
+        candidates = hm_code_candidates(full, base)
+        if candidates:
+            pending[item.get("url")] = (full, candidates)
+    if not pending:
+        return
+    if not cookie_string:
+        log.info("[H&M] prefetch: cookie yok – ilk tarayıcı kontrolünden sonra toplanacak")
+        return
 
-    diag()
-    telegram_diag()
+    total = len(pending)
+    fetched = {}
+    requests_made = 0
+    for _round in range(2):
+        codes = {}
+        for url, (_full, candidates) in pending.items():
+            code = next((c for c in candidates if c not in fetched), None)
+            if code:
+                codes.setdefault(code, url)
+        if not codes:
+            break
+        try:
+            fetched.update(hmEngine.fetch_availability(codes, cookie_string, use_async=HM_ASYNC,
+                                                       limiter=limiter))
+        except Exception as e:
+            log.warning("[H&M] prefetch hata: %s", e)
+            break
+        requests_made += len(codes)
+        for url, (full, candidates) in list(pending.items()):
+            code = next((c for c in candidates if _hm_usable(fetched.get(c))), None)
+            if code:
+                hm_prefetched[url] = fetched[code]
+                hm_code_memory[full] = code
+                del pending[url]
+            elif all(c in fetched for c in candidates):
+                # Hiçbir kod çalışmadı: hafıza sıfırlanır, sonraki tur yine ana koddan başlar
+                hm_code_memory.pop(full, None)
+                del pending[url]
+    log.info("[H&M] prefetch: %s URL → %s istek, %s URL çözüldü",
+             total, requests_made, len(hm_prefetched))
+    if requests_made:
+        # Hiçbir URL çözülemediyse çerez başarısız sayılır → ilk H&M sayfasında yenilenir
+        hm_cookies.record(bool(hm_prefetched))
+        if hm_prefetched:
+            note_success("hm")
+        else:
+            note_block("hm", "boş availability JSON")
+        log.info("[H&M] çerez: %s", hm_cookies.summary() if hm_cookies.get() else "HM_COOKIE (ortam)")
+
+def check_stock_hm_prefetched(url, sizes):
+    """Döngü başında çekilen JSON'dan bedenler; veri yoksa None (tarayıcı/cookie yolu)."""
+    data = hm_prefetched.get(url)
+    if data is None:
+        return None
+    return hm_sizes_from_availability(data, sizes)
+
+def _limited(store: str, checker):
+    """
+    Ağa çıkan HTTP checker'ı mağazanın slotuyla sarar; jeton checker içinde her giden istek
+    için harcanır (Inditex: ürün sayfası + detail + stock).
+    """
+    def run(url, sizes):
+        waited = limiter.enter(store)
+        if waited >= 0.05:
+            log.info("[LIMIT] store=%s %.2fs beklendi", store, waited)
+        try:
+            return checker(url, sizes, limiter=limiter)
+        finally:
+            limiter.release(store)
+    return run
+
+# H&M: istekler prefetch_hm'de (hmEngine) sınırlayıcıdan geçer; buradaki checker ağa çıkmaz
+HTTP_CHECKERS = {
+    "zara": _limited("zara", check_stock_zara_http),
+    "hm": check_stock_hm_prefetched,
+    "h&m": check_stock_hm_prefetched,
+    "bershka": _limited("bershka", _inditex_checker("bershka")),
+    "stradivarius": _limited("stradivarius", _inditex_checker("stradivarius")),
+    "oysho": _limited("oysho", _inditex_checker("oysho")),
+    # ===== GEÇİCİ: ROBOROCK DESTEĞİ (Shopify JSON) =====
+    "roborock": _limited("roborock", check_stock_shopify_http),
+}
+
+def check_http(item) -> dict | None:
+    """
+    HTTP-only kontrol (driver gerekmez). Sonuç check_item ile aynı biçimde;
+    checker yoksa/kapalıysa ya da None döndüyse None → tarayıcı yoluna düşülür.
+    Mağaza config'inde "http": false ile kapatılabilir.
+    """
+    store = item.get("store")
+    checker = HTTP_CHECKERS.get(store)
+    if not HTTP_CHECKS or checker is None or not store_settings(store).get("http", True):
+        return None
+    started = time.monotonic()
+    try:
+        raw = checker(item.get("url"), item.get("sizes", []))
+    except Exception as e:
+        log.warning("[HTTP] store=%s beklenmeyen hata: %s", store, e)
+        raw = None
+    if raw is None:
+        log.info("[HTTP] store=%s sonuç yok (%.2fs) → tarayıcı yolu", store, time.monotonic() - started)
+        return None
+    # Roborock: varyant adları beden token'ı değildir (normalize_found ilk kelimeyi alır)
+    note_success(store)
+    found_sizes = list(raw) if store == "roborock" else normalize_found(raw)
+    log.info("[HTTP] store=%s found=%s (%.2fs)", store, found_sizes, time.monotonic() - started)
+    return {"found_sizes": found_sizes, "enabled_dom_sizes": [], "indeterminate": False}
+
+def check_item(driver, item, pool=None, navigate: bool = True) -> dict | None:
+    """
+    Tek URL'i driver üzerinde kontrol eder; karar/bildirim YAPMAZ.
+    Çıktı : {"found_sizes", "enabled_dom_sizes", "indeterminate"} ya da bilinmeyen mağazada None.
+    Not   : last_status/next_allowed'a dokunmaz, böylece paralel worker'lardan güvenle çağrılabilir.
+            navigate=False: sayfa aktif sekmede zaten yükleniyor (sekme pipeline), sadece beklenir.
+    """
+    url   = item.get("url")
+    store = item.get("store")
+    sizes = item.get("sizes", [])  # takip edilen bedenler (boş=herhangi)
+    hm_indeterminate = False
+    variants_unresolved = False   # Roborock varyant listesi tarayıcıda çözülemedi
+
+    if navigate:
+        apply_blocked_urls(driver, blocked_urls_for(store))
+        # eager/none stratejide driver.get erken döner; eski sayfa "hazır" sanılmasın
+        mark_stale(driver)
+        # Önceki sayfanın yakalanan yanıtları bu ürüne karışmasın; yakalama sadece pattern'i olan mağazada açık
+        reset_capture(driver, patterns=capture_patterns_for(store))
+        driver.get(url)
+        if pool is not None:
+            pool.note_page(driver)
+
+    page_ready = wait_page_ready(driver, store)
+    dismiss_overlays(driver)
+
+    # 1) Helpers (birincil)
+    if store == "zara":
+        raw = helpers().check_stock_zara(driver, sizes)
+    elif store == "bershka":
+        raw = helpers().check_stock_bershka(driver, sizes)
+    # ===== GEÇİCİ: ROBOROCK DESTEĞİ (KOLAYCA KALDIRILABİLİR) =====
+    elif store == "roborock":
+        if sizes:
+            # Varyant watch'ı: buton sadece seçili varyantı gösterir → ürün JSON'u sayfadan okunur
+            raw = helpers().check_stock_roborock_variants(driver, sizes, limiter=limiter)
+            if raw is None:
+                variants_unresolved = True
+                log.warning("[Roborock] varyantlar (%s) tarayıcıda çözülemedi → bildirim atlanıyor, "
+                            "önceki durum korunuyor: %s", sizes, url)
+        else:
+            raw = helpers().check_stock_roborock(driver, sizes)
+    # ===== ROBOROCK SONU =====
+    elif store == "hm" or store == "h&m":
+        product_code_full, product_code_base = hm_product_codes(url)
+
+        # Çerez deposu: sadece yoksa / süresi dolduysa / son istek başarısızsa sayfadan yenilenir
+        if hm_cookies.needs_refresh():
+            harvest_hm_cookie(driver)
+        cookie_string = hm_cookie()
+
+        raw = []
+        # Önce requests fallback: cookie + ürün kodu varsa dene
+        tried_requests = False
+        if cookie_string and (product_code_base or product_code_full):
+            tried_requests = True
+            log.info("[H&M] Requests fallback denenecek: full=%s base=%s cookie_len=%s",
+                     product_code_full, product_code_base, len(cookie_string))
+            res = hm_requests(product_code_full, product_code_base, sizes, cookie_string, url)
+            # İstek başarısız (HTTP hatası / boş yanıt) ve sayfadan farklı çerez alınabildiyse bir kez daha
+            if res is None and harvest_hm_cookie(driver):
+                cookie_string = hm_cookie()
+                log.info("[H&M] Retry with freshly harvested cookie (len=%s)", len(cookie_string or ""))
+                res = hm_requests(product_code_full, product_code_base, sizes, cookie_string, url)
+            hm_cookies.record(res is not None)
+            raw = res or []
+            log.info("[H&M] Requests fallback sonucu: %s", raw)
+
+            # Eğer requests boş ise ve sayfa HTML çok kısa ise, muhtemelen bloklandık → indeterminate
+            try:
+                page_len = len(driver.page_source)
+            except Exception:
+                page_len = 0
+            if not raw and page_len and page_len < 1000:
+                hm_indeterminate = True
+                log.info("[H&M] Indeterminate durum: HTML çok kısa (%s) ve requests boş", page_len)
+        else:
+            # Cookie yoksa bile sayfa kontrolü yap
+            try:
+                page_len = len(driver.page_source)
+                if page_len < 1000:
+                    hm_indeterminate = True
+                    log.info("[H&M] Indeterminate: Cookie yok ve HTML kısa (%s)", page_len)
+            except Exception:
+                pass
+
+        # Requests boş dönerse DOM helper'a düş
+        if not raw:
+            if not cookie_string:
+                log.warning("[H&M] Çerez yok (HM_COOKIE boş, sayfadan alınamadı) – sadece DOM denenecek")
+            if not (product_code_full or product_code_base):
+                log.warning("[H&M] URL'den ürün kodu çıkarılamadı – sadece DOM denenecek: %s", url)
+            if tried_requests:
+                log.info("[H&M] Requests sonuç vermedi, DOM helper'a düşülüyor")
+            # Blok sinyali görülmüşse bot sayfasını yenilemekle vakit harcanmaz
+            reloads = 0 if breaker is not None and breaker.suspect("hm") else HM_PAGE_RELOADS
+            raw = helpers().check_stock_hm(driver, sizes, max_reloads=reloads,
+                                           capture_patterns=capture_patterns_for(store), limiter=limiter)
+    elif store == "mango":
+        raw = helpers().check_stock_mango(driver, sizes)
+    elif store == "stradivarius":
+        raw = helpers().check_stock_stradivarius(driver, sizes)
+    elif store == "oysho":
+        raw = helpers().check_stock_oysho(driver, sizes)
+    else:
+        log.warning("Unknown store, skipping: %s", store)
+        return None
+
+    if raw is None:
+        log.warning("[SCRAPER] helper returned None (error-like), treating as empty")
+        raw = []
+    # Devre kesici: boş sonuç tek başına başarı sayılmaz (hata ya da bot sayfası olabilir);
+    # sayfanın gerçek ürün sayfası olup olmadığına ayrıca bakılır (note_page_result)
+    helper_data = bool(raw)
+
+    # Roborock varyant adları beden token'ı değildir (normalize_found ilk kelimeyi alır)
+    found_sizes = list(raw) if store == "roborock" and sizes else normalize_found(raw)
+    log.info("[SCRAPER RAW] store=%s found=%s", store, found_sizes)
+
+    # Roborock özel: ['STOCK'] döndüyse stok var demektir (beden yok, tek ürün)
+    if store == "roborock" and not sizes:
+        if 'STOCK' in found_sizes:
+            found_sizes = ['STOCK']  # Tek ürün, beden yok
+            log.info("[Roborock] Stok VAR tespit edildi")
+        else:
+            found_sizes = []  # Stok yok
+            log.info("[Roborock] Stok YOK tespit edildi")
 
-    while True:
-        driver = build_driver()
+    # H&M özel: DOM scraper boş döndüyse ve HTML kısa ise indeterminate
+    if store in ["hm", "h&m"] and not found_sizes:
         try:
-            for item in urls_to_check:
-                url   = item.get("url")
-                store = item.get("store")
-                sizes = item.get("sizes", [])  # takip edilen bedenler (boş=herhangi)
+            page_len = len(driver.page_source)
+            if page_len < 1000:
+                hm_indeterminate = True
+                log.info("[H&M] Indeterminate: DOM scraper boş, HTML kısa (%s)", page_len)
+        except Exception:
+            pass
+
+    # 2) DOM teyidi (REQUIRE_DOM_CONFIRM kontrolü ile)
+    # NOT: H&M, Mango ve Roborock için DOM-CONFIRM atlanıyor çünkü özel scraper fonksiyonları zaten doğru çalışıyor
+    enabled_dom_sizes = []
+    if REQUIRE_DOM_CONFIRM:
+        if store == "zara":
+            enabled_dom_sizes = zara_get_enabled_sizes(driver)
+        elif store == "bershka":
+            # Bershka için dom kontrolü için aynı genel fonksiyonu kullan
+            enabled_dom_sizes = get_enabled_size_buttons(driver)
+        elif store == "roborock":
+            # Roborock için DOM-CONFIRM kullanma - beden yok, tek ürün
+            log.info("[DOM-CONFIRM] Roborock için DOM-CONFIRM atlanıyor (beden yok, tek ürün)")
+            enabled_dom_sizes = []  # Boş liste = filtreleme yok
+        elif store in ["hm", "h&m"]:
+            # H&M için DOM-CONFIRM kullanma - özel scraper fonksiyonu zaten doğru çalışıyor
+            log.info("[DOM-CONFIRM] H&M için DOM-CONFIRM atlanıyor (özel scraper kullanılıyor)")
+            enabled_dom_sizes = []  # Boş liste = filtreleme yok
+        else:
+            enabled_dom_sizes = get_enabled_size_buttons(driver)
+    
+        log.info("[DOM-CONFIRM] enabled_dom_sizes=%s", enabled_dom_sizes)
+    
+        # DOM'da aktif beden varsa, helpers sonucunu filtrele
+        if enabled_dom_sizes:
+            upper_dom = {x.upper() for x in enabled_dom_sizes}
+            found_sizes = [s for s in found_sizes if s.upper() in upper_dom]
+            log.info("[DOM-CONFIRM] Filtrelenmiş found_sizes=%s", found_sizes)
+        else:
+            log.info("[DOM-CONFIRM] enabled_dom_sizes boş - filtreleme yok, scraper sonucu doğrudan kullanılıyor")
 
-                log.info("--------------------------------")
-                log.info("[DEBUG] GET %s / Sizes=%s", url, sizes)
+    # 3) Fallback TAMAMEN KAPALI - Sadece helpers'a güveniyoruz
+    # JSON fallback yanlış pozitif riski çok yüksek, artık kullanmıyoruz
 
-                try:
-                    driver.get(url)
-                    dismiss_overlays(driver)
-
-                    try:
-                        WebDriverWait(driver, 20).until(
-                            lambda d: d.execute_script("return document.readyState") == "complete"
-                        )
-                    except Exception:
-                        log.warning("[WARN] readyState wait timed out")
-
-                    # 1) Helpers (birincil)
-                    if store == "zara":
-                        raw = check_stock_zara(driver, sizes)
-                    elif store == "bershka":
-                        raw = check_stock_bershka(driver, sizes)
-                    # ===== GEÇİCİ: ROBOROCK DESTEĞİ (KOLAYCA KALDIRILABİLİR) =====
-                    elif store == "roborock":
-                        raw = check_stock_roborock(driver, sizes)
-                    # ===== ROBOROCK SONU =====
-                    elif store == "hm" or store == "h&m":
-                        cookie_string = os.environ.get('HM_COOKIE') or hm_cookie_runtime
-                        product_code_full = None
-                        try:
-                            m = re.search(r"productpage\.(\d+)", url)
-                            if m:
-                                product_code_full = m.group(1)
-                        except Exception:
-                            pass
-
-                        # H&M API çoğu zaman 7 haneli ana ürün kodunu ister (renk/sürüm soneki olmadan)
-                        product_code_base = None
-                        if product_code_full:
-                            # 7+ haneliyse ilk 7 haneyi ana kod olarak dene
-                            if len(product_code_full) >= 7:
-                                product_code_base = product_code_full[:7]
-                            else:
-                                product_code_base = product_code_full
-
-                        raw = []
-                        hm_indeterminate = False
-                        # Eğer env cookie boşsa, sayfadan otomatik cookie topla (tek sefer)
-                        try:
-                            # Driver zaten bu URL'i açmış durumda; mevcut çerezleri alalım
-                            cookies = driver.get_cookies()
-                            if cookies:
-                                harvested = "; ".join([f"{c.get('name')}={c.get('value')}" for c in cookies if c.get('name') and c.get('value')])
-                                if harvested and (not cookie_string or len(harvested) > len(cookie_string)):
-                                    cookie_string = harvested
-                                    hm_cookie_runtime = harvested  # sonraki turlarda kullan
-                                    log.info("[H&M] Runtime cookie harvested (len=%s)", len(harvested))
-                        except Exception:
-                            pass
-                        # Önce requests fallback: cookie + ürün kodu varsa dene
-                        tried_requests = False
-                        if cookie_string and (product_code_base or product_code_full):
-                            tried_requests = True
-                            log.info("[H&M] Requests fallback denenecek: full=%s base=%s cookie_len=%s",
-                                     product_code_full, product_code_base, len(cookie_string))
-                            # 1) Ana kod ile dene
-                            if product_code_base:
-                                try:
-                                    res1 = check_stock_hm_requests(product_code_base, sizes, cookie_string, referer_url=url)
-                                except Exception as _e:
-                                    log.warning("[H&M] requests(base) hata: %s", _e)
-                                    res1 = []
-                            else:
-                                res1 = []
-                            # 2) Ana boşsa tam kodu da dene
-                            if not res1 and product_code_full and product_code_full != product_code_base:
-                                try:
-                                    res2 = check_stock_hm_requests(product_code_full, sizes, cookie_string, referer_url=url)
-                                except Exception as _e:
-                                    log.warning("[H&M] requests(full) hata: %s", _e)
-                                    res2 = []
-                            else:
-                                res2 = []
-
-                            raw = res1 or res2 or []
-                            log.info("[H&M] Requests fallback sonucu: %s", raw)
-
-                            # Eğer requests boş ise ve sayfa HTML çok kısa ise, muhtemelen bloklandık → indeterminate
-                            try:
-                                page_len = len(driver.page_source)
-                            except Exception:
-                                page_len = 0
-                            if not raw and page_len and page_len < 1000:
-                                hm_indeterminate = True
-                                log.info("[H&M] Indeterminate durum: HTML çok kısa (%s) ve requests boş", page_len)
-                        else:
-                            # Cookie yoksa bile sayfa kontrolü yap
-                            try:
-                                page_len = len(driver.page_source)
-                                if page_len < 1000:
-                                    hm_indeterminate = True
-                                    log.info("[H&M] Indeterminate: Cookie yok ve HTML kısa (%s)", page_len)
-                            except Exception:
-                                pass
-
-                            # Requests boş dönerse ve farklı cookie toplayabildiysek bir kez daha dene
-                            if not raw:
-                                try:
-                                    cookies2 = driver.get_cookies()
-                                    harvested2 = "; ".join([f"{c.get('name')}={c.get('value')}" for c in cookies2 if c.get('name') and c.get('value')])
-                                    if harvested2 and harvested2 != cookie_string:
-                                        log.info("[H&M] Retry with freshly harvested cookie (len=%s)", len(harvested2))
-                                        cookie_string = harvested2
-                                        hm_cookie_runtime = harvested2
-                                        # base → full tekrar dene
-                                        retry1 = check_stock_hm_requests(product_code_base or product_code_full, sizes, cookie_string, referer_url=url)
-                                        if not retry1 and product_code_full and product_code_full != (product_code_base or ""):
-                                            retry2 = check_stock_hm_requests(product_code_full, sizes, cookie_string, referer_url=url)
-                                        else:
-                                            retry2 = []
-                                        raw = retry1 or retry2 or []
-                                        log.info("[H&M] Requests retry sonucu: %s", raw)
-                                except Exception:
-                                    pass
-
-                        # Requests boş dönerse DOM helper'a düş
-                        if not raw:
-                            if not cookie_string:
-                                log.warning("[H&M] HM_COOKIE ortam değişkeni boş – sadece DOM denenecek")
-                            if not (product_code_full or product_code_base):
-                                log.warning("[H&M] URL'den ürün kodu çıkarılamadı – sadece DOM denenecek: %s", url)
-                            if tried_requests:
-                                log.info("[H&M] Requests sonuç vermedi, DOM helper'a düşülüyor")
-                            raw = check_stock_hm(driver, sizes)
-                    elif store == "mango":
-                        raw = check_stock_mango(driver, sizes)
-                    elif store == "stradivarius":
-                        raw = check_stock_stradivarius(driver, sizes)
-                    elif store == "oysho":
-                        raw = check_stock_oysho(driver, sizes)
-                    else:
-                        log.warning("Unknown store, skipping: %s", store)
-                        continue
-
-                    if raw is None:
-                        log.warning("[SCRAPER] helper returned None (error-like), treating as empty")
-                        raw = []
-
-                    found_sizes = normalize_found(raw)
-                    log.info("[SCRAPER RAW] store=%s found=%s", store, found_sizes)
-                    
-                    # Roborock özel: ['STOCK'] döndüyse stok var demektir (beden yok, tek ürün)
-                    if store == "roborock":
-                        if 'STOCK' in found_sizes:
-                            found_sizes = ['STOCK']  # Tek ürün, beden yok
-                            log.info("[Roborock] Stok VAR tespit edildi")
-                        else:
-                            found_sizes = []  # Stok yok
-                            log.info("[Roborock] Stok YOK tespit edildi")
-                    
-                    # H&M özel: DOM scraper boş döndüyse ve HTML kısa ise indeterminate
-                    if store in ["hm", "h&m"] and not found_sizes:
-                        try:
-                            page_len = len(driver.page_source)
-                            if page_len < 1000:
-                                hm_indeterminate = True
-                                log.info("[H&M] Indeterminate: DOM scraper boş, HTML kısa (%s)", page_len)
-                        except Exception:
-                            pass
-                    
-                    # 2) DOM teyidi (REQUIRE_DOM_CONFIRM kontrolü ile)
-                    # NOT: H&M, Mango ve Roborock için DOM-CONFIRM atlanıyor çünkü özel scraper fonksiyonları zaten doğru çalışıyor
-                    enabled_dom_sizes = []
-                    if REQUIRE_DOM_CONFIRM:
-                        if store == "zara":
-                            enabled_dom_sizes = zara_get_enabled_sizes(driver)
-                        elif store == "bershka":
-                            # Bershka için dom kontrolü için aynı genel fonksiyonu kullan
-                            enabled_dom_sizes = get_enabled_size_buttons(driver)
-                        elif store == "roborock":
-                            # Roborock için DOM-CONFIRM kullanma - beden yok, tek ürün
-                            log.info("[DOM-CONFIRM] Roborock için DOM-CONFIRM atlanıyor (beden yok, tek ürün)")
-                            enabled_dom_sizes = []  # Boş liste = filtreleme yok
-                        elif store in ["hm", "h&m"]:
-                            # H&M için DOM-CONFIRM kullanma - özel scraper fonksiyonu zaten doğru çalışıyor
-                            log.info("[DOM-CONFIRM] H&M için DOM-CONFIRM atlanıyor (özel scraper kullanılıyor)")
-                            enabled_dom_sizes = []  # Boş liste = filtreleme yok
-                        else:
-                            enabled_dom_sizes = get_enabled_size_buttons(driver)
-                        
-                        log.info("[DOM-CONFIRM] enabled_dom_sizes=%s", enabled_dom_sizes)
-                        
-                        # DOM'da aktif beden varsa, helpers sonucunu filtrele
-                        if enabled_dom_sizes:
-                            upper_dom = {x.upper() for x in enabled_dom_sizes}
-                            found_sizes = [s for s in found_sizes if s.upper() in upper_dom]
-                            log.info("[DOM-CONFIRM] Filtrelenmiş found_sizes=%s", found_sizes)
-                        else:
-                            log.info("[DOM-CONFIRM] enabled_dom_sizes boş - filtreleme yok, scraper sonucu doğrudan kullanılıyor")
-
-                    # 3) Fallback TAMAMEN KAPALI - Sadece helpers'a güveniyoruz
-                    # JSON fallback yanlış pozitif riski çok yüksek, artık kullanmıyoruz
-
-                    # 4) Durum belirleme ve loglama
-                    was_in_stock = last_status.get(url)
-                    
-                    # Eşleşen bedenleri hesapla
-                    # Roborock özel: beden yok, 'STOCK' varsa matched = ['STOCK']
-                    if store == "roborock":
-                        if 'STOCK' in found_sizes:
-                            matched = ['STOCK']
-                        else:
-                            matched = []
-                    # Diğer mağazalar: Eğer wanted_sizes varsa, sadece onlarla eşleşenleri kullan
-                    elif sizes:
-                        upper_sizes = {s.upper() for s in sizes}
-                        matched = [s for s in found_sizes if s.upper() in upper_sizes]
-                    else:
-                        matched = found_sizes[:]
-                    
-                    # H&M özel: indeterminate ise önceki durumu koru (false negative engelle)
-                    if store in ["hm", "h&m"] and 'hm_indeterminate' in locals() and hm_indeterminate:
-                        currently_in_stock = bool(was_in_stock)
-                        log.info("[H&M] Indeterminate -> was=%s korunuyor", was_in_stock)
-                    else:
-                        currently_in_stock = bool(matched)
-                    
-                    log.info("[FINAL] wanted_sizes=%s", sizes)
-                    log.info("[FINAL] found_sizes=%s", found_sizes)
-                    log.info("[FINAL] enabled_dom_sizes=%s", enabled_dom_sizes)
-                    log.info("[FINAL] matched=%s", matched)
-                    log.info("[FINAL] was=%s now=%s", was_in_stock, currently_in_stock)
-
-                    # 5) Opsiyonel uyarı (helpers boşsa)
-                    now_ts = int(time.time())
-                    if NOTIFY_EMPTY_RAW and not found_sizes:
-                        send_telegram_message(f"⚠️ Parser boş döndü (muhtemel DOM değişimi):\n{url}")
-
-                    # 6) Bildirim kararı
-                    sent = decide_and_notify(
-                        url=url,
-                        wanted_sizes=sizes,
-                        found_sizes=matched,  # Her zaman matched kullan
-                        was_available=was_in_stock,
-                        always_notify_on_true=ALWAYS_NOTIFY_ON_TRUE,
-                        now_ts=now_ts,
-                        cooldown_seconds=COOLDOWN_SECONDS,
-                        store=store  # Roborock için özel mesaj için
-                    )
-
-                    # 7) Durum güncelle
-                    last_status[url] = currently_in_stock
-                    
-                    if not currently_in_stock and not (store in ["hm","h&m"] and 'hm_indeterminate' in locals() and hm_indeterminate):
-                        log.info("No stock for %s @ %s", (', '.join(sizes) if sizes else '(any)'), url)
+    # Devre kesici: H&M bot sayfası (kısa HTML) blok sinyali; veri ya da gerçek ürün sayfası başarı
+    note_page_result(driver, store, helper_data, store in ["hm", "h&m"] and hm_indeterminate, page_ready)
 
-                except Exception as e:
-                    log.exception("[ERROR] URL %s hata: %s", url, e)
+    return {
+        "found_sizes": found_sizes,
+        "enabled_dom_sizes": enabled_dom_sizes,
+        "indeterminate": (store in ["hm", "h&m"] and hm_indeterminate) or variants_unresolved,
+    }
 
-                log.info("[DEBUG] Per-URL delay: %ss", PER_URL_DELAY)
-                time.sleep(PER_URL_DELAY)
+# -----------------------------
+# KARAR AŞAMASI (tek thread: last_status/next_allowed tutarlı kalır)
+# -----------------------------
+def apply_results(item: dict, result: dict) -> None:
+    """
+    Kontrol sonucunu fetch item'ının tüm watch'larına dağıtır (her biri kendi bedenleri ve durumuyla).
+    Watch'lardan biri YOK → VAR olduysa ürün için tek restock olayı kaydedilir.
+    """
+    restocked = False
+    for watch in item.get("watches") or [item]:
+        was = last_status.get(watch.get("key") or watch.get("url"))
+        now = apply_result(watch, result)
+        restocked = restocked or (was is False and now)
+    if restocked and restock_history is not None:
+        restock_history.record(item.get("store"), item.get("canonical") or item.get("url"))
+
+def apply_result(item: dict, result: dict) -> bool:
+    """check_item sonucunu tek watch için karar ve bildirim aşamasına uygular; güncel stok durumunu döndürür."""
+    global first_check_logged
+    if not first_check_logged:
+        first_check_logged = True
+        log.info("[STARTUP] time-to-first-check: %.1fs (süreç başlangıcından ilk karara)",
+                 time.monotonic() - PROCESS_START)
+    # 4) Durum belirleme ve loglama
+    url   = item.get("url")
+    store = item.get("store")
+    sizes = item.get("sizes", [])
+    found_sizes       = result["found_sizes"]
+    enabled_dom_sizes = result["enabled_dom_sizes"]
+    indeterminate     = result["indeterminate"]
+    key               = item.get("key") or url
+
+    was_in_stock = last_status.get(key)
+
+    # Eşleşen bedenleri hesapla
+    # Roborock özel: varyant seçilmemişse beden yok, 'STOCK' varsa matched = ['STOCK']
+    # (varyant listesi verildiyse aşağıdaki genel eşleşme varyant adlarıyla çalışır)
+    if store == "roborock" and not sizes:
+        if 'STOCK' in found_sizes:
+            matched = ['STOCK']
+        else:
+            matched = []
+    # Diğer mağazalar: Eğer wanted_sizes varsa, sadece onlarla eşleşenleri kullan
+    elif sizes:
+        upper_sizes = {s.upper() for s in sizes}
+        matched = [s for s in found_sizes if s.upper() in upper_sizes]
+    else:
+        matched = found_sizes[:]
+
+    # Indeterminate (H&M bot sayfası / Roborock varyantı çözülemedi): önceki durumu koru
+    # (false negative engelle) ve bildirme
+    if indeterminate:
+        matched = []
+        currently_in_stock = bool(was_in_stock)
+        log.info("[%s] Indeterminate -> was=%s korunuyor", store, was_in_stock)
+    else:
+        currently_in_stock = bool(matched)
+
+    log.info("[FINAL] wanted_sizes=%s", sizes)
+    log.info("[FINAL] found_sizes=%s", found_sizes)
+    log.info("[FINAL] enabled_dom_sizes=%s", enabled_dom_sizes)
+    log.info("[FINAL] matched=%s", matched)
+    log.info("[FINAL] was=%s now=%s", was_in_stock, currently_in_stock)
+
+    # 5) Opsiyonel uyarı (helpers boşsa)
+    now_ts = int(time.time())
+    if NOTIFY_EMPTY_RAW and not found_sizes:
+        send_telegram_message(f"⚠️ Parser boş döndü (muhtemel DOM değişimi):\n{url}")
+
+    # 6) Bildirim kararı
+    decide_and_notify(
+        url=url,
+        wanted_sizes=sizes,
+        found_sizes=matched,  # Her zaman matched kullan
+        was_available=was_in_stock,
+        always_notify_on_true=ALWAYS_NOTIFY_ON_TRUE,
+        now_ts=now_ts,
+        cooldown_seconds=COOLDOWN_SECONDS,
+        store=store,  # Roborock için özel mesaj için
+        state_key=key,
+    )
+
+    # 7) Durum güncelle
+    last_status[key] = currently_in_stock
+
+    if not currently_in_stock and not indeterminate:
+        log.info("No stock for %s @ %s", (', '.join(sizes) if sizes else '(any)'), url)
+    return currently_in_stock
+
+# -----------------------------
+# DÖNGÜ ÇALIŞTIRICILARI
+# -----------------------------
+def driver_failure(driver, exc: BaseException | None = None) -> str | None:
+    """Driver değiştirilmeli mi? Ölü oturum hatası ya da zaman aşımına uğrayan ping → sebep."""
+    if exc is not None and is_dead_session_error(exc):
+        return f"ölü oturum ({type(exc).__name__})"
+    if not ping_driver(driver, timeout=DRIVER_PING_TIMEOUT):
+        return "ping zaman aşımı"
+    return None
+
+def replace_driver(pool: DriverPool, driver, reason: str):
+    """pool.replace; yeni driver kurulamazsa None (eski driver kapatılmıştır, sıradaki URL yeniden acquire eder)."""
+    try:
+        return pool.replace(driver, reason)
+    except Exception as e:
+        log.error("[WATCHDOG] yeni driver kurulamadı (%s): %s", reason, e)
+        return None
+
+def check_supervised(pool: DriverPool, driver, item, navigate: bool = True):
+    """
+    check_item'i watchdog ile çalıştırır. Çıktı: (driver, result) — driver değişmiş (kurulamadıysa None) olabilir.
+      - Ölü oturum / asılı chromedriver → yedek driver'a geç, URL'i bir kez daha dene
+      - Helper'lar hataları yutup [] döndürdüğü için boş sonuçta da ping atılır
+      - Başarılı kontrolden sonra RSS tavanı aşıldıysa driver değiştirilir (tekrar deneme yok)
+    Her deneme mağazanın sınırlayıcı slotunu tutar (sayfa yükleme + parse).
+    """
+    for attempt in range(2):
+        try:
+            with limiter.slot(item.get("store")):
+                result = check_item(driver, item, pool, navigate=navigate or attempt > 0)
+        except Exception as e:
+            reason = driver_failure(driver, e)
+            if not reason:
+                raise
+            result = None
+        else:
+            reason = None
+            if result is not None and not result.get("found_sizes"):
+                reason = driver_failure(driver)
+        if not reason:
+            break
+        log.warning("[WATCHDOG] %s: %s → driver değiştiriliyor%s", item.get("url"), reason,
+                    ", URL tekrar denenecek" if attempt == 0 else "")
+        driver = replace_driver(pool, driver, reason)
+        if driver is None:
+            return None, None
+    else:
+        log.error("[WATCHDOG] %s yeni driver ile de kontrol edilemedi", item.get("url"))
+        return driver, None
 
+    memory = pool.memory_reason(driver)
+    if memory:
+        driver = replace_driver(pool, driver, memory)
+    return driver, result
+
+def run_cycle_serial(pool: DriverPool, items: list[dict]) -> None:
+    """URL'leri tek driver ile sırayla kontrol eder (driver ilk tarayıcı gereken URL'de alınır)."""
+    driver = None
+    try:
+        for item in items:
+            if store_open(item.get("store")):
+                log.info("[BREAKER] atlandı (mağaza açık): %s", item.get("url"))
+                continue
+            log.info("--------------------------------")
+            log.info("[DEBUG] GET %s / Sizes=%s", item.get("url"), item.get("sizes", []))
+            try:
+                result = check_http(item)
+                if result is None:
+                    if driver is None:
+                        driver = pool.acquire()
+                    driver, result = check_supervised(pool, driver, item)
+                if result is not None:
+                    apply_results(item, result)
+            except Exception as e:
+                log.exception("[ERROR] URL %s hata: %s", item.get("url"), e)
+    finally:
+        # Driver kapatılmaz; havuza döner (limit/hata varsa havuz yeniden kurar)
+        pool.release(driver)
+
+def run_cycle_parallel(pool: DriverPool, workers: int, items: list[dict]) -> None:
+    """
+    URL listesini CHECK_WORKERS adet driver'a dağıtır.
+    Worker'lar sadece check_item çalıştırır; sonuçlar ana thread'de apply_result ile
+    sırayla işlenir (karar/bildirim tek yerde).
+    """
+    todo: queue.Queue = queue.Queue()
+    for item in items:
+        todo.put(item)
+    done: queue.Queue = queue.Queue()
+
+    def worker():
+        driver = None  # HTTP ile çözülen URL'ler için Chrome açılmaz
+        try:
+            while True:
+                try:
+                    item = todo.get_nowait()
+                except queue.Empty:
+                    return
+                if store_open(item.get("store")):
+                    log.info("[BREAKER] atlandı (mağaza açık): %s", item.get("url"))
+                    done.put((item, None))
+                    continue
+                log.info("[DEBUG] GET %s / Sizes=%s", item.get("url"), item.get("sizes", []))
+                try:
+                    result = check_http(item)
+                    if result is None:
+                        if driver is None:
+                            driver = pool.acquire()
+                        driver, result = check_supervised(pool, driver, item)
+                    done.put((item, result))
+                except Exception as e:
+                    log.exception("[ERROR] URL %s hata: %s", item.get("url"), e)
+                    done.put((item, None))
         finally:
-            log.info("Closing the browser…")
+            pool.release(driver)
+
+    threads = [threading.Thread(target=worker, name=f"checker-{i+1}", daemon=True)
+               for i in range(min(workers, len(items)))]
+    for t in threads:
+        t.start()
+
+    pending = len(items)
+    while pending:
+        try:
+            item, result = done.get(timeout=1)
+        except queue.Empty:
+            if not any(t.is_alive() for t in threads) and done.empty():
+                log.warning("[WORKER] tüm worker'lar bitti, %s URL kontrol edilemedi", pending)
+                break
+            continue
+        pending -= 1
+        if result is None:
+            continue
+        try:
+            apply_results(item, result)
+        except Exception as e:
+            log.exception("[ERROR] URL %s karar hatası: %s", item.get("url"), e)
+
+    for t in threads:
+        t.join()
+
+def run_cycle_tabs(pool: DriverPool, tabs: int, items: list[dict]) -> list[dict]:
+    """
+    Tek driver, CHECK_TABS sekme: bir sekmedeki ürün parse edilirken sıradaki
+    URL'ler diğer sekmelerde yüklenmeye devam eder (navigasyon/parsing örtüşür).
+    Driver ölürse yedeğe geçilir; yarım kalan sekmelerdeki URL'ler yeniden kuyruğa alınır.
+    Sekme, mağazasında boş slot olan ilk URL'e verilir; slot sayfa parse edilene kadar tutulur.
+    Dönüş: bu turda kontrol edilemeyen item'lar (driver kurulamadı / navigasyon başlatılamadı);
+    ana döngü bunları bir sonraki tura bırakır.
+    """
+    # Önce HTTP-only kontroller; sekmelere sadece tarayıcı gerektiren URL'ler girer
+    pending = []
+    for item in items:
+        if store_open(item.get("store")):
+            log.info("[BREAKER] atlandı (mağaza açık): %s", item.get("url"))
+            continue
+        try:
+            result = check_http(item)
+        except Exception as e:
+            log.exception("[ERROR] URL %s hata: %s", item.get("url"), e)
+            result = None
+        if result is None:
+            pending.append(item)
+            continue
+        try:
+            apply_results(item, result)
+        except Exception as e:
+            log.exception("[ERROR] URL %s karar hatası: %s", item.get("url"), e)
+    if not pending:
+        return []
+
+    try:
+        state = {"driver": pool.acquire()}
+    except Exception as e:
+        log.exception("[TABS] driver alınamadı: %s → %s URL sonraki tura kaldı", e, len(pending))
+        return pending
+    in_flight = []  # (handle, item) — navigasyon başlatılma sırasıyla
+    idle = []       # boş sekmeler (mağaza slotu bekleyen URL'ler için)
+    retried = set()
+
+    def launch(handle) -> bool:
+        # Slotu boş ilk mağazanın URL'i; hepsi doluysa sekme boş bekler
+        index = next((i for i, it in enumerate(pending) if limiter.try_enter(it.get("store"))), None)
+        if index is None:
+            return False
+        item = pending.pop(index)
+        driver = state["driver"]
+        try:
+            limiter.wait_token(item.get("store"))
+            driver.switch_to.window(handle)
+            apply_blocked_urls(driver, blocked_urls_for(item.get("store")))
+            start_navigation(driver, handle, item.get("url"), capture_patterns_for(item.get("store")))
+        except Exception:
+            limiter.release(item.get("store"))
+            pending.insert(index, item)
+            raise
+        pool.note_page(driver)
+        in_flight.append((handle, item))
+        return True
+
+    def fill():
+        # Tur ortasında devresi açılan mağazaların bekleyen URL'leri atlanır
+        for it in [it for it in pending if store_open(it.get("store"))]:
+            log.info("[BREAKER] atlandı (mağaza açık): %s", it.get("url"))
+            pending.remove(it)
+        while idle and pending:
+            if not launch(idle[0]):
+                break
+            idle.pop(0)
+
+    def start_tabs():
+        idle[:] = open_tabs(state["driver"], min(tabs, len(pending) + len(in_flight)), on_new_tab=setup_page_cdp)
+        fill()
+
+    def restart(reason):
+        # Yüklenmekte olan URL'ler yeni driver'da baştan açılır
+        for _, it in in_flight:
+            limiter.release(it.get("store"))
+        pending[:0] = [it for _, it in in_flight]
+        in_flight.clear()
+        # replace hata verirse eski driver zaten kapatılmıştır; finally onu havuza geri vermesin
+        old, state["driver"] = state["driver"], None
+        state["driver"] = pool.replace(old, reason)
+        start_tabs()
+
+    try:
+        start_tabs()
+        while in_flight:
+            handle, item = in_flight.pop(0)
+            driver = state["driver"]
+            log.info("--------------------------------")
+            log.info("[DEBUG] TAB %s / Sizes=%s", item.get("url"), item.get("sizes", []))
+            result, reason = None, None
             try:
-                driver.quit()
-            except Exception:
-                pass
+                driver.switch_to.window(handle)
+                result = check_item(driver, item, pool, navigate=False)
+                if result is not None and not result.get("found_sizes"):
+                    reason = driver_failure(driver)
+            except Exception as e:
+                reason = driver_failure(driver, e)
+                if not reason:
+                    log.exception("[ERROR] URL %s hata: %s", item.get("url"), e)
+            finally:
+                limiter.release(item.get("store"))
+
+            if reason:
+                url = item.get("url")
+                if url in retried:
+                    log.error("[WATCHDOG] %s yeni driver ile de kontrol edilemedi", url)
+                else:
+                    retried.add(url)
+                    pending.insert(0, item)
+                log.warning("[WATCHDOG] %s: %s → driver değiştiriliyor", url, reason)
+                restart(reason)
+                continue
+
+            # Sekme boşaldı: karar aşamasından ÖNCE sıradaki URL'i başlat
+            idle.append(handle)
+            try:
+                fill()
+            except Exception as e:
+                log.warning("[TABS] navigasyon başlatılamadı: %s", e)
+
+            if result is not None:
+                try:
+                    apply_results(item, result)
+                except Exception as e:
+                    log.exception("[ERROR] URL %s karar hatası: %s", item.get("url"), e)
 
-            sleep_time = random.randint(sleep_min_seconds, sleep_max_seconds)
-            log.info("Sleeping for %d minutes and %d seconds…", sleep_time // 60, sleep_time % 60)
-            time.sleep(sleep_time)
+            memory = pool.memory_reason(driver)
+            if memory:
+                restart(memory)
+    except Exception as e:
+        # Driver kurulamadı / sekmeler açılamadı: bot durmaz, kalan URL'ler sonraki tura kalır
+        log.exception("[TABS] tur yarıda kaldı: %s", e)
+    finally:
+        leftover = [it for _, it in in_flight] + pending
+        for _, it in in_flight:
+            limiter.release(it.get("store"))
+        if state["driver"] is not None:
+            close_extra_tabs(state["driver"])
+            pool.release(state["driver"])
+    if leftover:
+        log.warning("[TABS] %s URL bu turda kontrol edilemedi → sonraki tura kaldı", len(leftover))
+    return leftover
+
+# -----------------------------
+# MAIN LOOP
+# -----------------------------
+if __name__ == "__main__":
+    def startup_diagnostics():
+        if TELEGRAM_TEST_ON_START and TELEGRAM_ENABLED:
+            send_telegram_message("✅ Bot çalıştı – Railway başlangıç testi.")
+        diag()
+        telegram_diag()
+
+    if FAST_START:
+        # Teşhisler (Telegram ağ çağrıları dahil) ilk kontrolü bekletmez
+        threading.Thread(target=startup_diagnostics, name="startup-diag", daemon=True).start()
+    else:
+        startup_diagnostics()
+
+    pool = DriverPool(build_driver, size=DRIVER_POOL_SIZE,
+                      max_pages=DRIVER_MAX_PAGES, max_rss_mb=DRIVER_MAX_RSS_MB,
+                      on_discard=release_profile, standby=DRIVER_STANDBY and not HYBRID_MODE)
+    log.info("[DEBUG] CHECK_WORKERS=%s CHECK_TABS=%s PAGE_LOAD_STRATEGY=%s HYBRID_MODE=%s ADAPTIVE_SCHEDULER=%s",
+             CHECK_WORKERS, CHECK_TABS, driver_page_load_strategy(), HYBRID_MODE, ADAPTIVE_SCHEDULER)
+    scheduler = None
+    if ADAPTIVE_SCHEDULER:
+        factor = None
+        if restock_history is not None:
+            def factor(item, ts):
+                return restock_history.interval_factor(item.get("store"), item.get("canonical"), ts)
+        scheduler = WatchScheduler(sleep_min_seconds, sleep_max_seconds, config.get("scheduler"), factor=factor)
+        for item in urls_to_check:
+            scheduler.add(item["key"], item)
+    try:
+        while True:
+            items = scheduler.pop_due() if scheduler else urls_to_check
+            if breaker is not None:
+                # Açık mağazalar atlanır (takvimde cooldown sonuna ertelenir); yarı açıktan tek probe
+                items, skipped = breaker.admit(items)
+                if scheduler:
+                    for item in skipped:
+                        scheduler.defer(item["key"], breaker.remaining(item.get("store")))
+            before = {w["key"]: last_status.get(w["key"]) for item in items for w in item["watches"]}
+            leftover = []   # kontrol edilemeyen item'lar (sekme modu): sayaçlara dokunmadan hemen tekrar due
+            try:
+                if items:
+                    log.info("[SCHED] bu tur %s/%s ürün kontrol ediliyor", len(items), len(urls_to_check))
+                    if HYBRID_MODE:
+                        mint_hm_cookie(pool, items)
+                    prefetch_hm(items)
+                    if CHECK_WORKERS > 1:
+                        run_cycle_parallel(pool, CHECK_WORKERS, items)
+                    elif CHECK_TABS > 1:
+                        leftover = run_cycle_tabs(pool, CHECK_TABS, items)
+                    else:
+                        run_cycle_serial(pool, items)
+            finally:
+                if scheduler:
+                    # Hata alan URL'ler de yeniden takvimlenir; ilk sonuç (None → X) değişim sayılmaz.
+                    # Watch'lardan birinin durumu değiştiyse ürün "sıcak" sayılır.
+                    leftover_keys = {item["key"] for item in leftover}
+                    for item in items:
+                        if item["key"] in leftover_keys:
+                            scheduler.defer(item["key"], 0)
+                            continue
+                        changed = False
+                        for w in item["watches"]:
+                            was, now = before[w["key"]], last_status.get(w["key"])
+                            changed = changed or (was is not None and now != was)
+                        scheduler.record(item["key"], changed)
+                # Bekleme istatistikleri scraperHelpers'ta; HTTP-only turda selenium import edilmesin
+                waits = helpers().wait_stats_summary() if "scraperHelpers" in sys.modules else None
+                if waits:
+                    log.info("[WAIT] döngü özeti: %s", waits)
+                http_stats = httpHelpers.http_stats_summary()
+                if http_stats:
+                    log.info("[HTTP] döngü özeti: %s", http_stats)
+                limits = limiter.stats_summary()
+                if limits:
+                    log.info("[LIMIT] döngü özeti: %s", limits)
+                breakers = breaker.summary() if breaker is not None else None
+                if breakers:
+                    log.info("[BREAKER] döngü özeti: %s", breakers)
+                # Hibrit mod: uyku boyunca Chrome açık beklemez
+                idle = pool.idle_seconds()
+                if HYBRID_MODE and idle is not None and idle >= DRIVER_PARK_AFTER:
+                    parked = pool.park(f"{idle:.0f}s kullanılmadı")
+                    if parked:
+                        log.info("[HYBRID] %s driver park edildi (kapatıldı)", parked)
+                if scheduler:
+                    sleep_time = int(scheduler.seconds_until_next() + 0.999)
+                else:
+                    sleep_time = random.randint(sleep_min_seconds, sleep_max_seconds)
+                log.info("Sleeping for %d minutes and %d seconds…", sleep_time // 60, sleep_time % 60)
+                time.sleep(sleep_time)
+    finally:
+        log.info("Closing the browser…")
+        pool.close_all()
@@ -0,0 +1,211 @@
+# ============================
+# restockPatterns.py — stok gelme (restock) zamanlarından öğrenme
+# - Karar aşamasındaki was=False → now=True geçişleri olay olarak kaydedilir (JSON dosyası)
+# - Mağaza ve ürün bazında haftanın günü × saat histogramı
+# - interval_factor(): tahmin edilen pencerede < 1 (daha sık kontrol), sakin saatlerde > 1
+#   (watchScheduler aralığı bu çarpanla ölçeklenir)
+# - Komut satırı (çevrimdışı):
+#     python restockPatterns.py inspect  [--file F] [--store zara] [--product KEY]
+#     python restockPatterns.py backtest [--file F] [--store zara] [--split 0.7]
+# ============================
+
+import os
+import json
+import time
+import logging
+import argparse
+import threading
+
+log = logging.getLogger(__name__)
+
+HOURS = 24
+DAYS = 7
+DAY_NAMES = ["Pzt", "Sal", "Çar", "Per", "Cum", "Cmt", "Paz"]
+
+DEFAULTS = {
+    "min_events": 5,        # bu kadar olaydan az histogram tahmin için kullanılmaz
+    "max_events": 5000,     # dosyada tutulan en fazla olay (eskiler atılır)
+    "product_weight": 2.0,  # ürün olayları mağaza olaylarına göre ağırlığı
+    "spread_hours": 1,      # olay ±N saatlik komşu slotlara da yarım ağırlıkla sayılır
+    "hot_ratio": 2.0,       # slot yoğunluğu ortalamanın bu katıysa tahmin penceresi
+    "max_boost": 4.0,       # pencerede aralık en fazla bu kadar kısalır
+    "quiet_factor": 1.5,    # hiç olay görülmeyen slotlarda aralık çarpanı
+}
+
+
+def slot_of(ts: float) -> tuple[int, int]:
+    """Epoch → (haftanın günü 0=Pzt, saat) yerel saatle."""
+    t = time.localtime(ts)
+    return t.tm_wday, t.tm_hour
+
+
+class RestockHistory:
+    """Restock olayları + histogram tabanlı aralık çarpanı. path boşsa sadece bellekte."""
+
+    def __init__(self, path: str = "", settings: dict | None = None):
+        self.path = path
+        self.settings = dict(DEFAULTS, **(settings or {}))
+        self.events: list[dict] = []
+        self._lock = threading.Lock()
+        self._cache: dict[tuple[str, str], list[list[float]]] = {}
+        if path:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.events = list(json.load(f).get("events", []))
+            except (OSError, ValueError):
+                pass
+
+    # --- kayıt ---
+    def record(self, store: str | None, product: str | None, ts: float | None = None) -> None:
+        """was=False → now=True geçişi."""
+        event = {"ts": time.time() if ts is None else ts, "store": store or "", "product": product or ""}
+        with self._lock:
+            self.events.append(event)
+            del self.events[:-int(self.settings["max_events"])]
+            self._cache.clear()
+            events = list(self.events)
+        day, hour = slot_of(event["ts"])
+        log.info("[RESTOCK] olay kaydedildi: %s %s (%s %02d:00)", event["store"], event["product"], DAY_NAMES[day], hour)
+        self._save(events)
+
+    def _save(self, events: list[dict]) -> None:
+        if not self.path:
+            return
+        tmp = f"{self.path}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"events": events}, f)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            log.warning("[RESTOCK] geçmiş yazılamadı: %s", e)
+
+    # --- histogram ---
+    def histogram(self, store: str | None = None, product: str | None = None) -> list[list[float]]:
+        """7×24 ağırlıklı olay sayısı (komşu saatlere yarım ağırlık yayılır)."""
+        key = (store or "", product or "")
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                return cached
+            events = [e for e in self.events
+                      if (not store or e.get("store") == store) and (not product or e.get("product") == product)]
+        grid = [[0.0] * HOURS for _ in range(DAYS)]
+        spread = int(self.settings["spread_hours"])
+        for e in events:
+            day, hour = slot_of(e["ts"])
+            for off in range(-spread, spread + 1):
+                h = (day * HOURS + hour + off) % (DAYS * HOURS)
+                grid[h // HOURS][h % HOURS] += 1.0 if off == 0 else 0.5
+        with self._lock:
+            self._cache[key] = grid
+        return grid
+
+    def count(self, store: str | None = None, product: str | None = None) -> int:
+        with self._lock:
+            return sum(1 for e in self.events
+                       if (not store or e.get("store") == store) and (not product or e.get("product") == product))
+
+    def slot_ratio(self, store: str | None, product: str | None, ts: float | None = None) -> float | None:
+        """
+        Slotun yoğunluğu / ortalama slot yoğunluğu (mağaza + ağırlıklı ürün histogramı).
+        Yeterli olay yoksa None.
+        """
+        s = self.settings
+        n_store = self.count(store)   # store=None → tüm olaylar
+        n_product = self.count(store, product) if product else 0
+        if n_store + n_product < s["min_events"]:
+            return None
+        day, hour = slot_of(time.time() if ts is None else ts)
+        grids = []
+        if n_store:
+            grids.append((1.0, self.histogram(store)))
+        if n_product:
+            grids.append((s["product_weight"], self.histogram(store, product)))
+        slot = sum(w * g[day][hour] for w, g in grids)
+        total = sum(w * sum(map(sum, g)) for w, g in grids)
+        mean = total / (DAYS * HOURS)
+        return slot / mean if mean else None
+
+    def interval_factor(self, store: str | None, product: str | None, ts: float | None = None) -> float:
+        """Aralık çarpanı: tahmin penceresinde < 1, olaysız slotta quiet_factor, diğer durumlarda 1."""
+        ratio = self.slot_ratio(store, product, ts)
+        if ratio is None:
+            return 1.0
+        s = self.settings
+        if ratio >= s["hot_ratio"]:
+            return 1.0 / min(s["max_boost"], ratio)
+        if ratio == 0:
+            return float(s["quiet_factor"])
+        return 1.0
+
+    def windows(self, store: str | None = None, product: str | None = None) -> list[tuple[int, int, float]]:
+        """Tahmin pencereleri [(gün, saat, oran)] oran sırasıyla (hot_ratio üstü slotlar)."""
+        out = []
+        for day in range(DAYS):
+            for hour in range(HOURS):
+                ts = _slot_ts(day, hour)
+                ratio = self.slot_ratio(store, product, ts)
+                if ratio is not None and ratio >= self.settings["hot_ratio"]:
+                    out.append((day, hour, ratio))
+        return sorted(out, key=lambda x: -x[2])
+
+
+def _slot_ts(day: int, hour: int) -> float:
+    """Verilen (gün, saat) slotuna düşen bir epoch (bu haftadan)."""
+    now = time.localtime()
+    base = time.mktime((now.tm_year, now.tm_mon, now.tm_mday, hour, 30, 0, 0, 0, -1))
+    return base + (day - now.tm_wday) * 86400
+
+
+def backtest(events: list[dict], split: float = 0.7, store: str | None = None,
+             settings: dict | None = None) -> dict:
+    """
+    Olayları zamana göre böler: ilk kısımdan öğrenir, kalan olayların ne kadarının tahmin
+    penceresine düştüğünü ölçer. window_share: pencerelerin haftadaki payı (rastgele taban çizgisi).
+    """
+    events = sorted((e for e in events if not store or e.get("store") == store), key=lambda e: e["ts"])
+    cut = int(len(events) * split)
+    train, test = events[:cut], events[cut:]
+    model = RestockHistory("", settings)
+    model.events = train
+    hot = {(d, h) for d, h, _ in model.windows(store)}
+    hits = sum(1 for e in test if slot_of(e["ts"]) in hot)
+    return {
+        "train": len(train),
+        "test": len(test),
+        "windows": len(hot),
+        "window_share": round(len(hot) / (DAYS * HOURS), 3),
+        "hit_rate": round(hits / len(test), 3) if test else None,
+    }
+
+
+def _print_histogram(grid: list[list[float]]) -> None:
+    print("      " + "".join(f"{h:>4}" for h in range(HOURS)))
+    for day in range(DAYS):
+        print(f"{DAY_NAMES[day]:>5} " + "".join(f"{grid[day][h]:>4.3g}" if grid[day][h] else "   ." for h in range(HOURS)))
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Restock geçmişi: histogram ve tahmin pencereleri")
+    parser.add_argument("command", choices=["inspect", "backtest"])
+    parser.add_argument("--file", default=os.getenv("RESTOCK_HISTORY_FILE", ".restock_history.json"))
+    parser.add_argument("--store")
+    parser.add_argument("--product")
+    parser.add_argument("--split", type=float, default=0.7)
+    args = parser.parse_args(argv)
+
+    history = RestockHistory(args.file)
+    if args.command == "inspect":
+        print(f"{args.file}: {len(history.events)} olay "
+              f"(store={args.store or '*'} product={args.product or '*'} → {history.count(args.store, args.product)})")
+        _print_histogram(history.histogram(args.store, args.product))
+        print("Tahmin pencereleri:")
+        for day, hour, ratio in history.windows(args.store, args.product)[:20]:
+            print(f"  {DAY_NAMES[day]} {hour:02d}:00  x{ratio:.1f} → aralık çarpanı "
+                  f"{history.interval_factor(args.store, args.product, _slot_ts(day, hour)):.2f}")
+    else:
+        print(json.dumps(backtest(history.events, args.split, args.store), ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
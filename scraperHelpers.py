@@ -4,6 +4,9 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, ElementClickInterceptedException, StaleElementReferenceException
 import time
 import re
+import threading
+import json
+from urllib.parse import urlsplit
 
 def _safe_text(el):
     """Element text'ini güvenli şekilde al (StaleElementReferenceException için)"""
@@ -13,6 +16,227 @@ def _safe_text(el):
         return ""
 
 
+# ------------------------------------------------------------
+# BEKLEME ALTYAPISI: sabit time.sleep yerine koşul sağlanınca dön
+# ------------------------------------------------------------
+# Her bekleme gerçekte ne kadar sürdüğünü [WAIT] satırıyla yazar ve
+# WAIT_STATS'a ekler (main döngü sonunda wait_stats_summary ile özetler).
+WAIT_STATS: dict[str, list[float]] = {}
+_wait_stats_lock = threading.Lock()
+
+# Seçicilerden biri DOM'a girene kadar MutationObserver ile bekler (polling yok)
+_WAIT_SELECTOR_JS = """
+const sels = arguments[0], timeoutMs = arguments[1], done = arguments[arguments.length - 1];
+const find = () => {
+  for (const s of sels) { try { if (document.querySelector(s)) return s; } catch (e) {} }
+  return null;
+};
+const hit = find();
+if (hit) { done(hit); return; }
+let timer = null;
+const obs = new MutationObserver(() => {
+  const h = find();
+  if (h) { obs.disconnect(); clearTimeout(timer); done(h); }
+});
+obs.observe(document.documentElement || document, {childList: true, subtree: true, attributes: true});
+timer = setTimeout(() => { obs.disconnect(); done(null); }, timeoutMs);
+"""
+
+# Seçicinin bulunduğu bölgede quietMs boyunca hiç mutasyon olmayana kadar bekler
+_WAIT_SETTLED_JS = """
+const sel = arguments[0], quietMs = arguments[1], timeoutMs = arguments[2], done = arguments[arguments.length - 1];
+const el = document.querySelector(sel);
+if (!el) { done(false); return; }
+const root = el.parentElement || el;
+let quiet = null, hard = null, finished = false;
+const finish = (ok) => { if (finished) return; finished = true; obs.disconnect(); clearTimeout(quiet); clearTimeout(hard); done(ok); };
+const obs = new MutationObserver(() => { clearTimeout(quiet); quiet = setTimeout(() => finish(true), quietMs); });
+obs.observe(root, {childList: true, subtree: true, attributes: true, characterData: true});
+quiet = setTimeout(() => finish(true), quietMs);
+hard = setTimeout(() => finish(false), timeoutMs);
+"""
+
+
+def _record_wait(label: str, started: float, ok: bool) -> float:
+    elapsed = time.monotonic() - started
+    with _wait_stats_lock:
+        WAIT_STATS.setdefault(label, []).append(elapsed)
+    print(f"[WAIT] {label}: {elapsed:.2f}s ({'ok' if ok else 'timeout'})")
+    return elapsed
+
+
+def wait_stats_summary(reset: bool = True) -> dict[str, dict]:
+    """label -> {count, total, max} (saniye). reset=True ise sayaçları sıfırlar."""
+    with _wait_stats_lock:
+        summary = {
+            label: {"count": len(v), "total": round(sum(v), 2), "max": round(max(v), 2)}
+            for label, v in WAIT_STATS.items() if v
+        }
+        if reset:
+            WAIT_STATS.clear()
+    return summary
+
+
+def wait_until(driver, condition, timeout: float, label: str, poll: float = 0.1):
+    """
+    condition(driver) truthy dönene kadar bekler (WebDriverWait predicate).
+    Çıktı: condition sonucu; zaman aşımında None.
+    """
+    started = time.monotonic()
+    try:
+        result = WebDriverWait(driver, timeout, poll_frequency=poll).until(condition)
+        _record_wait(label, started, True)
+        return result
+    except TimeoutException:
+        _record_wait(label, started, False)
+        return None
+    except Exception:
+        _record_wait(label, started, False)
+        return None
+
+
+def wait_for_any_selector(driver, selectors, timeout: float, label: str) -> str | None:
+    """
+    Seçicilerden HERHANGİ biri DOM'da belirdiği anda döner (MutationObserver).
+    Seçicileri tek tek WebDriverWait ile beklemekten farklı olarak toplam süre = timeout.
+    Çıktı: eşleşen seçici; zaman aşımında None.
+    """
+    selectors = list(selectors)
+    started = time.monotonic()
+    try:
+        if timeout + 2 > 30:
+            driver.set_script_timeout(timeout + 5)
+        hit = driver.execute_async_script(_WAIT_SELECTOR_JS, selectors, int(timeout * 1000))
+    except Exception:
+        # Async script desteklenmiyorsa / sayfa değiştiyse: polling'e düş
+        def _present(d):
+            for sel in selectors:
+                try:
+                    if d.find_elements(By.CSS_SELECTOR, sel):
+                        return sel
+                except Exception:
+                    continue
+            return None
+        remaining = max(0.0, timeout - (time.monotonic() - started))
+        try:
+            hit = WebDriverWait(driver, remaining, poll_frequency=0.2).until(_present)
+        except Exception:
+            hit = None
+    _record_wait(label, started, bool(hit))
+    return hit
+
+
+def wait_dom_settled(driver, selector: str, timeout: float, label: str, quiet_ms: int = 300) -> bool:
+    """
+    Seçicinin bulunduğu bölgede quiet_ms boyunca DOM değişmeyene kadar bekler
+    ("element'lerin tam yüklenmesi için" sabit sleep'lerin yerine).
+    """
+    started = time.monotonic()
+    try:
+        ok = bool(driver.execute_async_script(_WAIT_SETTLED_JS, selector, int(quiet_ms), int(timeout * 1000)))
+    except Exception:
+        ok = False
+    _record_wait(label, started, ok)
+    return ok
+
+
+def wait_until_gone(driver, selector: str, timeout: float, label: str) -> bool:
+    """Overlay/cookie banner gibi bir elementin kaybolmasını (veya gizlenmesini) bekler."""
+    result = wait_until(driver, EC.invisibility_of_element_located((By.CSS_SELECTOR, selector)), timeout, label)
+    return bool(result)
+
+
+# ------------------------------------------------------------
+# TEK ROUNDTRIP BEDEN ÇIKARIMI: sayfadaki beden butonları tek execute_script ile
+# kompakt JSON listesi olarak okunur; stok kararı yine Python'da verilir.
+# (Her buton için ayrı find_element/.text/get_attribute roundtrip'i yok.)
+# ------------------------------------------------------------
+_SIZE_SNAPSHOT_JS = """
+const opts = arguments[0];
+const low = (v) => (v || '').toLowerCase();
+const txt = (el) => el ? (el.innerText || el.textContent || '').trim() : '';
+const containers = new Map();
+const groups = [];
+for (const sel of opts.selectors) {
+  let nodes = [];
+  try { nodes = Array.from(document.querySelectorAll(sel)); } catch (e) {}
+  const items = nodes.map((el) => {
+    const btn = (opts.button && el.querySelector(opts.button)) || el;
+    const labelEl = opts.label ? el.querySelector(opts.label) : null;
+    const extraEl = opts.extra ? btn.querySelector(opts.extra) : null;
+    const li = btn.closest('li');
+    let cont = null;
+    if (opts.group) {
+      cont = btn.closest('ul') || btn.closest("div[class*='product-size']") || (btn.parentElement && btn.parentElement.closest('div'));
+    }
+    let group = null, y = null;
+    if (cont) {
+      if (!containers.has(cont)) {
+        containers.set(cont, containers.size);
+      }
+      group = containers.get(cont);
+      y = cont.getBoundingClientRect().top + window.scrollY;
+    }
+    return {
+      label: labelEl ? txt(labelEl) : txt(btn),
+      has_label: !!labelEl && !!txt(labelEl),
+      enabled: !(btn.disabled || btn.getAttribute('aria-disabled') === 'true'),
+      disabled_attr: btn.hasAttribute('disabled'),
+      aria_disabled: btn.getAttribute('aria-disabled') === 'true',
+      qa_action: btn.getAttribute('data-qa-action') || '',
+      aria: btn.getAttribute('aria-label') || '',
+      aria_desc: btn.getAttribute('aria-description') || '',
+      id: btn.id || '',
+      testid: btn.getAttribute('data-testid') || '',
+      cls: low(btn.getAttribute('class')),
+      text: txt(btn),
+      extra: txt(extraEl),
+      html: low(btn.outerHTML).slice(0, 1500),
+      li_cls: li ? low(li.getAttribute('class')) : '',
+      li_aria: li ? (li.getAttribute('aria-label') || '') : '',
+      li_text: li ? low(txt(li)) : '',
+      li_html: li ? low(li.outerHTML).slice(0, 800) : '',
+      displayed: btn.getClientRects().length > 0,
+      group: group,
+      y: y,
+    };
+  });
+  groups.push({selector: sel, items: items});
+}
+return groups;
+"""
+
+
+def size_snapshot(driver, selectors, label: str | None = None, button: str | None = None,
+                  extra: str | None = None, group: bool = False) -> list[dict] | None:
+    """
+    Beden elementlerini TEK execute_script ile okur.
+    Girdi  : selectors (sırayla denenecek CSS listesi), label/button/extra (eleman içi alt seçiciler),
+             group=True ise en yakın container indeksi (group) ve sayfa y konumu (y) eklenir.
+    Çıktı  : [{"selector", "items": [{label, enabled, qa_action, aria, ...}]}] ; JS hatasında None.
+    """
+    started = time.monotonic()
+    try:
+        groups = driver.execute_script(_SIZE_SNAPSHOT_JS, {
+            "selectors": list(selectors), "label": label, "button": button,
+            "extra": extra, "group": group,
+        })
+    except Exception as e:
+        print(f"[DEBUG] size_snapshot JS hatası: {e}")
+        return None
+    total = sum(len(g.get("items") or []) for g in (groups or []))
+    print(f"[DEBUG] size_snapshot: {total} element, tek roundtrip ({time.monotonic() - started:.2f}s)")
+    return groups or []
+
+
+def dom_html_length(driver) -> int:
+    """page_source indirmeden DOM HTML uzunluğu (tek küçük roundtrip)."""
+    try:
+        return int(driver.execute_script("return document.documentElement ? document.documentElement.outerHTML.length : 0;") or 0)
+    except Exception:
+        return 0
+
+
 # ------------------------------------------------------------
 # ZARA: link-bazlı beden kontrolü (ÇALIŞAN KOD MANTIĞI)
 # ------------------------------------------------------------
@@ -29,14 +253,19 @@ def check_stock_zara(driver, sizes_to_check):
     try:
         wait = WebDriverWait(driver, 60)  # ÇALIŞAN KOD: 60 saniye
         
-        # Cookie popup'ı kapat
+        # Cookie popup'ı kapat — banner YA DA sepete ekle butonu gelince devam et
+        # (banner hiç gelmezse 60 sn beklemek yerine)
+        print("[DEBUG] Cookie popup kontrol ediliyor...")
+        wait_for_any_selector(driver, ["#onetrust-accept-btn-handler", "button[data-qa-action='add-to-cart']"], 60, "zara.cookie_or_cart")
         try:
-            print("[DEBUG] Cookie popup kontrol ediliyor...")
-            accept_cookies_button = wait.until(EC.element_to_be_clickable((By.ID, "onetrust-accept-btn-handler")))
-            accept_cookies_button.click()
-            print("[DEBUG] Cookie popup kapatıldı")
-            time.sleep(1)
-        except TimeoutException:
+            cookie_buttons = driver.find_elements(By.ID, "onetrust-accept-btn-handler")
+            if cookie_buttons and cookie_buttons[0].is_displayed():
+                cookie_buttons[0].click()
+                print("[DEBUG] Cookie popup kapatıldı")
+                wait_until_gone(driver, "#onetrust-accept-btn-handler", 2, "zara.cookie_gone")
+            else:
+                print("[DEBUG] Cookie popup bulunamadı veya zaten kapalı")
+        except Exception:
             print("[DEBUG] Cookie popup bulunamadı veya zaten kapalı")
         
         # ÇALIŞAN KOD: Scroll YOK! Direkt Add to Cart'a geç
@@ -63,38 +292,40 @@ def check_stock_zara(driver, sizes_to_check):
         print("[DEBUG] Size selector bekleniyor...")
         wait.until(EC.presence_of_element_located((By.CLASS_NAME, "size-selector-sizes")))
 
-        # Find size elements (ÇALIŞAN KOD MANTIĞI - AYNISI)
-        size_elements = driver.find_elements(By.CLASS_NAME, "size-selector-sizes-size")
-        print(f"[DEBUG] {len(size_elements)} size element bulundu (.size-selector-sizes-size)")
+        # Find size elements (ÇALIŞAN KOD MANTIĞI - AYNISI) — tek roundtrip
+        groups = size_snapshot(
+            driver, [".size-selector-sizes-size"],
+            label="div[data-qa-qualifier='size-selector-sizes-size-label']",
+            button=".size-selector-sizes-size__button",
+            extra=".size-selector-sizes-size__action",
+        )
+        size_entries = groups[0]["items"] if groups else []
+        print(f"[DEBUG] {len(size_entries)} size element bulundu (.size-selector-sizes-size)")
         
         # ÇALIŞAN KOD: Her bedeni kontrol et ve eşleşeni bul
         in_stock = []
+        wanted = set(x.strip().upper() for x in (sizes_to_check or []))
         
-        for li in size_elements:
+        for entry in size_entries:
             try:
-                # ÇALIŞAN KOD: Direkt text strip (case-sensitive kontrolü yapmıyor)
-                size_label = li.find_element(By.CSS_SELECTOR, "div[data-qa-qualifier='size-selector-sizes-size-label']").text.strip()
+                # ÇALIŞAN KOD: Label yoksa bu li beden değildir
+                if not entry["has_label"]:
+                    continue
+                size_label = entry["label"]
                 print(f"[DEBUG] Size element bulundu: '{size_label}'")
                 
                 # ÇALIŞAN KOD: Direkt string karşılaştırma (sizes_to_check içinde mi?)
                 # Ama biz link bazlı çalışıyoruz, o yüzden normalize ediyoruz
                 size_label_normalized = size_label.upper()
-                wanted = set(x.strip().upper() for x in (sizes_to_check or []))
                 
                 if not wanted or size_label_normalized in wanted:
-                    button = li.find_element(By.CLASS_NAME, "size-selector-sizes-size__button")
-
                     # Check if the button contains "Benzer ürünler" text (ÇALIŞAN KOD MANTIĞI)
-                    try:
-                        similar_products_text = button.find_element(By.CLASS_NAME, "size-selector-sizes-size__action").text.strip()
-                        if "Benzer ürünler" in similar_products_text:
-                            print(f"[DEBUG] ❌ Beden '{size_label}' - Benzer ürünler gösteriliyor (stok yok)")
-                            continue
-                    except NoSuchElementException:
-                        pass  # No "Benzer ürünler" text found, proceed with normal check
+                    if "Benzer ürünler" in entry["extra"]:
+                        print(f"[DEBUG] ❌ Beden '{size_label}' - Benzer ürünler gösteriliyor (stok yok)")
+                        continue
 
                     # Check stock status (ÇALIŞAN KOD MANTIĞI)
-                    qa_action = button.get_attribute("data-qa-action") or ""
+                    qa_action = entry["qa_action"]
                     print(f"[DEBUG] Beden '{size_label}' - data-qa-action: '{qa_action}'")
                     
                     if qa_action in ["size-in-stock", "size-low-on-stock"]:
@@ -137,22 +368,19 @@ def check_stock_bershka(driver, sizes_to_check):
       - Eşleşme case-insensitive yapılır.
     """
     try:
-        wait = WebDriverWait(driver, 25)
-
         # Cookie popup kontrolü
         try:
             cookie_button = driver.find_elements(By.CSS_SELECTOR, "button[id*='onetrust'], button[id*='cookie'], button[class*='cookie']")
             if cookie_button:
                 cookie_button[0].click()
                 print("[DEBUG] Bershka cookie popup kapatıldı")
-                time.sleep(1)
+                wait_until_gone(driver, "button[id*='onetrust'], button[id*='cookie'], button[class*='cookie']", 1, "bershka.cookie_gone")
         except:
             pass
 
-        # Sayfayı kaydır (lazy-load için)
+        # Sayfayı kaydır (lazy-load için) — beklemeyi aşağıdaki selector beklemesi yapar
         try:
             driver.execute_script("window.scrollTo(0, document.body.scrollHeight * 0.4);")
-            time.sleep(1.5)
         except:
             pass
 
@@ -164,23 +392,13 @@ def check_stock_bershka(driver, sizes_to_check):
             "button[role='button'][aria-label*='beden']"  # Fallback
         ]
 
-        selector_found = False
-        for wait_sel in wait_selectors:
-            try:
-                wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, wait_sel)))
-                print(f"[DEBUG] Bershka size selector görüldü (wait selector: {wait_sel})")
-                selector_found = True
-                time.sleep(2)  # Element'lerin tam yüklenmesi için
-                break
-            except TimeoutException:
-                continue
-
-        if not selector_found:
+        wait_sel = wait_for_any_selector(driver, wait_selectors, 25, "bershka.size_selector")
+        if wait_sel:
+            print(f"[DEBUG] Bershka size selector görüldü (wait selector: {wait_sel})")
+            # Element'lerin ve dinamik class güncellemelerinin oturması için
+            wait_dom_settled(driver, wait_sel, 3, "bershka.size_settled", quiet_ms=400)
+        else:
             print("[DEBUG] Bershka wait selector bulunamadı, yine de size element aramaya devam ediliyor...")
-            time.sleep(2)
-
-        # Dinamik class güncellemelerine küçük tolerans
-        time.sleep(1)
 
         # Analiz sonuçlarına göre: button[data-qa-anchor="sizelistitem"] (küçük harf) formatında
         button_selectors = [
@@ -193,9 +411,13 @@ def check_stock_bershka(driver, sizes_to_check):
         wanted = set(x.strip().upper() for x in (sizes_to_check or []))
         in_stock = []
 
-        for sel in button_selectors:
+        # Tüm selector grupları tek roundtrip'te
+        groups = size_snapshot(driver, button_selectors, label="span.text__label") or []
+
+        for group in groups:
+            sel = group["selector"]
+            buttons = group["items"]
             try:
-                buttons = driver.find_elements(By.CSS_SELECTOR, sel)
                 if not buttons:
                     continue
 
@@ -203,23 +425,19 @@ def check_stock_bershka(driver, sizes_to_check):
 
                 for button in buttons:
                     try:
-                        # Beden text'ini bul - analiz sonuçlarına göre span.text__label içinde
-                        try:
-                            size_label_elem = button.find_element(By.CSS_SELECTOR, "span.text__label")
-                            size_label = size_label_elem.text.strip().upper()
-                        except NoSuchElementException:
-                            # Fallback: button text'inden al
-                            size_label = button.text.strip().upper()
-                            # "32" gibi rakamları filtrele
+                        # Beden text'i - analiz sonuçlarına göre span.text__label içinde
+                        size_label = button["label"].upper()
+                        if not button["has_label"]:
+                            # Fallback: button text'i; "32" gibi rakamları filtrele
                             if not size_label or not (size_label in ['XXS', 'XS', 'S', 'M', 'L', 'XL', 'XXL'] or (size_label.isdigit() and 28 <= int(size_label) <= 50)):
                                 continue
 
                         if not wanted or size_label in wanted:
                             # Class kontrolü - analiz sonuçlarına göre: "is-disabled" class'ı varsa stok YOK
-                            class_attr = button.get_attribute("class") or ""
+                            class_attr = button["cls"]
                             
                             # Aria-description kontrolü - ek kontrol
-                            aria_desc = (button.get_attribute("aria-description") or "").lower()
+                            aria_desc = button["aria_desc"].lower()
                             
                             # Stok durumu belirleme
                             if "is-disabled" in class_attr.lower():
@@ -231,8 +449,6 @@ def check_stock_bershka(driver, sizes_to_check):
                             else:
                                 print(f"[DEBUG] ✅ Bershka beden '{size_label}' stokta! (class: {class_attr[:50]}, aria-desc: {aria_desc[:30]})")
                                 in_stock.append(size_label)
-                    except NoSuchElementException:
-                        continue
                     except Exception as e:
                         print(f"[DEBUG] Bershka button işlenirken hata: {e}")
                         continue
@@ -256,158 +472,137 @@ def check_stock_bershka(driver, sizes_to_check):
         return []
 
 
+# ------------------------------------------------------------
+# H&M: JSON içinden stoktaki bedenler (__NEXT_DATA__ / yakalanan yanıtlar)
+# ------------------------------------------------------------
+def _collect_available_sizes(obj, acc):
+    """JSON ağacını gezer; beden benzeri ad + stok bayrağı taşıyan kayıtların bedenlerini acc'ye ekler."""
+    try:
+        if isinstance(obj, dict):
+            # A few common H&M keys: variants, articles, variantSizes, sizes
+            size_value = (obj.get('size') or obj.get('name') or obj.get('sizeName') or obj.get('code') or obj.get('title'))
+            avail = obj.get('inStock')
+            if avail is None:
+                avail = obj.get('available')
+            if avail is None:
+                avail = obj.get('availability')
+            if avail is None and 'stock' in obj:
+                try:
+                    avail = (int(obj.get('stock') or 0) > 0)
+                except Exception:
+                    pass
+            if isinstance(size_value, str):
+                label = size_value.strip().upper().replace("\xa0", " ")
+                if (label in ['XXS','XS','S','M','L','XL','XXL'] or (label.isdigit() and 28 <= int(label) <= 50)):
+                    if avail is True or (isinstance(avail, str) and avail.upper() in ['IN_STOCK','AVAILABLE','OK']):
+                        acc.add(label)
+            for v in obj.values():
+                _collect_available_sizes(v, acc)
+        elif isinstance(obj, list):
+            for it in obj:
+                _collect_available_sizes(it, acc)
+    except Exception:
+        pass
+
+
 # ------------------------------------------------------------
 # H&M: link-bazlı beden kontrolü
 # ------------------------------------------------------------
-def check_stock_hm(driver, sizes_to_check):
+def check_stock_hm(driver, sizes_to_check, max_reloads=5, capture_patterns=None, limiter=None):
     """
-    Girdi  : driver, sizes_to_check (örn: ["XS","S","M"])
+    Girdi  : driver, sizes_to_check (örn: ["XS","S","M"]),
+             max_reloads: bot sayfasında (HTML < 1000) en fazla yeniden yükleme (0 = hiç),
+             capture_patterns: network fallback'inde okunacak yanıt URL regex'leri (boşsa atlanır),
+             limiter: her yeniden yükleme öncesi "hm" jetonu harcanır (storeLimiter)
     Çıktı  : stokta bulunan bedenler (list[str]); yoksa [].
     Hata   : None
     Notlar :
       - aria-label içinde "stokta" varsa stok var
       - aria-label içinde "stokta yok" varsa stok yok
       - Eşleşme case-insensitive yapılır.
+      - Yeniden yükleme sırası: refresh → hard reload (aynı URL'e git) → refresh…
     """
     try:
-        wait = WebDriverWait(driver, 5)  # Optimize: 25'ten 5'e düşürüldü
-        
         # Cookie popup kontrolü (önce cookie'yi kapat)
         try:
             cookie_button = driver.find_elements(By.CSS_SELECTOR, "button[id*='onetrust'], button[id*='cookie'], button[class*='cookie']")
             if cookie_button:
                 cookie_button[0].click()
                 print("[DEBUG] H&M cookie popup kapatıldı")
-                time.sleep(1)
+                wait_until_gone(driver, "button[id*='onetrust'], button[id*='cookie'], button[class*='cookie']", 1, "hm.cookie_gone")
         except:
             pass
         
-        # Sayfa yüklenmesini bekle - DOM tam yüklenene kadar bekle
+        # Sayfa yüklenmesini bekle - gerçek HTML gelene kadar (bot sayfası < 1000 karakter)
+        page_ready = lambda d: dom_html_length(d) >= 1000
         try:
-            WebDriverWait(driver, 10).until(
-                lambda d: d.execute_script("return document.readyState") == "complete"
-            )
-            # Sayfa yüklenmesi için ek bekleme
-            time.sleep(2)
-            
+            # readyState "complete" beklenmez (main.wait_page_ready mağaza koşulunu zaten bekledi);
+            # eager stratejide üçüncü parti scriptler bitmeden beden DOM'u hazır olabilir
+
             # HTML uzunluğu kontrolü - eğer çok kısaysa sayfa tam yüklenmemiş demektir
-            html_length = len(driver.page_source)
+            html_length = dom_html_length(driver)
             if html_length < 1000:  # 1000 karakterden azsa problem var
                 print(f"[DEBUG] H&M sayfa HTML çok kısa ({html_length} karakter), daha uzun bekleniyor...")
-                time.sleep(5)  # Ekstra bekleme
-                html_length = len(driver.page_source)
+                wait_until(driver, page_ready, 5, "hm.html_ready")
+                html_length = dom_html_length(driver)
                 print(f"[DEBUG] H&M sayfa HTML uzunluğu (yeniden kontrol): {html_length} karakter")
-                # Hâlâ kısa ise refresh dene (bazı sayfalarda ilk yüklemede içerik gelmiyor)
-                if html_length < 1000:
-                    try:
-                        print("[DEBUG] H&M sayfa yenileniyor (refresh)")
+
+            # Hâlâ kısa ise yeniden yükle (bazı sayfalarda ilk yüklemede içerik gelmiyor);
+            # bloklanmışken her denemeyi harcamamak için sayı max_reloads ile sınırlı
+            reloads = 0
+            while html_length < 1000 and reloads < max_reloads:
+                reloads += 1
+                try:
+                    if limiter is not None:
+                        limiter.wait_token("hm")
+                    if reloads == 2:
+                        # refresh yetmezse aynı URL'e yeniden git (hard reload)
+                        print("[DEBUG] H&M hard reload (navigate current_url)")
+                        driver.get(driver.current_url)
+                        wait_until(driver, page_ready, 10, "hm.html_after_reload")
+                    else:
+                        print(f"[DEBUG] H&M sayfa yenileniyor (refresh {reloads}/{max_reloads})")
                         driver.refresh()
-                        WebDriverWait(driver, 10).until(
-                            lambda d: d.execute_script("return document.readyState") == "complete"
-                        )
-                        time.sleep(3)
-                        html_length = len(driver.page_source)
-                        print(f"[DEBUG] H&M sayfa HTML uzunluğu (refresh sonrası): {html_length} karakter")
-                        # Çok nadir: refresh de yetmezse aynı URL'e yeniden git (hard reload)
-                        if html_length < 1000:
-                            try:
-                                current_url = driver.current_url
-                                print("[DEBUG] H&M hard reload (navigate current_url)")
-                                driver.get(current_url)
-                                WebDriverWait(driver, 10).until(
-                                    lambda d: d.execute_script("return document.readyState") == "complete"
-                                )
-                                time.sleep(3)
-                                html_length = len(driver.page_source)
-                                print(f"[DEBUG] H&M sayfa HTML uzunluğu (hard reload sonrası): {html_length} karakter")
-                            except Exception:
-                                pass
-                    except Exception:
-                        pass
-            
-            # Sayfa gerçekten yüklendi mi kontrol et (size elementleri var mı?)
-            html_length = len(driver.page_source)
+                        wait_until(driver, page_ready, 10 if reloads == 1 else 15,
+                                   "hm.html_after_refresh" if reloads == 1 else "hm.html_retry")
+                    html_length = dom_html_length(driver)
+                    print(f"[DEBUG] H&M sayfa HTML uzunluğu (yeniden yükleme {reloads}): {html_length} karakter")
+                except Exception:
+                    pass
             if html_length < 1000:
-                # Çok kısa HTML = bot detection sayfası, daha agresif bekle
-                print(f"[DEBUG] H&M HTML hâlâ kısa ({html_length}), ekstra bekleme ve retry...")
-                for retry_num in range(3):
-                    time.sleep(3)
-                    try:
-                        driver.refresh()
-                        WebDriverWait(driver, 15).until(
-                            lambda d: d.execute_script("return document.readyState") == "complete"
-                        )
-                    except Exception:
-                        pass
-                        time.sleep(4)
-                        html_length = len(driver.page_source)
-                        print(f"[DEBUG] H&M retry {retry_num+1}: HTML uzunluğu={html_length}")
-                        if html_length >= 1000:
-                    break
-            except Exception:
-                        pass
-                if html_length < 1000:
-                    print(f"[DEBUG] H&M sayfa yüklenemedi (HTML={html_length}), DOM scraper çalışmayacak")
+                print(f"[DEBUG] H&M sayfa yüklenemedi (HTML={html_length}), DOM scraper çalışmayacak")
             
             print("[DEBUG] H&M sayfa yüklendi")
         except:
             print("[DEBUG] H&M sayfa yükleme beklemesi timeout oldu, devam ediliyor...")
         
-        # Sayfayı kaydır ve dinamik içerik yüklenmesini bekle
+        # Size elementleri belirene kadar kademeli kaydır (lazy-load tetikleme);
+        # her adımda elementler gelmişse hemen çık
+        test_selectors = [
+            "div[data-testid^='sizeButton-']",
+            "div[id^='sizeButton-']",
+            "div[role='radio'][aria-label*='beden']",
+            "li > div[tabindex='0']"
+        ]
         try:
-            # İlk scroll
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight * 0.3);")
-            time.sleep(2)
-            # İkinci scroll (daha fazla aşağı)
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight * 0.5);")
-            time.sleep(2)
-            # Üçüncü scroll (tam aşağı ve geri yukarı - lazy load tetikleme)
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight * 0.7);")
-            time.sleep(3)
-            # Yukarı kaydır (size selector genelde yukarıda)
+            found_sel = None
+            for frac in (0.3, 0.5, 0.7, 0.2):
+                driver.execute_script("window.scrollTo(0, document.body.scrollHeight * arguments[0]);", frac)
+                found_sel = wait_for_any_selector(driver, test_selectors, 1.5, "hm.scroll_sizes")
+                if found_sel:
+                    print(f"[DEBUG] H&M scroll sonrası size elementi bulundu (selector: {found_sel})")
+                    break
+            # Size selector genelde yukarıda
             driver.execute_script("window.scrollTo(0, document.body.scrollHeight * 0.2);")
-            time.sleep(3)  # Biraz daha uzun bekle
-            
-            # Son kontrol: Size elementleri var mı?
-            test_selectors = [
-                "div[data-testid^='sizeButton-']",
-                "div[id^='sizeButton-']",
-                "div[role='radio'][aria-label*='beden']",
-                "li > div[tabindex='0']"
-            ]
-            found_any = False
-            for sel in test_selectors:
-                try:
-                    els = driver.find_elements(By.CSS_SELECTOR, sel)
-                    if els:
-                        found_any = True
-                        print(f"[DEBUG] H&M scroll sonrası size elementi bulundu (selector: {sel}, count: {len(els)})")
-                        break
-                except:
-                    pass
-            
-            if not found_any:
+
+            if not found_sel:
                 print("[DEBUG] H&M scroll sonrası hiç size elementi bulunamadı, ekstra bekleme...")
-                time.sleep(5)
+                wait_for_any_selector(driver, test_selectors, 5, "hm.sizes_extra")
             
             print("[DEBUG] H&M scroll işlemleri tamamlandı")
         except Exception as e:
             print(f"[DEBUG] H&M scroll hatası: {e}")
         
-        # JavaScript ile DOM hazır mı kontrol et ve beklenen elementleri kontrol et
-        try:
-            driver.execute_script("""
-                // Sayfanın tam yüklendiğinden emin ol
-                if (document.readyState !== 'complete') {
-                    return false;
-                }
-                // sizebutton içeren elementler var mı kontrol et
-                var sizeElements = document.querySelectorAll('div[id^="sizebutton-"], div[data-testid^="sizebutton-"]');
-                return sizeElements.length > 0;
-            """)
-        except:
-            pass
-        
         # Size selector'ın yüklenmesini bekle - Optimize: Öncelikli selector'lar
         size_elements = []
         wait_selectors = [
@@ -416,21 +611,15 @@ def check_stock_hm(driver, sizes_to_check):
             "*[aria-label*='beden']",  # Genel fallback
         ]
         
-        selector_found = False
-        for wait_sel in wait_selectors:
-            try:
-                wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, wait_sel)))
-                print(f"[DEBUG] H&M size selector görüldü (wait selector: {wait_sel})")
-                selector_found = True
-                # Element'lerin tam yüklenmesi için daha uzun bekle
-                time.sleep(3)
-                break
-            except TimeoutException:
-                continue
+        wait_sel = wait_for_any_selector(driver, wait_selectors, 5, "hm.size_selector")
+        selector_found = bool(wait_sel)
+        if selector_found:
+            print(f"[DEBUG] H&M size selector görüldü (wait selector: {wait_sel})")
+            # Element'lerin tam yüklenmesi için: beden bölgesi durulana kadar
+            wait_dom_settled(driver, wait_sel, 3, "hm.size_settled", quiet_ms=400)
 
         if not selector_found:
             print("[DEBUG] H&M wait selector bulunamadı, debug'a geçiliyor...")
-            time.sleep(1)  # Optimize: 2'den 1'e düşürüldü
         
         # Size elementlerini bul - ANALİZ SONUÇLARINA GÖRE: li > div[id="sizeButton-0"] formatında
         # ÖNEMLİ NOT: ID formatı büyük harfle başlıyor: sizeButton-0 (sizebutton-0 değil!)
@@ -461,28 +650,20 @@ def check_stock_hm(driver, sizes_to_check):
             "li > div"
         ]
         
-        # Tüm selector'lardan elementleri topla (tek seferde)
+        # Tüm selector'lardan elementleri topla (tek roundtrip)
         all_found_elements = []
         seen_element_ids = set()  # Duplicate element'leri önlemek için
         
-        for sel in size_selectors:
-            try:
-                found = driver.find_elements(By.CSS_SELECTOR, sel)
-                print(f"[DEBUG] H&M selector '{sel}' ile {len(found)} element bulundu")
-                for el in found:
-                    # Element'in unique ID'sini oluştur
-                    el_id = el.get_attribute("id") or el.get_attribute("data-testid") or ""
-                    el_html = el.get_attribute("outerHTML")[:100] if el.get_attribute("outerHTML") else ""
-                    
-                    # Daha önce görmüş mü kontrol et (duplicate önleme)
-                    el_key = f"{el.tag_name}_{el_id}_{el_html[:50]}"
-                    if el_key not in seen_element_ids:
-                        seen_element_ids.add(el_key)
-                        all_found_elements.append(el)
-                        print(f"[DEBUG] H&M yeni element eklendi: {el.tag_name}, id: {el_id}")
-            except Exception as e:
-                print(f"[DEBUG] H&M selector '{sel}' hatası: {e}")
-                continue
+        for group in (size_snapshot(driver, size_selectors, label="div[dir='ltr']") or []):
+            sel = group["selector"]
+            print(f"[DEBUG] H&M selector '{sel}' ile {len(group['items'])} element bulundu")
+            for el in group["items"]:
+                # Daha önce görmüş mü kontrol et (duplicate önleme)
+                el_id = el["id"] or el["testid"]
+                el_key = f"{el_id}_{el['html'][:50]}"
+                if el_key not in seen_element_ids:
+                    seen_element_ids.add(el_key)
+                    all_found_elements.append(el)
 
         print(f"[DEBUG] H&M toplam {len(all_found_elements)} element toplandı (tüm selector'lardan)")
         
@@ -491,39 +672,22 @@ def check_stock_hm(driver, sizes_to_check):
         filtered = []
         
         for el in all_found_elements:
-            try:
-                # İç div[dir="ltr"] elementi bul (analiz sonuçlarına göre bu içeride beden text'i var)
-                text = None
-                try:
-                    text_elem = el.find_element(By.CSS_SELECTOR, "div[dir='ltr']")
-                    text = text_elem.text.strip().replace("\xa0", " ").strip().upper()
-                except:
-                    # Fallback 1: direkt textContent
-                    try:
-                        text = el.text.strip().replace("\xa0", " ").strip().upper()
-                    except:
-                        pass
-                
-                # Fallback 2: aria-label'dan çıkar
-                if not text or len(text) == 0:
-                    try:
-                        aria_label = el.get_attribute("aria-label") or ""
-                        # "s beden: stokta" formatından "s" çıkar
-                        match = re.search(r'^(\w+)\s*beden', aria_label, re.IGNORECASE)
-                        if match:
-                            text = match.group(1).strip().upper()
-                    except:
-                        pass
-                
-                if text and (text in ['XXS', 'XS', 'S', 'M', 'L', 'XL', 'XXL'] or (text.isdigit() and 28 <= int(text) <= 50)):
-                    # Tekrar edenleri filtrele
-                    if text not in seen_size_labels:
-                        seen_size_labels.add(text)
-                        filtered.append(el)
-                        print(f"[DEBUG] H&M beden bulundu: '{text}' (element: {el.tag_name}, id: {el.get_attribute('id')}, testid: {el.get_attribute('data-testid')}, aria-label: {(el.get_attribute('aria-label') or '')[:50]})")
-            except Exception as inner_e:
-                print(f"[DEBUG] H&M element işlenirken hata: {inner_e}")
-                continue
+            # İç div[dir="ltr"] (analiz sonuçlarına göre beden text'i burada), yoksa element text'i
+            text = el["label"].replace("\xa0", " ").strip().upper()
+            
+            # Fallback: aria-label'dan çıkar ("s beden: stokta" formatından "s")
+            if not text:
+                match = re.search(r'^(\w+)\s*beden', el["aria"], re.IGNORECASE)
+                if match:
+                    text = match.group(1).strip().upper()
+            
+            if text and (text in ['XXS', 'XS', 'S', 'M', 'L', 'XL', 'XXL'] or (text.isdigit() and 28 <= int(text) <= 50)):
+                # Tekrar edenleri filtrele
+                if text not in seen_size_labels:
+                    seen_size_labels.add(text)
+                    el["size"] = text
+                    filtered.append(el)
+                    print(f"[DEBUG] H&M beden bulundu: '{text}' (id: {el['id']}, testid: {el['testid']}, aria-label: {el['aria'][:50]})")
 
         if filtered:
             print(f"[DEBUG] H&M toplam {len(filtered)} benzersiz size element bulundu: {sorted(seen_size_labels)}")
@@ -531,13 +695,28 @@ def check_stock_hm(driver, sizes_to_check):
         else:
             print(f"[DEBUG] H&M hiçbir element filtrelemeden geçemedi")
 
+        # Stok kararı (docstring): aria-label "stokta yok" → YOK, "stokta" → VAR
+        if size_elements:
+            wanted = set(x.strip().upper() for x in (sizes_to_check or []))
+            in_stock = []
+            for el in size_elements:
+                size_label = el["size"]
+                if wanted and size_label not in wanted:
+                    continue
+                aria_lower = el["aria"].lower()
+                if "stokta yok" in aria_lower or not el["enabled"]:
+                    print(f"[DEBUG] ❌ H&M beden '{size_label}' stokta değil (aria-label: {el['aria'][:60]})")
+                elif "stokta" in aria_lower:
+                    print(f"[DEBUG] ✅ H&M beden '{size_label}' stokta!")
+                    in_stock.append(size_label)
+            if in_stock:
+                print(f"[DEBUG] ✅ H&M toplam {len(in_stock)} beden stokta: {in_stock}")
+                return in_stock
+
         if not size_elements:
             print("[DEBUG] H&M size element bulunamadı - tüm selector'lar denendi")
             # Debug: sayfanın HTML'ini kontrol et
             try:
-                # Sayfanın tam yüklenmesini bekle (optimize: daha kısa)
-                time.sleep(1)
-                
                 page_text = driver.page_source
                 page_lower = page_text.lower()
                 
@@ -646,38 +825,8 @@ def check_stock_hm(driver, sizes_to_check):
                 data = json.loads(raw_json)
                 wanted = set(x.strip().upper() for x in (sizes_to_check or []))
 
-                def collect_sizes(obj, acc):
-                    try:
-                        if isinstance(obj, dict):
-                            # A few common H&M keys: variants, articles, variantSizes, sizes
-                            keys = obj.keys()
-                            # Heuristic: an entry with a size-like name/code and availability flag/value
-                            size_value = (obj.get('size') or obj.get('name') or obj.get('sizeName') or obj.get('code') or obj.get('title'))
-                            avail = obj.get('inStock')
-                            if avail is None:
-                                avail = obj.get('available')
-                            if avail is None:
-                                avail = obj.get('availability')
-                            if avail is None and 'stock' in obj:
-                                try:
-                                    avail = (int(obj.get('stock') or 0) > 0)
-                                except:
-                                    pass
-                            if isinstance(size_value, str):
-                                label = size_value.strip().upper().replace("\xa0", " ")
-                                if (label in ['XXS','XS','S','M','L','XL','XXL'] or (label.isdigit() and 28 <= int(label) <= 50)):
-                                    if avail is True or (isinstance(avail, str) and avail.upper() in ['IN_STOCK','AVAILABLE','OK']):
-                                        acc.add(label)
-                            for v in obj.values():
-                                collect_sizes(v, acc)
-                        elif isinstance(obj, list):
-                            for it in obj:
-                                collect_sizes(it, acc)
-                    except Exception:
-                        pass
-
                 parsed_in_stock = set()
-                collect_sizes(data, parsed_in_stock)
+                _collect_available_sizes(data, parsed_in_stock)
                 parsed_in_stock_list = sorted(parsed_in_stock)
                 if parsed_in_stock_list:
                     print(f"[DEBUG] H&M JSON fallback ile stoklar: {parsed_in_stock_list}")
@@ -692,34 +841,8 @@ def check_stock_hm(driver, sizes_to_check):
                     if raw:
                         data = json.loads(raw)
                         wanted = set(x.strip().upper() for x in (sizes_to_check or []))
-                        def collect_sizes(obj, acc):
-                            try:
-                                if isinstance(obj, dict):
-                                    size_value = (obj.get('size') or obj.get('name') or obj.get('sizeName') or obj.get('code') or obj.get('title'))
-                                    avail = obj.get('inStock')
-                                    if avail is None:
-                                        avail = obj.get('available')
-                                    if avail is None:
-                                        avail = obj.get('availability')
-                                    if avail is None and 'stock' in obj:
-                                        try:
-                                            avail = (int(obj.get('stock') or 0) > 0)
-                                        except:
-                                            pass
-                                    if isinstance(size_value, str):
-                                        label = size_value.strip().upper().replace("\xa0", " ")
-                                        if (label in ['XXS','XS','S','M','L','XL','XXL'] or (label.isdigit() and 28 <= int(label) <= 50)):
-                                            if avail is True or (isinstance(avail, str) and avail.upper() in ['IN_STOCK','AVAILABLE','OK']):
-                                                acc.add(label)
-                                    for v in obj.values():
-                                        collect_sizes(v, acc)
-                                elif isinstance(obj, list):
-                                    for it in obj:
-                                        collect_sizes(it, acc)
-                            except Exception:
-                                pass
                         parsed_in_stock = set()
-                        collect_sizes(data, parsed_in_stock)
+                        _collect_available_sizes(data, parsed_in_stock)
                         parsed_in_stock_list = sorted(parsed_in_stock)
                         if parsed_in_stock_list:
                             print(f"[DEBUG] H&M JSON (window.__NEXT_DATA__) stoklar: {parsed_in_stock_list}")
@@ -732,71 +855,18 @@ def check_stock_hm(driver, sizes_to_check):
         except Exception as e:
             print(f"[DEBUG] H&M JSON fallback hatası: {e}")
 
-        # Network fallback: performance loglarından JSON response parse et
+        # Network fallback: sayfanın aldığı JSON yanıtları (CDP Network olayları, sadece
+        # capture_patterns'a uyanlar; driverHelpers.captured_responses, her gövde bir kez parse edilir)
         try:
             import json
-            try:
-                perf_logs = driver.get_log('performance')
-            except Exception:
-                perf_logs = []
-            candidate_req_ids = []
-            for entry in perf_logs[-120:]:
-                try:
-                    msg = json.loads(entry.get('message', '{}')).get('message', {})
-                    if msg.get('method') == 'Network.responseReceived':
-                        params = msg.get('params', {})
-                        resp = params.get('response', {})
-                        mime = (resp.get('mimeType') or '').lower()
-                        url = (resp.get('url') or '').lower()
-                        if ('json' in mime) or any(k in url for k in ['json', 'variant', 'product', 'article']):
-                            candidate_req_ids.append(params.get('requestId'))
-                except Exception:
-                    pass
-
+            from driverHelpers import captured_responses
             parsed_sizes = set()
-            for rid in candidate_req_ids[-15:]:
-                if not rid:
-                    continue
-                body = None
+            for entry in captured_responses(driver, capture_patterns):
                 try:
-                    body = driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': rid})
+                    data = json.loads(entry.get('body') or '')
                 except Exception:
-                    body = None
-                if not body or not body.get('body'):
                     continue
-                try:
-                    data = json.loads(body['body'])
-                except Exception:
-                    continue
-
-                def collect_sizes(obj, acc):
-                    try:
-                        if isinstance(obj, dict):
-                            size_value = (obj.get('size') or obj.get('name') or obj.get('sizeName') or obj.get('code') or obj.get('title'))
-                            avail = obj.get('inStock')
-                            if avail is None:
-                                avail = obj.get('available')
-                            if avail is None:
-                                avail = obj.get('availability')
-                            if avail is None and 'stock' in obj:
-                                try:
-                                    avail = (int(obj.get('stock') or 0) > 0)
-                                except Exception:
-                                    pass
-                            if isinstance(size_value, str):
-                                label = size_value.strip().upper().replace("\xa0", " ")
-                                if (label in ['XXS','XS','S','M','L','XL','XXL'] or (label.isdigit() and 28 <= int(label) <= 50)):
-                                    if avail is True or (isinstance(avail, str) and str(avail).upper() in ['IN_STOCK','AVAILABLE','OK']):
-                                        acc.add(label)
-                            for v in obj.values():
-                                collect_sizes(v, acc)
-                        elif isinstance(obj, list):
-                            for it in obj:
-                                collect_sizes(it, acc)
-                    except Exception:
-                        pass
-
-                collect_sizes(data, parsed_sizes)
+                _collect_available_sizes(data, parsed_sizes)
 
             parsed_list = sorted(parsed_sizes)
             if parsed_list:
@@ -809,11 +879,7 @@ def check_stock_hm(driver, sizes_to_check):
         except Exception as e:
             print(f"[DEBUG] H&M network fallback hatası: {e}")
 
-    except Exception as debug_e:
-        print(f"[DEBUG] H&M debug hatası: {debug_e}")
-        import traceback
-        print(f"[DEBUG] H&M debug hata detayı: {traceback.format_exc()}")
-    return []
+        return []
 
     except Exception as e:
         print(f"[DEBUG] check_stock_hm genel hatası: {e}")
@@ -837,12 +903,9 @@ def check_stock_mango(driver, sizes_to_check):
       - Eşleşme case-insensitive yapılır.
     """
     try:
-        wait = WebDriverWait(driver, 25)
-
-        # Sayfayı kaydır (lazy-load için)
+        # Sayfayı kaydır (lazy-load için) — beklemeyi aşağıdaki selector beklemesi yapar
         try:
             driver.execute_script("window.scrollTo(0, document.body.scrollHeight * 0.4);")
-            time.sleep(2)
         except:
             pass
         
@@ -852,7 +915,7 @@ def check_stock_mango(driver, sizes_to_check):
             if cookie_button:
                 cookie_button[0].click()
                 print("[DEBUG] Mango cookie popup kapatıldı")
-            time.sleep(1)
+                wait_until_gone(driver, "button[id*='onetrust'], button[id*='cookie'], button[class*='cookie']", 1, "mango.cookie_gone")
         except:
             pass
         
@@ -867,16 +930,12 @@ def check_stock_mango(driver, sizes_to_check):
             "button[aria-controls*='size']"
         ]
         
-        selector_found = False
-        for wait_sel in wait_selectors:
-            try:
-                wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, wait_sel)))
-                print(f"[DEBUG] Mango size selector görüldü (wait selector: {wait_sel})")
-                selector_found = True
-                time.sleep(2.5)  # Dinamik class güncellemeleri için daha uzun bekle
-                break
-            except TimeoutException:
-                continue
+        wait_sel = wait_for_any_selector(driver, wait_selectors, 25, "mango.size_selector")
+        selector_found = bool(wait_sel)
+        if selector_found:
+            print(f"[DEBUG] Mango size selector görüldü (wait selector: {wait_sel})")
+            # Dinamik class güncellemeleri (notAvailable/selectable) oturana kadar
+            wait_dom_settled(driver, wait_sel, 2.5, "mango.size_settled", quiet_ms=500)
         
         if not selector_found:
             print("[DEBUG] Mango size selector görünmedi - tüm wait selector'lar denendi")
@@ -895,111 +954,72 @@ def check_stock_mango(driver, sizes_to_check):
             "li button[class*='size']"
         ]
         
-        size_elements = []
+        # Tüm beden/durum bilgisi tek execute_script ile (eleman başına roundtrip yok)
+        snapshot = size_snapshot(driver, size_selectors, label="span.textactionm_classname__8mcjk") or []
+        size_entries = []
         seen_texts = set()
-        
-        for sel in size_selectors:
-            try:
-                found = driver.find_elements(By.CSS_SELECTOR, sel)
-                if found:
-                    # Tekrar edenleri filtrele
-                    for el in found:
-                        try:
-                            size_text_elem = el.find_element(By.CSS_SELECTOR, "span.textactionm_classname__8mcjk")
-                            size_text = size_text_elem.text.strip().upper()
-                            if size_text and size_text not in seen_texts:
-                                seen_texts.add(size_text)
-                                size_elements.append(el)
-                        except:
-                            # Fallback: direkt textContent
-                            size_text = el.text.strip().upper()
-                            if size_text and size_text not in seen_texts:
-                                seen_texts.add(size_text)
-                                size_elements.append(el)
-                    
-                    if size_elements:
-                        print(f"[DEBUG] Mango {len(size_elements)} benzersiz size element bulundu (selector: {sel})")
-                    break
-            except:
+        for group in snapshot:
+            items = group.get("items") or []
+            if not items:
                 continue
-
-        if not size_elements:
+            # Tekrar edenleri filtrele
+            for entry in items:
+                size_text = (entry.get("label") or "").strip().upper()
+                if size_text and size_text not in seen_texts:
+                    seen_texts.add(size_text)
+                    entry["size"] = size_text
+                    size_entries.append(entry)
+            if size_entries:
+                print(f"[DEBUG] Mango {len(size_entries)} benzersiz size element bulundu (selector: {group.get('selector')})")
+            break
+
+        if not size_entries:
             print("[DEBUG] Mango size element bulunamadı")
             return []
 
         wanted = set(x.strip().upper() for x in (sizes_to_check or []))
         in_stock = []
         
-        for button in size_elements:
-            try:
-                # Size text'i bul
-                try:
-                    size_text_elem = button.find_element(By.CSS_SELECTOR, "span.textactionm_classname__8mcjk")
-                    size_label = size_text_elem.text.strip().upper()
-                except:
-                    size_label = button.text.strip().upper()
-
-                if not size_label:
+        for entry in size_entries:
+            size_label = entry["size"]
+
+            # İstenen beden kontrolü
+            if not wanted or size_label in wanted:
+                # Mango stok kontrolü - Analiz sonuçlarına göre:
+                # Button'un içindeki span'de "notavailable" varsa → stok YOK
+                # Button'da "selectable" varsa → stok VAR
+                class_lower = entry.get("cls") or ""
+                html_lower = entry.get("html") or ""
+
+                # Button'un (ve iç span'lerinin) HTML'inde notavailable var mı kontrol et
+                if "notavailable" in html_lower or "not-available" in html_lower:
+                    print(f"[DEBUG] ❌ Mango beden '{size_label}' stokta değil (HTML'de notAvailable)")
                     continue
 
-                # İstenen beden kontrolü
-                if not wanted or size_label in wanted:
-                    # Mango stok kontrolü - Analiz sonuçlarına göre:
-                    # Button'un içindeki span'de "notavailable" varsa → stok YOK
-                    # Button'da "selectable" varsa → stok VAR
-                    class_attr = button.get_attribute("class") or ""
-                    class_lower = class_attr.lower()
-                    html_lower = (button.get_attribute("outerHTML") or "").lower()
-
-                    # İç span'de notavailable var mı kontrol et
-                    try:
-                        inner_spans = button.find_elements(By.CSS_SELECTOR, "span[class*='notavailable'], span[class*='not-available']")
-                        if inner_spans:
-                            inner_class = (inner_spans[0].get_attribute("class") or "").lower()
-                            if "notavailable" in inner_class:
-                                print(f"[DEBUG] ❌ Mango beden '{size_label}' stokta değil (iç span'de notAvailable: {inner_class[:50]})")
+                # notify-availability popup kontrolü
+                if "notify-availability" in html_lower or "beni haberdar et" in html_lower:
+                    print(f"[DEBUG] ❌ Mango beden '{size_label}' stokta değil (notify popup)")
                     continue
-                    except Exception:
-                        pass
 
-                    # Button'un HTML'inde notavailable var mı kontrol et
-                    if "notavailable" in html_lower or "not-available" in html_lower:
-                        print(f"[DEBUG] ❌ Mango beden '{size_label}' stokta değil (HTML'de notAvailable)")
-                        continue
-
-                    # notify-availability popup kontrolü
-                    if "notify-availability" in html_lower or "beni haberdar et" in html_lower:
-                        print(f"[DEBUG] ❌ Mango beden '{size_label}' stokta değil (notify popup)")
-                        continue
-
-                    # selectable class kontrolü (button level)
-                    if "selectable" in class_lower:
-                        print(f"[DEBUG] ✅ Mango beden '{size_label}' stokta! (selectable class)")
+                # selectable class kontrolü (button level)
+                if "selectable" in class_lower:
+                    print(f"[DEBUG] ✅ Mango beden '{size_label}' stokta! (selectable class)")
                     in_stock.append(size_label)
-                        continue
+                    continue
 
-                    # Parent li'de selectable var mı?
-                    try:
-                        parent_li = button.find_element(By.XPATH, "./ancestor::li[1]")
-                        parent_class = (parent_li.get_attribute("class") or "").lower()
-                        if "selectable" in parent_class:
-                            print(f"[DEBUG] ✅ Mango beden '{size_label}' stokta! (parent li'de selectable)")
-                            in_stock.append(size_label)
-                continue
-            except Exception:
-                        pass
+                # Parent li'de selectable var mı?
+                if "selectable" in (entry.get("li_cls") or ""):
+                    print(f"[DEBUG] ✅ Mango beden '{size_label}' stokta! (parent li'de selectable)")
+                    in_stock.append(size_label)
+                    continue
 
-                    # Disabled kontrolü
-                    if button.get_attribute("disabled") or button.get_attribute("aria-disabled") == "true":
-                        print(f"[DEBUG] ❌ Mango beden '{size_label}' disabled")
-                continue
+                # Disabled kontrolü
+                if entry.get("disabled_attr") or entry.get("aria_disabled"):
+                    print(f"[DEBUG] ❌ Mango beden '{size_label}' disabled")
+                    continue
 
-                    # Belirsiz durum - varsayılan olarak stokta değil
-                    print(f"[DEBUG] ❌ Mango beden '{size_label}' stokta değil (belirsiz, selectable yok)")
-                        
-            except Exception as e:
-                print(f"[DEBUG] Mango size element işlenirken hata: {e}")
-                continue
+                # Belirsiz durum - varsayılan olarak stokta değil
+                print(f"[DEBUG] ❌ Mango beden '{size_label}' stokta değil (belirsiz, selectable yok)")
 
         if in_stock:
             print(f"[DEBUG] ✅ Mango toplam {len(in_stock)} beden stokta: {in_stock}")
@@ -1030,12 +1050,9 @@ def check_stock_stradivarius(driver, sizes_to_check):
       - Eşleşme case-insensitive yapılır.
     """
     try:
-        wait = WebDriverWait(driver, 25)
-        
-        # Sayfayı kaydır (lazy-load için)
+        # Sayfayı kaydır (lazy-load için) — beklemeyi aşağıdaki selector beklemesi yapar
         try:
             driver.execute_script("window.scrollTo(0, document.body.scrollHeight * 0.4);")
-            time.sleep(2)
         except:
             pass
         
@@ -1045,7 +1062,7 @@ def check_stock_stradivarius(driver, sizes_to_check):
             if cookie_button:
                 cookie_button[0].click()
                 print("[DEBUG] Stradivarius cookie popup kapatıldı")
-                time.sleep(1)
+                wait_until_gone(driver, "button[id*='onetrust'], button[id*='cookie'], button[class*='cookie']", 1, "stradivarius.cookie_gone")
         except:
             pass
         
@@ -1057,20 +1074,13 @@ def check_stock_stradivarius(driver, sizes_to_check):
             "li[aria-label]"
         ]
         
-        selector_found = False
-        for wait_sel in wait_selectors:
-            try:
-                wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, wait_sel)))
-                print(f"[DEBUG] Stradivarius size selector görüldü (wait selector: {wait_sel})")
-                selector_found = True
-                time.sleep(2)  # Element'lerin tam yüklenmesi için
-                break
-            except TimeoutException:
-                continue
-        
-        if not selector_found:
+        wait_sel = wait_for_any_selector(driver, wait_selectors, 25, "stradivarius.size_selector")
+        if wait_sel:
+            print(f"[DEBUG] Stradivarius size selector görüldü (wait selector: {wait_sel})")
+            # Element'lerin tam yüklenmesi için: beden bölgesi durulana kadar
+            wait_dom_settled(driver, wait_sel, 2, "stradivarius.size_settled", quiet_ms=400)
+        else:
             print("[DEBUG] Stradivarius size selector görünmedi - tüm wait selector'lar denendi")
-            time.sleep(2)  # Yine de biraz bekle
         
         # Size elementlerini bul - Analiz sonuçlarına göre: li > button[data-cy="product-normal-size-button"]
         size_selectors = [
@@ -1081,100 +1091,65 @@ def check_stock_stradivarius(driver, sizes_to_check):
             "li[aria-label] button"  # li aria-label ile
         ]
         
+        valid_letter_sizes = ['XXS', 'XS', 'S', 'M', 'L', 'XL', 'XXL', 'XXXL']
+
+        def entry_size_label(entry):
+            # Beden text'i - analiz sonuçlarına göre div.sc-hoLldG içinde
+            if entry.get("has_label"):
+                return entry["label"].strip().upper()
+            # Fallback 1: li'nin aria-label'ından ("XS beden" veya "32 beden" formatı)
+            aria_label_raw = (entry.get("li_aria") or "").strip()
+            if aria_label_raw:
+                match = re.search(r'^(\w+)\s*beden', aria_label_raw, re.IGNORECASE)
+                return (match.group(1) if match else aria_label_raw).strip().upper()
+            # Fallback 2: direkt button text
+            button_text = (entry.get("text") or "").strip().upper()
+            if button_text:
+                return button_text
+            # Fallback 3: Button ID'sinden beden çıkar (örn: product-451624756-size-button-l -> "l")
+            button_id = entry.get("id") or ""
+            if "-size-button-" in button_id:
+                size_from_id = button_id.split("-size-button-")[-1].strip().upper()
+                if size_from_id in valid_letter_sizes or (size_from_id.isdigit() and 28 <= int(size_from_id) <= 50):
+                    return size_from_id
+            return None
+
+        # Tüm butonlar + container grubu/y konumu tek execute_script ile
+        snapshot = size_snapshot(driver, size_selectors, label="div.sc-hoLldG, div[class*='hoLldG']", group=True) or []
         size_elements = []
         seen_size_labels = set()
         
-        for sel in size_selectors:
-            try:
-                found = driver.find_elements(By.CSS_SELECTOR, sel)
-                print(f"[DEBUG] Stradivarius selector '{sel}' ile {len(found)} element bulundu")
-                if found:
-                    for button in found:
-                        try:
-                            size_label = None
-                            # Beden text'i bul - analiz sonuçlarına göre div.sc-hoLldG içinde
-                            try:
-                                # Önce div.sc-hoLldG içinde ara
-                                size_div = button.find_element(By.CSS_SELECTOR, "div.sc-hoLldG, div[class*='hoLldG']")
-                                size_label = size_div.text.strip().upper()
-                                if not size_label:
-                                    raise NoSuchElementException("Empty text in div.sc-hoLldG")
-                            except (NoSuchElementException, Exception) as e1:
-                                # Fallback 1: li'nin aria-label'ından
-                                try:
-                                    parent_li = button.find_element(By.XPATH, "./ancestor::li[1]")
-                                    aria_label_raw = parent_li.get_attribute("aria-label") or ""
-                                    if aria_label_raw:
-                                        # "XS beden" veya "32 beden" formatından sadece beden kısmını al
-                                        import re
-                                        match = re.search(r'^(\w+)\s*beden', aria_label_raw.strip(), re.IGNORECASE)
-                                        if match:
-                                            size_label = match.group(1).strip().upper()
-                                        else:
-                                            size_label = aria_label_raw.strip().upper()
-                                except Exception as e2:
-                                    # Fallback 2: direkt button text
-                                    button_text = button.text.strip().upper()
-                                    if button_text:
-                                        size_label = button_text
-                            
-                            # Debug: bulunan text'i göster
-                            # Fallback 3: Button ID'sinden beden çıkar (örn: product-451624756-size-button-l -> "l")
-                            if not size_label:
-                                try:
-                                    button_id = button.get_attribute("id") or ""
-                                    if button_id and "-size-button-" in button_id:
-                                        # ID formatı: product-XXX-size-button-XXS veya product-XXX-size-button-35
-                                        parts = button_id.split("-size-button-")
-                                        if len(parts) > 1:
-                                            size_from_id = parts[-1].strip().upper()
-                                            # Geçerli beden formatı mı kontrol et
-                                            if size_from_id in ['XXS', 'XS', 'S', 'M', 'L', 'XL', 'XXL', 'XXXL'] or (size_from_id.isdigit() and 28 <= int(size_from_id) <= 50):
-                                                size_label = size_from_id
-                                                print(f"[DEBUG] Stradivarius beden text bulundu (button id): '{size_label}'")
-                                except:
-                                    pass
-                            
-                            if not size_label:
-                                button_html = (button.get_attribute("outerHTML") or "")[:150]
-                                print(f"[DEBUG] Stradivarius button text bulunamadı (html: {button_html}...)")
-                                continue
-                            
-                            # Text temizleme: gereksiz karakterleri kaldır
-                            size_label = size_label.replace("\xa0", " ").strip().upper()
-                            
-                            # Beden formatı kontrolü (daha esnek)
-                            is_valid_size = False
-                            if size_label in ['XXS', 'XS', 'S', 'M', 'L', 'XL', 'XXL', 'XXXL']:
-                                is_valid_size = True
-                            elif size_label.isdigit() and 28 <= int(size_label) <= 50:
-                                is_valid_size = True
-                            elif len(size_label) <= 3:  # Kısa text'ler de geçerli olabilir (38, 40, vs)
-                                try:
-                                    int(size_label)
-                                    if 28 <= int(size_label) <= 50:
-                                        is_valid_size = True
-                                except:
-                                    pass
-                            
-                            if is_valid_size:
-                                # Tekrar edenleri filtrele
-                                if size_label not in seen_size_labels:
-                                    seen_size_labels.add(size_label)
-                                    size_elements.append(button)
-                                    print(f"[DEBUG] Stradivarius beden bulundu: '{size_label}' (button id: {button.get_attribute('id')})")
-                            else:
-                                print(f"[DEBUG] Stradivarius geçersiz beden formatı: '{size_label}'")
-                        except Exception as inner_e:
-                            print(f"[DEBUG] Stradivarius button işlenirken hata: {inner_e}")
-                            continue
-                    
-                    if size_elements:
-                        print(f"[DEBUG] Stradivarius {len(size_elements)} benzersiz size element bulundu (selector: {sel})")
-                        break
-            except Exception as e:
-                print(f"[DEBUG] Stradivarius selector '{sel}' hatası: {e}")
+        for snap_group in snapshot:
+            sel = snap_group.get("selector")
+            found = snap_group.get("items") or []
+            print(f"[DEBUG] Stradivarius selector '{sel}' ile {len(found)} element bulundu")
+            if not found:
                 continue
+            for entry in found:
+                size_label = entry_size_label(entry)
+                if not size_label:
+                    print(f"[DEBUG] Stradivarius button text bulunamadı (html: {(entry.get('html') or '')[:150]}...)")
+                    continue
+                
+                # Text temizleme: gereksiz karakterleri kaldır
+                size_label = size_label.replace("\xa0", " ").strip().upper()
+                
+                # Beden formatı kontrolü
+                is_valid_size = size_label in valid_letter_sizes or (size_label.isdigit() and 28 <= int(size_label) <= 50)
+                
+                if is_valid_size:
+                    # Tekrar edenleri filtrele
+                    if size_label not in seen_size_labels:
+                        seen_size_labels.add(size_label)
+                        entry["size"] = size_label
+                        size_elements.append(entry)
+                        print(f"[DEBUG] Stradivarius beden bulundu: '{size_label}' (button id: {entry.get('id')})")
+                else:
+                    print(f"[DEBUG] Stradivarius geçersiz beden formatı: '{size_label}'")
+            
+            if size_elements:
+                print(f"[DEBUG] Stradivarius {len(size_elements)} benzersiz size element bulundu (selector: {sel})")
+                break
         
         if not size_elements:
             print("[DEBUG] Stradivarius size element bulunamadı")
@@ -1183,200 +1158,94 @@ def check_stock_stradivarius(driver, sizes_to_check):
         # Birden fazla bölümde (öneri carouselleri, popuplar vb.) aynı selector'lar olabilir.
         # Ana ürünün beden listesini seçmek için, butonları en yakın container'a göre gruplayıp
         # sayfada en üstte yer alan (y konumu en küçük) ve en az 3 beden içeren grubu seçeceğiz.
-        try:
-            container_to_buttons = {}
-            container_to_y = {}
-            for btn in list(size_elements):
-                container = None
-                try:
-                    # Önce UL container'ı dene
-                    container = btn.find_element(By.XPATH, "./ancestor::ul[1]")
-        except Exception:
-                    pass
-                if container is None:
-                    try:
-                        # Sonra div içinde product-size geçen sınıfı olan container'ı dene
-                        container = btn.find_element(By.XPATH, "./ancestor::div[contains(@class,'product-size')][1]")
-    except Exception:
-                        pass
-                # Hiçbiri bulunamazsa, bir üst div'e bağla (gevşek fallback)
-                if container is None:
-                    try:
-                        container = btn.find_element(By.XPATH, "./ancestor::div[1]")
-                    except Exception:
-                        continue
-
-                key = container
-                if key not in container_to_buttons:
-                    container_to_buttons[key] = []
-                    try:
-                        container_to_y[key] = container.location.get('y', 999999)
-                    except Exception:
-                        container_to_y[key] = 999999
-                container_to_buttons[key].append(btn)
-
-            # Uygun container'ı seç: en az 3 farklı beden içersin ve sayfada en yukarıda olsun
-            def count_unique_sizes(buttons_list):
-                uniq = set()
-                for b in buttons_list:
-                    try:
-                        txt = (b.text or "").strip().upper()
-                        if txt:
-                            uniq.add(txt)
-                    except Exception:
-                        continue
-                return len(uniq)
-
-            selected_container = None
-            best_y = 999999
-            for cont, btns in container_to_buttons.items():
-                uniq_count = count_unique_sizes(btns)
-                y = container_to_y.get(cont, 999999)
-                if uniq_count >= 3 and y < best_y:
-                    best_y = y
-                    selected_container = cont
-
-            if selected_container is not None:
-                size_elements = container_to_buttons[selected_container]
-                print(f"[DEBUG] Stradivarius ana beden container seçildi: y={best_y}, buton sayısı={len(size_elements)}")
-            else:
-                print("[DEBUG] Stradivarius uygun bir ana container bulunamadı, tüm bulunan elementler kullanılacak")
-        except Exception as e:
-            print(f"[DEBUG] Stradivarius container gruplama hatası: {e}")
+        # (container indeksi ve y konumu snapshot'ta JS tarafında hesaplandı)
+        container_to_buttons = {}
+        container_to_y = {}
+        for entry in size_elements:
+            key = entry.get("group")
+            if key is None:
+                continue
+            container_to_buttons.setdefault(key, []).append(entry)
+            y = entry.get("y")
+            container_to_y[key] = y if y is not None else 999999
+
+        selected_container = None
+        best_y = 999999
+        for cont, entries in container_to_buttons.items():
+            uniq_count = len({(e.get("text") or "").strip().upper() for e in entries} - {""})
+            y = container_to_y.get(cont, 999999)
+            if uniq_count >= 3 and y < best_y:
+                best_y = y
+                selected_container = cont
+
+        if selected_container is not None:
+            size_elements = container_to_buttons[selected_container]
+            print(f"[DEBUG] Stradivarius ana beden container seçildi: y={best_y}, buton sayısı={len(size_elements)}")
+        else:
+            print("[DEBUG] Stradivarius uygun bir ana container bulunamadı, tüm bulunan elementler kullanılacak")
         
         wanted = set(x.strip().upper() for x in (sizes_to_check or []))
         in_stock = []
         
-        for button in size_elements:
-            try:
-                size_label = None
-                # Beden text'ini tekrar al
-                try:
-                    size_div = button.find_element(By.CSS_SELECTOR, "div.sc-hoLldG, div[class*='hoLldG']")
-                    size_label = size_div.text.strip().upper()
-                    if size_label:  # Boş olmadığından emin ol
-                        print(f"[DEBUG] Stradivarius beden text bulundu (div.sc-hoLldG): '{size_label}'")
-                except:
-                    pass
+        for entry in size_elements:
+            size_label = entry["size"]
+            
+            # İstenen beden kontrolü
+            if not wanted or size_label in wanted:
+                print(f"[DEBUG] Stradivarius beden '{size_label}' istenenler arasında, stok kontrol ediliyor...")
+                # Stradivarius stok kontrolü - Analiz sonuçlarına göre:
+                # 1. disabled attribute varsa → stok YOK
+                # 2. data-cy="grid-product-size-stock-none" varsa → stok YOK
+                # 3. "benzer ürünleri görüntüle" text'i varsa → stok YOK
+                # 4. "bana haber ver" veya "stok olmayınca bana haber ver" text'i varsa → stok YOK
+                # 5. Yoksa → stok VAR
                 
-                # Fallback 1: aria-label
-                if not size_label:
-                    try:
-                        parent_li = button.find_element(By.XPATH, "./ancestor::li[1]")
-                        aria_label_raw = parent_li.get_attribute("aria-label") or ""
-                        if aria_label_raw:
-                            # "XS beden" formatından beden çıkar
-                            import re
-                            match = re.search(r'^(\w+)\s*beden', aria_label_raw.strip(), re.IGNORECASE)
-                            if match:
-                                size_label = match.group(1).strip().upper()
-                            else:
-                                size_label = aria_label_raw.strip().upper()
-                        if size_label:
-                            print(f"[DEBUG] Stradivarius beden text bulundu (aria-label): '{size_label}'")
-                    except:
-                        pass
+                is_disabled = bool(entry.get("disabled_attr"))
+                html_lower = entry.get("html") or ""
+                button_text = (entry.get("text") or "").lower()
+                button_class_lower = entry.get("cls") or ""
+                # Parent li (snapshot'ta yoksa boş string)
+                parent_html = entry.get("li_html") or ""
+                parent_text = entry.get("li_text") or ""
+                parent_class_lower = entry.get("li_cls") or ""
                 
-                # Fallback 2: button text
-                if not size_label:
-                    try:
-                        size_label = button.text.strip().upper()
-                        if size_label:
-                            print(f"[DEBUG] Stradivarius beden text bulundu (button text): '{size_label}'")
-                    except:
-                        pass
+                # data-cy="grid-product-size-stock-none" kontrolü
+                has_stock_none = "stock-none" in html_lower or "stock-none" in parent_html
                 
-                # Fallback 3: Button ID'sinden beden çıkar (örn: product-451624756-size-button-l -> "l")
-                if not size_label:
-                    try:
-                        button_id = button.get_attribute("id") or ""
-                        if button_id and "-size-button-" in button_id:
-                            # ID formatı: product-XXX-size-button-XXS veya product-XXX-size-button-35
-                            parts = button_id.split("-size-button-")
-                            if len(parts) > 1:
-                                size_from_id = parts[-1].strip().upper()
-                                # Geçerli beden formatı mı kontrol et
-                                if size_from_id in ['XXS', 'XS', 'S', 'M', 'L', 'XL', 'XXL', 'XXXL'] or (size_from_id.isdigit() and 28 <= int(size_from_id) <= 50):
-                                    size_label = size_from_id
-                                    print(f"[DEBUG] Stradivarius beden text bulundu (button id): '{size_label}'")
-                    except:
-                        pass
+                # "benzer ürünleri görüntüle" kontrolü
+                has_similar_products = ("benzer ürün" in button_text or "benzer ürünleri görüntüle" in html_lower
+                                        or "benzer ürün" in parent_text)
                 
-                if not size_label:
-                    print(f"[DEBUG] Stradivarius beden text bulunamadı, button id: {button.get_attribute('id')}")
-                    continue
+                # "bana haber ver" veya "stok olmayınca bana haber ver" kontrolü
+                has_notify_me = ("bana haber ver" in button_text or "bana haber ver" in html_lower
+                                 or "bana haber ver" in parent_text)
+
+                # Class tabanlı durum sezgileri (kXgBpS = OOS, lbblEr = in-stock) - saha çıktısından
+                has_oos_by_class = ("kxgbps" in button_class_lower) or ("kxgbps" in parent_html) or ("kxgbps" in parent_class_lower)
+                has_instock_by_class = ("lbblEr".lower() in button_class_lower) or ("lbblEr".lower() in parent_html)
                 
-                # İstenen beden kontrolü
-                if not wanted or size_label in wanted:
-                    print(f"[DEBUG] Stradivarius beden '{size_label}' istenenler arasında, stok kontrol ediliyor...")
-                    # Stradivarius stok kontrolü - Analiz sonuçlarına göre:
-                    # 1. disabled attribute varsa → stok YOK
-                    # 2. data-cy="grid-product-size-stock-none" varsa → stok YOK
-                    # 3. "benzer ürünleri görüntüle" text'i varsa → stok YOK
-                    # 4. "bana haber ver" veya "stok olmayınca bana haber ver" text'i varsa → stok YOK
-                    # 5. Yoksa → stok VAR
-                    
-                    is_disabled = button.get_attribute("disabled") is not None
-                    html_lower = (button.get_attribute("outerHTML") or "").lower()
-                    button_text = (button.text or "").lower()
-                    button_class_lower = (button.get_attribute("class") or "").lower()
-                    
-                    # data-cy="grid-product-size-stock-none" kontrolü
-                    has_stock_none = "grid-product-size-stock-none" in html_lower or "stock-none" in html_lower
-                    
-                    # "benzer ürünleri görüntüle" kontrolü
-                    has_similar_products = "benzer ürünleri görüntüle" in button_text or "benzer ürünleri görüntüle" in html_lower or "benzer ürün" in button_text
-                    
-                    # "bana haber ver" veya "stok olmayınca bana haber ver" kontrolü
-                    has_notify_me = "bana haber ver" in button_text or "bana haber ver" in html_lower or "stok olmayınca bana haber ver" in button_text or "stok olmayınca bana haber ver" in html_lower
-                    
-                    # Parent li'de de kontrol et
-                    try:
-                        parent_li = button.find_element(By.XPATH, "./ancestor::li[1]")
-                        parent_html = (parent_li.get_attribute("outerHTML") or "").lower()
-                        parent_text = (parent_li.text or "").lower()
-                        parent_class_lower = (parent_li.get_attribute("class") or "").lower()
-                        if "benzer ürünleri görüntüle" in parent_text or "benzer ürün" in parent_text:
-                            has_similar_products = True
-                        if "bana haber ver" in parent_text or "stok olmayınca bana haber ver" in parent_text:
-                            has_notify_me = True
-                        if "grid-product-size-stock-none" in parent_html or "stock-none" in parent_html:
-                            has_stock_none = True
-                    except:
-                        pass
-
-                    # Class tabanlı durum sezgileri (kXgBpS = OOS, lbblEr = in-stock) - saha çıktısından
-                    has_oos_by_class = ("kxgbps" in button_class_lower) or ("kxgbps" in parent_html) or ("kxgbps" in (parent_class_lower if 'parent_class_lower' in locals() else ""))
-                    has_instock_by_class = ("lbblEr".lower() in button_class_lower) or ("lbblEr".lower() in parent_html)
-                    
-                    print(f"[DEBUG] Stradivarius beden '{size_label}' - disabled={is_disabled}, stock-none={has_stock_none}, similar_products={has_similar_products}, notify_me={has_notify_me}, oosByClass={has_oos_by_class}, inByClass={has_instock_by_class}")
-                    
-                    if is_disabled:
-                        print(f"[DEBUG] ❌ Stradivarius beden '{size_label}' stokta değil (disabled attribute)")
-                        continue
-                    elif has_stock_none:
-                        print(f"[DEBUG] ❌ Stradivarius beden '{size_label}' stokta değil (data-cy='grid-product-size-stock-none')")
-                        continue
-                    elif has_oos_by_class:
-                        print(f"[DEBUG] ❌ Stradivarius beden '{size_label}' stokta değil (class heuristic)")
-                        continue
-                    elif has_similar_products:
-                        print(f"[DEBUG] ❌ Stradivarius beden '{size_label}' stokta değil ('benzer ürünleri görüntüle' text'i bulundu)")
-                        continue
-                    elif has_notify_me:
-                        print(f"[DEBUG] ❌ Stradivarius beden '{size_label}' stokta değil ('bana haber ver' text'i bulundu)")
-                        continue
-                    else:
-                        print(f"[DEBUG] ✅ Stradivarius beden '{size_label}' stokta!")
-                        in_stock.append(size_label)
+                print(f"[DEBUG] Stradivarius beden '{size_label}' - disabled={is_disabled}, stock-none={has_stock_none}, similar_products={has_similar_products}, notify_me={has_notify_me}, oosByClass={has_oos_by_class}, inByClass={has_instock_by_class}")
+                
+                if is_disabled:
+                    print(f"[DEBUG] ❌ Stradivarius beden '{size_label}' stokta değil (disabled attribute)")
+                    continue
+                elif has_stock_none:
+                    print(f"[DEBUG] ❌ Stradivarius beden '{size_label}' stokta değil (data-cy='grid-product-size-stock-none')")
+                    continue
+                elif has_oos_by_class:
+                    print(f"[DEBUG] ❌ Stradivarius beden '{size_label}' stokta değil (class heuristic)")
+                    continue
+                elif has_similar_products:
+                    print(f"[DEBUG] ❌ Stradivarius beden '{size_label}' stokta değil ('benzer ürünleri görüntüle' text'i bulundu)")
+                    continue
+                elif has_notify_me:
+                    print(f"[DEBUG] ❌ Stradivarius beden '{size_label}' stokta değil ('bana haber ver' text'i bulundu)")
+                    continue
                 else:
-                    print(f"[DEBUG] Stradivarius beden '{size_label}' istenenler arasında değil (wanted: {list(wanted)})")
-                        
-            except Exception as e:
-                print(f"[DEBUG] Stradivarius button işlenirken hata: {e}")
-                import traceback
-                print(f"[DEBUG] Stradivarius hata detayı: {traceback.format_exc()}")
-                continue
+                    print(f"[DEBUG] ✅ Stradivarius beden '{size_label}' stokta!")
+                    in_stock.append(size_label)
+            else:
+                print(f"[DEBUG] Stradivarius beden '{size_label}' istenenler arasında değil (wanted: {list(wanted)})")
         
         if in_stock:
             print(f"[DEBUG] ✅ Stradivarius toplam {len(in_stock)} beden stokta: {in_stock}")
@@ -1408,12 +1277,9 @@ def check_stock_oysho(driver, sizes_to_check):
       - Eşleşme case-insensitive yapılır.
     """
     try:
-        wait = WebDriverWait(driver, 25)
-        
-        # Sayfayı kaydır (lazy-load için)
+        # Sayfayı kaydır (lazy-load için) — beklemeyi aşağıdaki selector beklemesi yapar
         try:
             driver.execute_script("window.scrollTo(0, document.body.scrollHeight * 0.4);")
-            time.sleep(2)
         except:
             pass
         
@@ -1423,7 +1289,7 @@ def check_stock_oysho(driver, sizes_to_check):
             if cookie_button:
                 cookie_button[0].click()
                 print("[DEBUG] Oysho cookie popup kapatıldı")
-                time.sleep(1)
+                wait_until_gone(driver, "button[id*='onetrust'], button[id*='cookie'], button[class*='cookie']", 1, "oysho.cookie_gone")
         except:
             pass
         
@@ -1435,20 +1301,13 @@ def check_stock_oysho(driver, sizes_to_check):
             "li[class*='size-item'] button"
         ]
         
-        selector_found = False
-        for wait_sel in wait_selectors:
-            try:
-                wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, wait_sel)))
-                print(f"[DEBUG] Oysho size selector görüldü (wait selector: {wait_sel})")
-                selector_found = True
-                time.sleep(2)  # Element'lerin tam yüklenmesi için
-                break
-    except TimeoutException:
-                pass
-        
-        if not selector_found:
+        wait_sel = wait_for_any_selector(driver, wait_selectors, 25, "oysho.size_selector")
+        if wait_sel:
+            print(f"[DEBUG] Oysho size selector görüldü (wait selector: {wait_sel})")
+            # Element'lerin tam yüklenmesi için: beden bölgesi durulana kadar
+            wait_dom_settled(driver, wait_sel, 2, "oysho.size_settled", quiet_ms=400)
+        else:
             print("[DEBUG] Oysho size selector görünmedi - tüm wait selector'lar denendi")
-            time.sleep(2)  # Yine de biraz bekle
         
         # Size elementlerini bul - Analiz sonuçlarına göre: button[data-testid="product-size-selector-item"]
         size_selectors = [
@@ -1458,61 +1317,38 @@ def check_stock_oysho(driver, sizes_to_check):
             "li[class*='size-item'] button"  # Genel
         ]
         
+        # Tüm butonlar ve durum alanları tek execute_script ile
+        snapshot = size_snapshot(driver, size_selectors, label="span") or []
         size_elements = []
         seen_size_labels = set()
         
-        for sel in size_selectors:
-            try:
-                found = driver.find_elements(By.CSS_SELECTOR, sel)
-                print(f"[DEBUG] Oysho selector '{sel}' ile {len(found)} element bulundu")
-                if found:
-                    for button in found:
-                        try:
-                            # Beden text'i bul - analiz sonuçlarına göre span içinde
-                            try:
-                                # Önce span içinde ara
-                                size_span = button.find_element(By.CSS_SELECTOR, "span")
-                                size_label = size_span.text.strip().upper()
-                            except NoSuchElementException:
-                                # Fallback: direkt button text
-                                size_label = button.text.strip().upper()
-                            
-                            if not size_label:
-                                continue
-                            
-                            # Text temizleme
-                            size_label = size_label.replace("\xa0", " ").strip().upper()
-                            
-                            # Beden formatı kontrolü
-                            is_valid_size = False
-                            if size_label in ['XXS', 'XS', 'S', 'M', 'L', 'XL', 'XXL', 'XXXL']:
-                                is_valid_size = True
-                            elif size_label.isdigit() and 28 <= int(size_label) <= 50:
-                                is_valid_size = True
-                            elif len(size_label) <= 3:  # Kısa text'ler
-                                try:
-                                    int(size_label)
-                                    if 28 <= int(size_label) <= 50:
-                                        is_valid_size = True
-                                except:
-                                    pass
-                            
-                            if is_valid_size:
-                                # Tekrar edenleri filtrele
-                                if size_label not in seen_size_labels:
-                                    seen_size_labels.add(size_label)
-                                    size_elements.append(button)
-                                    print(f"[DEBUG] Oysho beden bulundu: '{size_label}' (button data-testid: {button.get_attribute('data-testid')})")
-                        except Exception as inner_e:
-                            print(f"[DEBUG] Oysho button işlenirken hata: {inner_e}")
-                            continue
-                    
-                    if size_elements:
-                        print(f"[DEBUG] Oysho {len(size_elements)} benzersiz size element bulundu (selector: {sel})")
-                        break
-            except Exception as e:
-                print(f"[DEBUG] Oysho selector '{sel}' hatası: {e}")
+        for snap_group in snapshot:
+            sel = snap_group.get("selector")
+            found = snap_group.get("items") or []
+            print(f"[DEBUG] Oysho selector '{sel}' ile {len(found)} element bulundu")
+            if not found:
                 continue
+            for entry in found:
+                # Beden text'i - analiz sonuçlarına göre span içinde (yoksa button text)
+                size_label = (entry.get("label") or "").replace("\xa0", " ").strip().upper()
+                if not size_label:
+                    continue
+                
+                # Beden formatı kontrolü
+                is_valid_size = (size_label in ['XXS', 'XS', 'S', 'M', 'L', 'XL', 'XXL', 'XXXL']
+                                 or (size_label.isdigit() and 28 <= int(size_label) <= 50))
+                
+                if is_valid_size:
+                    # Tekrar edenleri filtrele
+                    if size_label not in seen_size_labels:
+                        seen_size_labels.add(size_label)
+                        entry["size"] = size_label
+                        size_elements.append(entry)
+                        print(f"[DEBUG] Oysho beden bulundu: '{size_label}' (button data-testid: {entry.get('testid')})")
+            
+            if size_elements:
+                print(f"[DEBUG] Oysho {len(size_elements)} benzersiz size element bulundu (selector: {sel})")
+                break
         
         if not size_elements:
             print("[DEBUG] Oysho size element bulunamadı")
@@ -1521,106 +1357,80 @@ def check_stock_oysho(driver, sizes_to_check):
         wanted = set(x.strip().upper() for x in (sizes_to_check or []))
         in_stock = []
         
-        for button in size_elements:
-            try:
-                # Beden text'ini tekrar al
-                try:
-                    size_span = button.find_element(By.CSS_SELECTOR, "span")
-                    size_label = size_span.text.strip().upper()
-                except:
-                    size_label = button.text.strip().upper()
+        for entry in size_elements:
+            size_label = entry["size"]
+            
+            # İstenen beden kontrolü
+            if not wanted or size_label in wanted:
+                print(f"[DEBUG] Oysho beden '{size_label}' istenenler arasında, stok kontrol ediliyor...")
                 
-                if not size_label:
-                    continue
+                # Oysho stok kontrolü - Analiz sonuçlarına göre:
+                # 1. disabled attribute varsa → stok YOK
+                # 2. aria-disabled="true" varsa → stok YOK
+                # 3. Button içinde "benzer ürünler" veya stok yok göstergesi varsa → stok YOK
+                # 4. Button görünür mü kontrol et (stok varsa görünür olmalı)
                 
-                # İstenen beden kontrolü
-                if not wanted or size_label in wanted:
-                    print(f"[DEBUG] Oysho beden '{size_label}' istenenler arasında, stok kontrol ediliyor...")
-                    
-                    # Oysho stok kontrolü - Analiz sonuçlarına göre:
-                    # 1. disabled attribute varsa → stok YOK
-                    # 2. aria-disabled="true" varsa → stok YOK
-                    # 3. Button içinde "benzer ürünler" veya stok yok göstergesi varsa → stok YOK
-                    # 4. Button'a tıklanabilir mi kontrol et (stok varsa tıklanabilir olmalı)
-                    
-                    is_disabled = button.get_attribute("disabled") is not None
-                    aria_disabled = button.get_attribute("aria-disabled") == "true"
-                    button_html = (button.get_attribute("outerHTML") or "").lower()
-                    button_class = (button.get_attribute("class") or "").lower()
-                    
-                    # Button içinde "benzer ürünler", "stok yok", "out of stock" gibi ifadeleri kontrol et
-                    has_similar_products = False
-                    try:
-                        # Button içindeki tüm text'i kontrol et
-                        button_text = button.text.lower()
-                        similar_phrases = ["benzer ürünler", "benzer ürün", "stok yok", "out of stock", "unavailable", "not available"]
-                        for phrase in similar_phrases:
-                            if phrase in button_text:
-                                has_similar_products = True
-                                print(f"[DEBUG] Oysho beden '{size_label}' - '{phrase}' text'i bulundu")
-                                break
-                    except:
-                        pass
-                    
-                    # Button HTML'inde stok yok göstergeleri kontrol et
-                    has_out_of_stock_indicator = False
-                    out_of_stock_indicators = [
-                        "out-of-stock", "outofstock", "unavailable", "not-available",
-                        "no-stock", "stock-none", "disabled", "not-allowed"
-                    ]
-                    for indicator in out_of_stock_indicators:
-                        if indicator in button_html or indicator in button_class:
-                            has_out_of_stock_indicator = True
-                            print(f"[DEBUG] Oysho beden '{size_label}' - '{indicator}' indicator bulundu")
-                            break
-                    
-                    # Button'ın parent li elementinde de kontrol et
-                    try:
-                        parent_li = button.find_element(By.XPATH, "./ancestor::li[1]")
-                        parent_class = (parent_li.get_attribute("class") or "").lower()
-                        parent_html = (parent_li.get_attribute("outerHTML") or "").lower()
-                        
-                        for indicator in out_of_stock_indicators:
-                            if indicator in parent_class or indicator in parent_html:
-                                has_out_of_stock_indicator = True
-                                print(f"[DEBUG] Oysho beden '{size_label}' - parent li'de '{indicator}' bulundu")
-                                break
-                    except:
-                        pass
-                    
-                    # Tüm kontrolleri özetle
-                    print(f"[DEBUG] Oysho beden '{size_label}' - disabled={is_disabled}, aria-disabled={aria_disabled}, similar_products={has_similar_products}, out_of_stock={has_out_of_stock_indicator}")
-                    print(f"[DEBUG] Oysho beden '{size_label}' - button class: {button_class[:100]}")
-                    
-                    if is_disabled:
-                        print(f"[DEBUG] ❌ Oysho beden '{size_label}' stokta değil (disabled attribute)")
-                        continue
-                    elif aria_disabled:
-                        print(f"[DEBUG] ❌ Oysho beden '{size_label}' stokta değil (aria-disabled='true')")
-                        continue
-                    elif has_similar_products:
-                        print(f"[DEBUG] ❌ Oysho beden '{size_label}' stokta değil ('benzer ürünler' text'i bulundu)")
-                        continue
-                    elif has_out_of_stock_indicator:
-                        print(f"[DEBUG] ❌ Oysho beden '{size_label}' stokta değil (out-of-stock indicator bulundu)")
-                        continue
-                    else:
-                        # Son kontrol: Button tıklanabilir mi? (EC.element_to_be_clickable test etmeden, sadece görünür ve enabled mı kontrol et)
-                        try:
-                            if not button.is_displayed():
-                                print(f"[DEBUG] ❌ Oysho beden '{size_label}' stokta değil (button görünmüyor)")
-                                continue
-                        except:
-                            pass
-                        
-                        print(f"[DEBUG] ✅ Oysho beden '{size_label}' stokta!")
-                        in_stock.append(size_label)
+                is_disabled = bool(entry.get("disabled_attr"))
+                aria_disabled = bool(entry.get("aria_disabled"))
+                button_html = entry.get("html") or ""
+                button_class = entry.get("cls") or ""
+                
+                # Button içinde "benzer ürünler", "stok yok", "out of stock" gibi ifadeleri kontrol et
+                has_similar_products = False
+                button_text = (entry.get("text") or "").lower()
+                similar_phrases = ["benzer ürünler", "benzer ürün", "stok yok", "out of stock", "unavailable", "not available"]
+                for phrase in similar_phrases:
+                    if phrase in button_text:
+                        has_similar_products = True
+                        print(f"[DEBUG] Oysho beden '{size_label}' - '{phrase}' text'i bulundu")
+                        break
+                
+                # Button HTML'inde stok yok göstergeleri kontrol et
+                has_out_of_stock_indicator = False
+                out_of_stock_indicators = [
+                    "out-of-stock", "outofstock", "unavailable", "not-available",
+                    "no-stock", "stock-none", "disabled", "not-allowed"
+                ]
+                for indicator in out_of_stock_indicators:
+                    if indicator in button_html or indicator in button_class:
+                        has_out_of_stock_indicator = True
+                        print(f"[DEBUG] Oysho beden '{size_label}' - '{indicator}' indicator bulundu")
+                        break
+                
+                # Button'ın parent li elementinde de kontrol et
+                parent_class = entry.get("li_cls") or ""
+                parent_html = entry.get("li_html") or ""
+                for indicator in out_of_stock_indicators:
+                    if indicator in parent_class or indicator in parent_html:
+                        has_out_of_stock_indicator = True
+                        print(f"[DEBUG] Oysho beden '{size_label}' - parent li'de '{indicator}' bulundu")
+                        break
+                
+                # Tüm kontrolleri özetle
+                print(f"[DEBUG] Oysho beden '{size_label}' - disabled={is_disabled}, aria-disabled={aria_disabled}, similar_products={has_similar_products}, out_of_stock={has_out_of_stock_indicator}")
+                print(f"[DEBUG] Oysho beden '{size_label}' - button class: {button_class[:100]}")
+                
+                if is_disabled:
+                    print(f"[DEBUG] ❌ Oysho beden '{size_label}' stokta değil (disabled attribute)")
+                    continue
+                elif aria_disabled:
+                    print(f"[DEBUG] ❌ Oysho beden '{size_label}' stokta değil (aria-disabled='true')")
+                    continue
+                elif has_similar_products:
+                    print(f"[DEBUG] ❌ Oysho beden '{size_label}' stokta değil ('benzer ürünler' text'i bulundu)")
+                    continue
+                elif has_out_of_stock_indicator:
+                    print(f"[DEBUG] ❌ Oysho beden '{size_label}' stokta değil (out-of-stock indicator bulundu)")
+                    continue
+                elif not entry.get("displayed", True):
+                    # Son kontrol: Button görünür mü?
+                    print(f"[DEBUG] ❌ Oysho beden '{size_label}' stokta değil (button görünmüyor)")
+                    continue
                 else:
-                    print(f"[DEBUG] Oysho beden '{size_label}' istenenler arasında değil (wanted: {list(wanted)})")
-                        
-            except Exception as e:
-                print(f"[DEBUG] Oysho button işlenirken hata: {e}")
-                continue
+                    print(f"[DEBUG] ✅ Oysho beden '{size_label}' stokta!")
+                    in_stock.append(size_label)
+            else:
+                print(f"[DEBUG] Oysho beden '{size_label}' istenenler arasında değil (wanted: {list(wanted)})")
         
         if in_stock:
             print(f"[DEBUG] ✅ Oysho toplam {len(in_stock)} beden stokta: {in_stock}")
@@ -1642,64 +1452,34 @@ def check_stock_hm_requests(product_code, sizes_to_check, cookie_string, referer
     product_code: '1298486'
     sizes_to_check: ['S','M']
     cookie_string: browser'dan alınan cookie stringi
-    return: stokta bulunan bedenler, ör: ['S']
+    return: stokta bulunan bedenler, ör: ['S'];
+            istek başarısız (HTTP hatası / parse edilemedi / boş availability) ise None → çerez yenilenmeli
     """
-    import requests
-    url = f'https://www2.hm.com/hmwebservices/service/product/tr/availability/{product_code}.json'
+    import httpHelpers
+    from httpCheckers import hm_availability_url, hm_availability_headers, parse_hm_availability_text, hm_sizes_from_availability
+    url = hm_availability_url(product_code)
     # Gelişmiş header seti - daha gerçekçi browser fingerprinting
-    headers = {
-        'Cookie': cookie_string,
-        'User-Agent': (
-            'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 '
-            '(KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36'
-        ),
-        'Accept': 'application/json, text/plain, */*',
-        'Accept-Language': 'tr-TR,tr;q=0.9,en-US;q=0.8,en;q=0.7',
-        'Accept-Encoding': 'gzip, deflate, br',
-        'Connection': 'keep-alive',
-        'Cache-Control': 'no-cache',
-        'Pragma': 'no-cache',
-        'Sec-Fetch-Site': 'same-origin',
-        'Sec-Fetch-Mode': 'cors',
-        'Sec-Fetch-Dest': 'empty',
-        'Sec-Ch-Ua': '"Google Chrome";v="131", "Chromium";v="131", "Not_A Brand";v="24"',
-        'Sec-Ch-Ua-Mobile': '?0',
-        'Sec-Ch-Ua-Platform': '"Linux"',
-        'Origin': 'https://www2.hm.com',
-    }
-    if referer_url:
-        headers['Referer'] = referer_url
-    else:
-        # Referer yoksa default H&M product page
-        headers['Referer'] = f'https://www2.hm.com/tr_tr/productpage.{product_code}.html'
+    headers = hm_availability_headers(product_code, cookie_string, referer_url)
     try:
-        resp = requests.get(url, headers=headers, timeout=10)
-        if resp.status_code != 200:
+        # Koşullu istek: 304 / aynı gövdede önceki parse sonucu kullanılır
+        resp, data = httpHelpers.get_cached(url, parse_hm_availability_text, headers=headers, label="H&M availability")
+        if resp.status_code not in (200, 304):
             body_preview = resp.text[:200] if isinstance(resp.text, str) else str(resp.content[:200])
             print(f"[DEBUG] H&M requests HTTP {resp.status_code} body[:200]={body_preview}")
-            return []
+            return None
         # Bazı servisler JSON ön eki ekleyebilir, güvenli parse
-        text = resp.text.lstrip("\ufeff ")
-        if text.startswith(")]}',"):
-            text = text[5:]
-        try:
-            data = resp.json()
-    except Exception:
-            import json as _json
-            data = _json.loads(text)
-        available_sizes = []
-        wanted = set(x.upper() for x in (sizes_to_check or []))
-        for size_info in (data.get('availability', []) or []):
-            size_code = size_info.get('sizeName') or size_info.get('size') or ''
-            size_code_up = str(size_code).upper().replace('BEDEN','').strip()
-            in_stock = bool(size_info.get('available', False))
-            if in_stock and (not wanted or size_code_up in wanted):
-                available_sizes.append(size_code_up)
+        if data is None:
+            print(f"[DEBUG] H&M requests JSON parse edilemedi body[:200]={resp.text[:200]}")
+            return None
+        if not data.get('availability'):
+            print(f"[DEBUG] H&M requests boş availability ({product_code})")
+            return None
+        available_sizes = hm_sizes_from_availability(data, sizes_to_check)
         print(f'[DEBUG] H&M requests fallback stoklar: {available_sizes}')
         return available_sizes
     except Exception as e:
         print(f'[DEBUG] H&M requests fallback hata: {e}')
-        return []
+        return None
 
 
 # ------------------------------------------------------------
@@ -1723,12 +1503,6 @@ def check_stock_roborock(driver, sizes_to_check=None):
     try:
         wait = WebDriverWait(driver, 20)
         
-        # Cookie/overlay kapatma (opsiyonel)
-        try:
-            time.sleep(1)  # Sayfa yüklenmesi için kısa bekleme
-        except Exception:
-            pass
-        
         # Sepete Ekle butonunu bul
         try:
             button = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "button.as-add2cart, button[class*='as-add2cart']")))
@@ -1763,4 +1537,41 @@ def check_stock_roborock(driver, sizes_to_check=None):
         
     except Exception as e:
         print(f"[DEBUG] Roborock hata: {e}")
-        return []
\ No newline at end of file
+        return []
+
+# Shopify ürün JSON'u sayfanın kendi origin'inden (tarayıcı çerezleriyle) okunur
+_SHOPIFY_PRODUCT_JS = """
+const path = arguments[0], done = arguments[arguments.length - 1];
+fetch(path, {credentials: 'same-origin', headers: {'Accept': 'application/json'}})
+  .then(r => r.ok ? r.text() : null)
+  .then(t => done(t), () => done(null));
+"""
+
+
+def check_stock_roborock_variants(driver, sizes_to_check, limiter=None):
+    """
+    Roborock varyant watch'ları için tarayıcı yolu (HTTP checker başarısız olduğunda).
+    Girdi  : driver (ürün sayfası açık), sizes_to_check (varyant başlığı / option / ID listesi)
+    Çıktı  : stokta olan varyantlar (config'te yazıldığı haliyle); yoksa []
+    Hata   : None (ürün JSON'u alınamadı → varyant çözülemedi, çağıran bildirim yapmamalı)
+    Not    : Buton kontrolü sadece sayfada seçili varyantı gösterir; bu yüzden varyant listesinde
+             /products/<handle>.js sayfanın origin'inden okunur ve HTTP checker'la aynı eşleşme uygulanır.
+             limiter verilirse bu ek istek için "roborock" jetonu harcanır.
+    """
+    from httpCheckers import shopify_product_js_url, shopify_variants_in_stock
+    try:
+        url = driver.current_url
+        js_url = shopify_product_js_url(url)
+        if not js_url:
+            print(f"[DEBUG] Roborock varyant: /products/ URL'i değil: {url}")
+            return None
+        if limiter is not None:
+            limiter.wait_token("roborock")
+        text = driver.execute_async_script(_SHOPIFY_PRODUCT_JS, urlsplit(js_url).path)
+        if not text:
+            print("[DEBUG] Roborock varyant: ürün JSON'u alınamadı")
+            return None
+        return shopify_variants_in_stock(json.loads(text), url, sizes_to_check)
+    except Exception as e:
+        print(f"[DEBUG] Roborock varyant hata: {e}")
+        return None
@@ -0,0 +1,152 @@
+# ============================
+# storeLimiter.py — mağaza başına hız sınırı (token bucket) + eşzamanlılık tavanı
+# - Her mağazanın kendi kovası: saniyede "rate" jeton, en fazla "burst" birikir
+# - "max_in_flight": aynı anda o mağazaya açık en fazla kontrol/istek sayısı
+# - Tarayıcı (sayfa yükleme) ve HTTP yolları aynı kovadan harcar; bir mağazanın
+#   sınırı diğer mağazaları yavaşlatmaz
+# - Ayarlar config["stores"][store]["rate_limit"] (default ile birleştirilir)
+# - reserve(): bloklamadan jeton ayırır, beklenecek süreyi döner (asyncio yolları için)
+# ============================
+
+import time
+import logging
+import threading
+from contextlib import contextmanager
+
+log = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "rate": 0.5,          # jeton/sn (0 = sınırsız)
+    "burst": 1,           # kovada biriken en fazla jeton
+    "max_in_flight": 2,   # mağaza başına eşzamanlı kontrol (0 = sınırsız)
+}
+
+
+def store_key(store: str | None) -> str:
+    return "hm" if store == "h&m" else (store or "")
+
+
+class _Bucket:
+    def __init__(self, settings: dict):
+        self.rate = float(settings["rate"])
+        self.burst = max(1.0, float(settings["burst"]))
+        self.max_in_flight = int(settings["max_in_flight"])
+        self.tokens = self.burst
+        self.stamp = time.monotonic()
+        self.in_flight = 0
+        self.waited = 0.0   # özet için: jeton/slot beklemesi toplamı (sn)
+        self.count = 0
+
+    def refill(self, now: float) -> None:
+        if self.rate > 0:
+            self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+
+    def has_slot(self) -> bool:
+        return self.max_in_flight <= 0 or self.in_flight < self.max_in_flight
+
+
+class StoreLimiter:
+    """
+    store → kova. acquire()/release() ya da slot() context manager'ı ile kullanılır.
+    settings_for(store) -> {"rate", "burst", "max_in_flight"} (eksik alanlar DEFAULTS'tan).
+    """
+
+    def __init__(self, settings_for=None):
+        self.settings_for = settings_for
+        self._buckets: dict[str, _Bucket] = {}
+        self._cond = threading.Condition()
+
+    def _bucket(self, store: str | None) -> _Bucket:
+        key = store_key(store)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            settings = dict(DEFAULTS, **((self.settings_for(store) if self.settings_for else None) or {}))
+            bucket = self._buckets[key] = _Bucket(settings)
+            log.info("[LIMIT] store=%s rate=%s/s burst=%s max_in_flight=%s",
+                     key or "-", bucket.rate, int(bucket.burst), bucket.max_in_flight)
+        return bucket
+
+    def settings(self, store: str | None) -> dict:
+        with self._cond:
+            bucket = self._bucket(store)
+            return {"rate": bucket.rate, "burst": bucket.burst, "max_in_flight": bucket.max_in_flight}
+
+    # --- jeton ---
+    def reserve(self, store: str | None) -> float:
+        """Bir jeton ayırır (kova eksiye düşebilir); jetonun geleceği ana kadar beklenecek süre (sn)."""
+        with self._cond:
+            bucket = self._bucket(store)
+            if bucket.rate <= 0:
+                return 0.0
+            bucket.refill(time.monotonic())
+            bucket.tokens -= 1
+            delay = -bucket.tokens / bucket.rate if bucket.tokens < 0 else 0.0
+            bucket.waited += delay
+            bucket.count += 1
+            return delay
+
+    def wait_token(self, store: str | None) -> float:
+        delay = self.reserve(store)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    # --- eşzamanlılık ---
+    def try_enter(self, store: str | None) -> bool:
+        """Boş slot varsa alır (bloklamaz)."""
+        with self._cond:
+            bucket = self._bucket(store)
+            if not bucket.has_slot():
+                return False
+            bucket.in_flight += 1
+            return True
+
+    def enter(self, store: str | None) -> float:
+        """Slot boşalana kadar bekler; beklenen süre döner."""
+        started = time.monotonic()
+        with self._cond:
+            bucket = self._bucket(store)
+            while not bucket.has_slot():
+                self._cond.wait()
+            bucket.in_flight += 1
+            waited = time.monotonic() - started
+            bucket.waited += waited
+            return waited
+
+    def release(self, store: str | None) -> None:
+        with self._cond:
+            bucket = self._bucket(store)
+            bucket.in_flight = max(0, bucket.in_flight - 1)
+            self._cond.notify_all()
+
+    def acquire(self, store: str | None) -> float:
+        """Slot + jeton; toplam bekleme (sn). Sonrasında release() çağrılmalı."""
+        waited = self.enter(store)
+        try:
+            return waited + self.wait_token(store)
+        except BaseException:
+            self.release(store)
+            raise
+
+    @contextmanager
+    def slot(self, store: str | None):
+        waited = self.acquire(store)
+        if waited >= 0.05:
+            log.info("[LIMIT] store=%s %.2fs beklendi", store_key(store) or "-", waited)
+        try:
+            yield
+        finally:
+            self.release(store)
+
+    def stats_summary(self, reset: bool = True) -> dict[str, str]:
+        """Mağaza başına 'n=… wait=…s' (döngü sonu logu)."""
+        with self._cond:
+            out = {
+                key or "-": f"n={b.count} wait={b.waited:.1f}s"
+                for key, b in sorted(self._buckets.items()) if b.count
+            }
+            if reset:
+                for b in self._buckets.values():
+                    b.count, b.waited = 0, 0.0
+        return out
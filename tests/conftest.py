@@ -0,0 +1,102 @@
+# ============================
+# conftest.py — ortak test fixture'ları
+# - Modüller repo kökünden import edilir (paket kurulumu yok)
+# - fixture_server: HTTP checker'ları için yerel JSON sunucusu (gerçek mağazaya istek atılmaz)
+# - fake_clock: limiter/breaker/takvim testleri için elle ilerletilen monotonic saat
+# ============================
+
+import os
+import sys
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FixtureServer:
+    """
+    path → (status, gövde, header'lar). Gövde dict/list ise JSON olarak yazılır.
+    Gelen istekler (path, header'lar) requests listesinde tutulur.
+    """
+
+    def __init__(self):
+        self.routes: dict[str, tuple] = {}
+        self.requests: list[tuple[str, dict]] = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = urlsplit(self.path).path
+                server.requests.append((path, dict(self.headers)))
+                status, body, headers = server.routes.get(path, (404, "not found", {}))
+                if isinstance(body, (dict, list)):
+                    body = json.dumps(body)
+                    headers = dict({"Content-Type": "application/json"}, **headers)
+                if status == 304 and headers.get("ETag") and self.headers.get("If-None-Match") != headers["ETag"]:
+                    status = 200
+                data = body.encode("utf-8") if status != 304 else b""
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self._httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    def route(self, path: str, body, status: int = 200, headers: dict | None = None) -> None:
+        self.routes[path] = (status, body, headers or {})
+
+    def hits(self, path: str) -> list[dict]:
+        return [headers for p, headers in self.requests if p == path]
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+@pytest.fixture(scope="session")
+def _fixture_server_session():
+    server = FixtureServer().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def fixture_server(_fixture_server_session):
+    """Oturum boyunca tek sunucu; route ve istek kayıtları her testte sıfırlanır."""
+    _fixture_server_session.routes.clear()
+    _fixture_server_session.requests.clear()
+    return _fixture_server_session
+
+
+@pytest.fixture
+def fake_clock(monkeypatch):
+    """time.monotonic yerine elle ilerletilen saat (clock.now += sn); time.sleep saati ilerletir."""
+
+    class Clock:
+        now = 1000.0
+
+        def monotonic(self):
+            return self.now
+
+        def sleep(self, seconds):
+            self.now += seconds
+
+    clock = Clock()
+    monkeypatch.setattr("time.monotonic", clock.monotonic)
+    monkeypatch.setattr("time.sleep", clock.sleep)
+    return clock
@@ -0,0 +1,104 @@
+from circuitBreaker import CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+
+
+def make(**settings):
+    return CircuitBreaker(lambda store: settings)
+
+
+def items(*stores):
+    return [{"store": s, "url": f"https://{s}/{i}"} for i, s in enumerate(stores)]
+
+
+def test_opens_after_threshold(fake_clock):
+    breaker = make(threshold=2, cooldown=60)
+    breaker.record_block("zara", "403")
+    assert breaker.state("zara") == CLOSED
+    assert breaker.suspect("zara")
+    breaker.record_block("zara", "403")
+    assert breaker.state("zara") == OPEN
+    assert breaker.remaining("zara") == 60
+
+
+def test_success_resets_strikes(fake_clock):
+    breaker = make(threshold=2)
+    breaker.record_block("zara", "403")
+    breaker.record_success("zara")
+    breaker.record_block("zara", "403")
+    assert breaker.state("zara") == CLOSED
+
+
+def test_admit_skips_open_and_probes_half_open_once(fake_clock):
+    breaker = make(threshold=1, cooldown=60)
+    breaker.record_block("zara", "403")
+    admitted, skipped = breaker.admit(items("zara", "zara", "bershka"))
+    assert [i["store"] for i in admitted] == ["bershka"]
+    assert len(skipped) == 2
+    fake_clock.now += 61
+    assert breaker.state("zara") == HALF_OPEN
+    admitted, skipped = breaker.admit(items("zara", "zara", "bershka"))
+    assert [i["url"] for i in admitted] == ["https://zara/0", "https://bershka/2"]
+    assert len(skipped) == 1
+
+
+def test_failed_probe_reopens_with_longer_cooldown(fake_clock):
+    breaker = make(threshold=1, cooldown=60, growth=2, max_cooldown=100)
+    breaker.record_block("zara", "403")
+    fake_clock.now += 61
+    breaker.record_block("zara", "403")
+    assert breaker.state("zara") == OPEN
+    assert breaker.remaining("zara") == 100
+    fake_clock.now += 101
+    breaker.record_success("zara")
+    assert breaker.state("zara") == CLOSED
+    assert breaker.summary() == {}
+
+
+def test_late_success_does_not_close_open_breaker(fake_clock):
+    breaker = make(threshold=1, cooldown=60)
+    breaker.record_block("h&m", "bot sayfası")
+    breaker.record_success("hm")
+    assert breaker.is_open("h&m")
+    assert breaker.summary()["hm"].startswith("open strikes=1 trips=1")
+
+
+class FakePage:
+    def __init__(self, html_length):
+        self.html_length = html_length
+
+    def execute_script(self, script, *args):
+        return self.html_length
+
+
+def half_open_breaker(monkeypatch, fake_clock):
+    import main
+
+    breaker = make(threshold=1, cooldown=60)
+    monkeypatch.setattr(main, "breaker", breaker)
+    breaker.record_block("zara", "403")
+    fake_clock.now += 61
+    breaker.admit(items("zara"))
+    return main, breaker
+
+
+def test_half_open_probe_with_empty_result_on_real_page_closes(monkeypatch, fake_clock):
+    main, breaker = half_open_breaker(monkeypatch, fake_clock)
+    # Ürün stokta değil ([]), ama beden DOM'u göründü → gerçek sayfa
+    main.note_page_result(FakePage(50_000), "zara", found=False, blocked=False, ready=True)
+    assert breaker.state("zara") == CLOSED
+
+
+def test_half_open_probe_without_real_page_stays_half_open(monkeypatch, fake_clock):
+    main, breaker = half_open_breaker(monkeypatch, fake_clock)
+    main.note_page_result(FakePage(50_000), "zara", found=False, blocked=False, ready=False)
+    assert breaker.state("zara") == HALF_OPEN
+    # Selector tanımsız mağaza: kısa HTML nötr, normal HTML başarı
+    main.note_page_result(FakePage(300), "zara", found=False, blocked=False, ready=None)
+    assert breaker.state("zara") == HALF_OPEN
+    main.note_page_result(FakePage(50_000), "zara", found=False, blocked=False, ready=None)
+    assert breaker.state("zara") == CLOSED
+
+
+def test_half_open_probe_on_bot_page_reopens(monkeypatch, fake_clock):
+    main, breaker = half_open_breaker(monkeypatch, fake_clock)
+    main.note_page_result(FakePage(300), "zara", found=False, blocked=True, ready=False)
+    assert breaker.state("zara") == OPEN
@@ -0,0 +1,88 @@
+import pytest
+
+import httpCheckers
+import httpHelpers
+
+
+@pytest.fixture(autouse=True)
+def clean_caches():
+    httpHelpers.response_cache._entries.clear()
+    httpCheckers._inditex_ids.clear()
+    yield
+    httpHelpers.response_cache._entries.clear()
+    httpCheckers._inditex_ids.clear()
+
+
+BERSHKA_URL = "https://www.bershka.com/tr/kazak-c0p123456789.html?colorId=800"
+API = "/itxrest/2/catalog/store/45009561/40259547"
+
+
+def inditex_routes(server, stocks):
+    server.route(f"{API}/category/0/product/123456789/detail", {"detail": {"colors": [
+        {"id": "800", "sizes": [{"name": "S", "sku": 1}, {"name": "M", "sku": 2}, {"name": "L", "sku": 3}]},
+        {"id": "401", "sizes": [{"name": "S", "sku": 9}]},
+    ]}})
+    server.route(f"{API}/product/123456789/stock", {"stocks": [
+        {"stocks": [{"id": sku, "availability": a} for sku, a in stocks]},
+    ]})
+
+
+def test_inditex_maps_skus_of_selected_color(fixture_server):
+    inditex_routes(fixture_server, [(1, "out_of_stock"), (2, "in_stock"), (3, "low_on_stock"), (9, "in_stock")])
+    result = httpCheckers.check_stock_inditex_http(
+        "bershka", BERSHKA_URL, ["S", "M"], base_url=fixture_server.base_url,
+        overrides={"store_id": 45009561, "catalog_id": 40259547})
+    assert result == ["M"]
+    result = httpCheckers.check_stock_inditex_http(
+        "bershka", BERSHKA_URL, [], base_url=fixture_server.base_url,
+        overrides={"store_id": 45009561, "catalog_id": 40259547})
+    assert result == ["M", "L"]
+
+
+def test_inditex_reads_ids_from_product_page_once_per_country(fixture_server, monkeypatch):
+    inditex_routes(fixture_server, [(2, "in_stock")])
+    pages = []
+
+    def fake_get_text(url, label="HTTP"):
+        pages.append(url)
+        return '<script>fetch("/itxrest/2/catalog/store/45009561/40259547/product")</script>'
+
+    monkeypatch.setattr(httpCheckers, "_get_text", fake_get_text)
+    for _ in range(2):
+        assert httpCheckers.check_stock_inditex_http(
+            "bershka", BERSHKA_URL, ["M"], base_url=fixture_server.base_url) == ["M"]
+    assert len(pages) == 1
+    # Başka ülke mağazası ayrı önbellek anahtarı kullanır
+    httpCheckers.check_stock_inditex_http(
+        "bershka", BERSHKA_URL.replace("/tr/", "/es/"), ["M"], base_url=fixture_server.base_url)
+    assert len(pages) == 2
+
+
+def test_inditex_ambiguous_color_or_empty_stock_is_none(fixture_server):
+    inditex_routes(fixture_server, [])
+    overrides = {"store_id": 45009561, "catalog_id": 40259547}
+    url = "https://www.bershka.com/tr/kazak-c0p123456789.html"
+    assert httpCheckers.check_stock_inditex_http(
+        "bershka", url, ["S"], base_url=fixture_server.base_url, overrides=overrides) is None
+    assert httpCheckers.check_stock_inditex_http(
+        "bershka", BERSHKA_URL, ["S"], base_url=fixture_server.base_url, overrides=overrides) is None
+
+
+def test_inditex_spends_a_token_per_request(fixture_server, monkeypatch):
+    inditex_routes(fixture_server, [(2, "in_stock")])
+    monkeypatch.setattr(httpCheckers, "_get_text",
+                        lambda url, label="HTTP": "/itxrest/2/catalog/store/45009561/40259547/")
+
+    class CountingLimiter:
+        tokens = []
+
+        def wait_token(self, store):
+            self.tokens.append(store)
+
+    limiter = CountingLimiter()
+    httpCheckers.check_stock_inditex_http("bershka", BERSHKA_URL, ["M"], base_url=fixture_server.base_url,
+                                          limiter=limiter)
+    assert limiter.tokens == ["bershka"] * 3   # ürün sayfası + detail + stock
+    httpCheckers.check_stock_inditex_http("bershka", BERSHKA_URL, ["M"], base_url=fixture_server.base_url,
+                                          limiter=limiter)
+    assert len(limiter.tokens) == 5            # id'ler önbellekte: detail + stock
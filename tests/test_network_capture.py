@@ -0,0 +1,103 @@
+import json
+import queue
+import base64
+
+import pytest
+
+from driverHelpers import NetworkCapture
+
+
+class FakeChrome:
+    """DevTools websocket'i yerine: gönderilen komutları kaydeder, olayları recv() kuyruğundan verir."""
+
+    def __init__(self, bodies=None):
+        self.inbox = queue.Queue()
+        self.sent = []
+        self.bodies = bodies or {}
+
+    def __call__(self, url, **kwargs):
+        return self
+
+    def send(self, text):
+        msg = json.loads(text)
+        self.sent.append(msg)
+        result = {}
+        if msg["method"] == "Target.attachToTarget":
+            result = {"sessionId": "S-" + msg["params"]["targetId"]}
+        elif msg["method"] == "Network.getResponseBody":
+            body = self.bodies.get(msg["params"]["requestId"])
+            if body is None:
+                self.inbox.put(json.dumps({"id": msg["id"], "error": {"message": "no body"}}))
+                return
+            result = {"body": base64.b64encode(body.encode()).decode(), "base64Encoded": True}
+        self.inbox.put(json.dumps({"id": msg["id"], "result": result}))
+
+    def recv(self):
+        return self.inbox.get(timeout=5)
+
+    def close(self):
+        self.inbox.put("")
+
+    def event(self, method, session, **params):
+        self.inbox.put(json.dumps({"method": method, "params": params, "sessionId": session},
+                                  separators=(",", ":")))
+
+    def methods(self):
+        return [m["method"] for m in self.sent]
+
+
+@pytest.fixture
+def chrome():
+    fake = FakeChrome({"r1": '{"availability": ["S"]}', "r3": '{"x": 1}'})
+    yield fake
+    fake.close()
+
+
+def response(chrome, rid, url, mime="application/json", session="S-T1"):
+    chrome.event("Network.responseReceived", session, requestId=rid, response={"url": url, "mimeType": mime})
+
+
+def test_captures_only_matching_json_bodies(chrome):
+    capture = NetworkCapture("ws://x", connect=chrome)
+    capture.configure("T1", [r"hm\.com/.*availability"])
+    assert chrome.methods() == ["Target.attachToTarget", "Network.enable"]
+    response(chrome, "r1", "https://www2.hm.com/x/availability/1.json")
+    response(chrome, "r2", "https://www2.hm.com/x/productpage.1.html", mime="text/html")
+    response(chrome, "r3", "https://cdn.example.com/other.json")
+    chrome.event("Network.requestWillBeSent", "S-T1", requestId="r4")
+    for rid in ("r1", "r2", "r3"):
+        chrome.event("Network.loadingFinished", "S-T1", requestId=rid)
+    assert capture.responses("T1", wait=2) == [
+        {"url": "https://www2.hm.com/x/availability/1.json", "body": '{"availability": ["S"]}'}]
+    assert chrome.methods().count("Network.getResponseBody") == 1
+
+
+def test_tab_without_patterns_disables_network_and_reset_clears(chrome):
+    capture = NetworkCapture("ws://x", connect=chrome)
+    capture.configure("T2", [])
+    assert chrome.sent == []    # pattern'siz mağaza için sekmeye hiç bağlanılmaz
+    capture.configure("T1", ["availability"])
+    response(chrome, "r1", "https://www2.hm.com/availability.json")
+    chrome.event("Network.loadingFinished", "S-T1", requestId="r1")
+    assert len(capture.responses("T1", wait=2)) == 1
+    capture.configure("T1", [])
+    assert chrome.methods()[-1] == "Network.disable"
+    assert capture.responses("T1") == []
+
+
+def test_unfinished_response_waits_at_most_wait(chrome):
+    capture = NetworkCapture("ws://x", connect=chrome)
+    capture.configure("T1", ["availability"])
+    response(chrome, "r1", "https://www2.hm.com/availability.json")
+    assert capture.responses("T1", wait=0.2) == []
+    chrome.event("Network.loadingFailed", "S-T1", requestId="r1")
+    assert capture.responses("T1", wait=2) == []
+
+
+def test_closed_connection_unblocks_callers(chrome):
+    capture = NetworkCapture("ws://x", connect=chrome)
+    capture.configure("T1", ["availability"])
+    response(chrome, "r1", "https://www2.hm.com/availability.json")
+    chrome.close()
+    assert capture.responses("T1", wait=2) == []
+    assert capture.closed
@@ -0,0 +1,56 @@
+import json
+
+from httpHelpers import ResponseCache
+
+
+def parse_counting(calls):
+    def parse(text):
+        calls.append(text)
+        return json.loads(text)
+    return parse
+
+
+def test_validators_and_304_reuse_parsed_value():
+    cache, calls = ResponseCache(4), []
+    key = cache.key("https://x/a", {"b": 2, "a": 1})
+    assert key == "https://x/a?a=1&b=2"
+    assert cache.validators(key) == {}
+    value = cache.resolve(key, 200, {"ETag": '"e1"', "Last-Modified": "Mon"}, '{"v": 1}', parse_counting(calls))
+    assert value == {"v": 1}
+    assert cache.validators(key) == {"If-None-Match": '"e1"', "If-Modified-Since": "Mon"}
+    assert cache.resolve(key, 304, {}, "", parse_counting(calls)) is value
+    assert len(calls) == 1
+
+
+def test_same_body_skips_parse_and_new_body_reparses():
+    cache, calls = ResponseCache(4), []
+    parse = parse_counting(calls)
+    first = cache.resolve("k", 200, {}, '{"v": 1}', parse)
+    assert cache.resolve("k", 200, {}, '{"v": 1}', parse) is first
+    assert cache.resolve("k", 200, {}, '{"v": 2}', parse) == {"v": 2}
+    assert len(calls) == 2
+    assert cache.stats_summary() == "304=0 same=1 parsed=2 entries=1"
+    assert cache.stats_summary() is None
+
+
+def test_errors_and_unparsable_bodies_are_not_cached():
+    cache = ResponseCache(4)
+    assert cache.resolve("k", 304, {}, "", json.loads) is None
+    assert cache.resolve("k", 500, {}, "{}", json.loads) is None
+    assert cache.resolve("k", 200, {}, "<html>", lambda text: None) is None
+    assert not cache.has("k")
+
+
+def test_lru_eviction():
+    cache = ResponseCache(2)
+    for key in ("a", "b"):
+        cache.resolve(key, 200, {}, "1", json.loads)
+    cache.resolve("a", 304, {}, "", json.loads)      # a en son kullanılan
+    cache.resolve("c", 200, {}, "1", json.loads)
+    assert cache.has("a") and cache.has("c") and not cache.has("b")
+
+
+def test_disabled_cache_still_parses():
+    cache = ResponseCache(0)
+    assert cache.resolve("k", 200, {}, "[1]", json.loads) == [1]
+    assert not cache.has("k")
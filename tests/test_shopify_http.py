@@ -0,0 +1,39 @@
+import pytest
+
+import httpCheckers
+import httpHelpers
+
+
+@pytest.fixture(autouse=True)
+def clean_cache():
+    httpHelpers.response_cache._entries.clear()
+    yield
+    httpHelpers.response_cache._entries.clear()
+
+
+ROBOROCK_URL = "https://tr.roborock.com/products/roborock-s8?variant=222"
+SHOPIFY_PRODUCT = {"available": True, "variants": [
+    {"id": 111, "title": "Black", "option1": "Black", "available": True},
+    {"id": 222, "title": "White", "option1": "White", "available": False},
+]}
+
+
+def test_shopify_without_sizes_checks_url_variant(fixture_server):
+    fixture_server.route("/products/roborock-s8.js", SHOPIFY_PRODUCT)
+    assert httpCheckers.check_stock_shopify_http(ROBOROCK_URL, base_url=fixture_server.base_url) == []
+    url = "https://tr.roborock.com/products/roborock-s8"
+    assert httpCheckers.check_stock_shopify_http(url, base_url=fixture_server.base_url) == ["STOCK"]
+
+
+def test_shopify_matches_variant_title_option_or_id(fixture_server):
+    fixture_server.route("/products/roborock-s8.js", SHOPIFY_PRODUCT)
+    result = httpCheckers.check_stock_shopify_http(
+        ROBOROCK_URL, ["black", "White", "111"], base_url=fixture_server.base_url)
+    assert result == ["black", "111"]
+
+
+def test_shopify_non_product_url_or_missing_variants_is_none(fixture_server):
+    assert httpCheckers.check_stock_shopify_http("https://tr.roborock.com/pages/x",
+                                                 base_url=fixture_server.base_url) is None
+    fixture_server.route("/products/roborock-s8.js", {"available": True})
+    assert httpCheckers.check_stock_shopify_http(ROBOROCK_URL, base_url=fixture_server.base_url) is None
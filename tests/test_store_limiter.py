@@ -0,0 +1,59 @@
+import pytest
+
+from storeLimiter import StoreLimiter
+
+
+def make(settings):
+    return StoreLimiter(lambda store: settings.get(store))
+
+
+def test_reserve_spends_burst_then_spaces_by_rate(fake_clock):
+    limiter = make({"zara": {"rate": 2, "burst": 2}})
+    assert limiter.reserve("zara") == 0
+    assert limiter.reserve("zara") == 0
+    assert limiter.reserve("zara") == pytest.approx(0.5)
+    assert limiter.reserve("zara") == pytest.approx(1.0)
+    fake_clock.now += 10
+    assert limiter.reserve("zara") == 0
+
+
+def test_stores_have_separate_buckets(fake_clock):
+    limiter = make({"zara": {"rate": 1, "burst": 1}})
+    limiter.reserve("zara")
+    assert limiter.reserve("zara") > 0
+    assert limiter.reserve("bershka") == 0
+    # h&m ve hm aynı kova
+    limiter.reserve("h&m")
+    assert limiter.reserve("hm") > 0
+
+
+def test_zero_rate_is_unlimited(fake_clock):
+    limiter = make({"zara": {"rate": 0}})
+    assert all(limiter.reserve("zara") == 0 for _ in range(10))
+
+
+def test_in_flight_cap(fake_clock):
+    limiter = make({"zara": {"max_in_flight": 2}})
+    assert limiter.try_enter("zara")
+    assert limiter.try_enter("zara")
+    assert not limiter.try_enter("zara")
+    limiter.release("zara")
+    assert limiter.try_enter("zara")
+
+
+def test_slot_releases_on_error(fake_clock):
+    limiter = make({"zara": {"rate": 0, "max_in_flight": 1}})
+    with pytest.raises(RuntimeError):
+        with limiter.slot("zara"):
+            raise RuntimeError
+    assert limiter.try_enter("zara")
+
+
+def test_stats_summary_resets(fake_clock):
+    limiter = make({"zara": {"rate": 1, "burst": 1}})
+    limiter.acquire("zara")
+    limiter.release("zara")
+    limiter.acquire("zara")
+    limiter.release("zara")
+    assert limiter.stats_summary() == {"zara": "n=2 wait=1.0s"}
+    assert limiter.stats_summary() == {}
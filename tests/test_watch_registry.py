@@ -0,0 +1,52 @@
+from watchRegistry import build_registry, canonical_key, strip_tracking, watch_key
+
+
+def test_strip_tracking_drops_campaign_params_and_fragment():
+    url = "https://WWW.zara.com/tr/tr/x-p01234567.html?v1=5&utm_source=ig&gclid=1#top"
+    assert strip_tracking(url) == "https://www.zara.com/tr/tr/x-p01234567.html?v1=5"
+
+
+def test_canonical_keys_per_store():
+    assert canonical_key("zara", "https://www.zara.com/tr/tr/x-p01234567.html?v1=5&utm_medium=a") == \
+        "zara:www.zara.com/tr/tr/p01234567?v1=5"
+    assert canonical_key("h&m", "https://www2.hm.com/tr_tr/productpage.1234567001.html") == \
+        "hm:www2.hm.com/tr_tr/1234567001"
+    assert canonical_key("bershka", "https://www.bershka.com/tr/kazak-c0p123456789.html?colorId=800") == \
+        "bershka:www.bershka.com/tr/p123456789?color=800"
+    assert canonical_key("roborock", "https://tr.roborock.com/products/s8/?variant=2&ref=x") == \
+        "roborock:tr.roborock.com/products/s8?variant=2"
+    assert canonical_key("other", "https://example.com/a?b=1&fbclid=2") == "other:https://example.com/a?b=1"
+
+
+def test_watch_key_ignores_size_order_and_case():
+    assert watch_key("zara:x", ["m", "S", "M"]) == watch_key("zara:x", ["S", "M"]) == "zara:x#M,S"
+    assert watch_key("zara:x", []) == "zara:x#*"
+
+
+def test_build_registry_merges_same_product():
+    url = "https://www.zara.com/tr/tr/x-p01234567.html?v1=5"
+    fetches, watches = build_registry([
+        {"store": "zara", "url": url, "sizes": ["S"], "interval": 120},
+        {"store": "zara", "url": url + "&utm_source=ig", "sizes": ["M"], "interval": 60},
+        {"store": "zara", "url": url, "sizes": ["s"]},     # tekrar eden watch
+    ])
+    assert len(fetches) == 1 and len(watches) == 2
+    assert fetches[0]["sizes"] == ["S", "M"]
+    assert fetches[0]["interval"] == 60
+    assert [w["key"] for w in fetches[0]["watches"]] == [w["key"] for w in watches]
+
+
+def test_build_registry_any_size_and_roborock_split():
+    zara = "https://www.zara.com/tr/tr/x-p01234567.html?v1=5"
+    robo = "https://tr.roborock.com/products/s8"
+    fetches, watches = build_registry([
+        {"store": "zara", "url": zara, "sizes": ["S"]},
+        {"store": "zara", "url": zara},
+        {"store": "roborock", "url": robo},
+        {"store": "roborock", "url": robo, "sizes": ["Black"]},
+    ])
+    assert len(watches) == 4
+    by_key = {f["key"]: f for f in fetches}
+    assert by_key["zara:www.zara.com/tr/tr/p01234567?v1=5"]["sizes"] == []
+    assert by_key["roborock:tr.roborock.com/products/s8#*"]["sizes"] == []
+    assert by_key["roborock:tr.roborock.com/products/s8"]["sizes"] == ["Black"]
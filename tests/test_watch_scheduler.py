@@ -0,0 +1,78 @@
+import time
+
+import pytest
+
+from watchScheduler import WatchScheduler
+
+
+def make(factor=None, **settings):
+    settings = dict({"jitter": 0, "batch_window": 0, "min_interval": 10, "max_interval": 900}, **settings)
+    return WatchScheduler(60, 60, settings, factor=factor)
+
+
+def test_pop_due_in_order_and_batch_window():
+    sched = make(batch_window=5)
+    sched.add("b", {"url": "b"}, due=103)
+    sched.add("a", {"url": "a"}, due=100)
+    sched.add("c", {"url": "c"}, due=200)
+    assert sched.pop_due(now=99) == [{"url": "a"}, {"url": "b"}]
+    assert sched.seconds_until_next(now=99) == 101
+    assert len(sched) == 3
+
+
+def test_record_reschedules_and_old_entries_are_skipped():
+    sched = make()
+    sched.add("a", {"url": "a"}, due=0)
+    assert sched.pop_due(now=0) == [{"url": "a"}]
+    assert sched.record("a", changed=False, now=0) == 60
+    sched.defer("a", 0, now=0)           # min_interval'dan kısa erteleme olmaz
+    assert sched.pop_due(now=9) == []
+    assert sched.pop_due(now=10) == [{"url": "a"}]
+    assert sched.pop_due(now=100) == []
+
+
+def test_hot_and_dead_intervals():
+    sched = make(hot_factor=0.5, hot_window=3600, dead_after=2, growth=2)
+    sched.add("a", due=0)
+    assert sched.record("a", changed=True, now=0) == 30
+    assert sched.record("a", changed=False, now=4000) == 60
+    assert sched.record("a", changed=False, now=4100) == 60
+    assert sched.record("a", changed=False, now=4200) == 120
+    assert sched.record("a", changed=False, now=4300) == 240
+
+
+def test_per_watch_overrides():
+    sched = make()
+    sched.add("a", {"interval": 5000, "max_interval": 2000}, due=0)
+    assert sched.record("a", changed=False, now=0) == 2000
+
+
+@pytest.fixture
+def frozen_wall(fake_clock, monkeypatch):
+    """Duvar saati yerel 12:10:00'da sabit (sonraki saat başı 3000 sn sonra)."""
+    wall = time.mktime((2026, 3, 10, 12, 10, 0, 0, 0, -1))
+    monkeypatch.setattr("time.time", lambda: wall + (fake_clock.now - 1000.0))
+    return fake_clock
+
+
+def test_factor_scales_interval(frozen_wall):
+    sched = make(factor=lambda item, ts: 0.5, max_interval=10_000)
+    sched.add("a", due=0)
+    assert sched.record("a", changed=False, now=frozen_wall.now) == pytest.approx(30)
+
+
+def test_factor_window_pulls_due_to_hour_boundary(frozen_wall):
+    # restock geçmişi gibi saat bazlı çarpan: 12:00-13:00 sakin, sonraki saatler pencere
+    sched = make(factor=lambda item, ts: 2.0 if time.localtime(ts).tm_hour == 12 else 0.5,
+                 max_interval=20_000)
+    sched.add("a", {"interval": 4000}, due=0)
+    assert sched.record("a", changed=False, now=frozen_wall.now) == pytest.approx(3000)
+
+
+def test_factor_error_keeps_base_interval():
+    def broken(item, ts):
+        raise ValueError("boom")
+
+    sched = make(factor=broken)
+    sched.add("a", due=0)
+    assert sched.record("a", changed=False, now=0) == 60
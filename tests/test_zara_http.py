@@ -0,0 +1,54 @@
+import pytest
+
+import httpCheckers
+import httpHelpers
+
+
+@pytest.fixture(autouse=True)
+def clean_cache():
+    httpHelpers.response_cache._entries.clear()
+    yield
+    httpHelpers.response_cache._entries.clear()
+
+
+ZARA_URL = "https://www.zara.com/tr/tr/basic-tisort-p01234567.html?v1=400100200&utm_source=x"
+
+
+def zara_product(sizes, product_id=400100200):
+    return [{"id": 1, "detail": {"colors": [
+        {"productId": product_id, "sizes": [{"name": n, "availability": a} for n, a in sizes]},
+    ]}}]
+
+
+def test_zara_returns_wanted_sizes_in_stock(fixture_server):
+    fixture_server.route("/tr/tr/products-details", zara_product(
+        [("S", "in_stock"), ("M", "low_on_stock"), ("L", "out_of_stock"), ("XL", "in_stock")]))
+    result = httpCheckers.check_stock_zara_http(ZARA_URL, ["s", "M", "L"], base_url=fixture_server.base_url)
+    assert result == ["S", "M"]
+
+
+def test_zara_sends_product_id_and_uses_conditional_request(fixture_server):
+    fixture_server.route("/tr/tr/products-details", zara_product([("S", "in_stock")]),
+                         status=304, headers={"ETag": '"v1"'})
+    first = httpCheckers.check_stock_zara_http(ZARA_URL, ["S"], base_url=fixture_server.base_url)
+    second = httpCheckers.check_stock_zara_http(ZARA_URL, ["S"], base_url=fixture_server.base_url)
+    assert first == second == ["S"]
+    hits = fixture_server.hits("/tr/tr/products-details")
+    assert "If-None-Match" not in hits[0]
+    assert hits[1]["If-None-Match"] == '"v1"'
+
+
+def test_zara_unknown_color_or_bad_json_is_none(fixture_server):
+    fixture_server.route("/tr/tr/products-details", zara_product([("S", "in_stock")], product_id=999))
+    # Tek renk varsa v1 eşleşmese de o renk kullanılır
+    assert httpCheckers.check_stock_zara_http(ZARA_URL, ["S"], base_url=fixture_server.base_url) == ["S"]
+    fixture_server.route("/tr/tr/products-details", "<html>bot</html>")
+    assert httpCheckers.check_stock_zara_http(ZARA_URL, ["S"], base_url=fixture_server.base_url) is None
+    fixture_server.route("/tr/tr/products-details", {"error": 1}, status=404)
+    assert httpCheckers.check_stock_zara_http(ZARA_URL, ["S"], base_url=fixture_server.base_url) is None
+
+
+def test_zara_url_without_v1_is_none(fixture_server):
+    url = "https://www.zara.com/tr/tr/basic-tisort-p01234567.html"
+    assert httpCheckers.check_stock_zara_http(url, ["S"], base_url=fixture_server.base_url) is None
+    assert fixture_server.requests == []
@@ -0,0 +1,139 @@
+# ============================
+# watchRegistry.py — config["urls"] girdilerinden kanonik ürün kayıtları
+# - URL mağaza bazında kanonik anahtara indirgenir (ürün id + varyant; takip parametreleri atılır)
+# - Aynı kanonik ürün turda TEK kez kontrol edilir (fetch item); sonuç her watch'a dağıtılır
+# - Watch = (kanonik ürün, istenen bedenler); bildirim durumu (last_status/next_allowed) watch anahtarıyla tutulur
+# - Aynı ürün + aynı bedenlerle tekrar eden girdiler tek watch olur
+# ============================
+
+import re
+import logging
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from httpCheckers import zara_product_ref, inditex_product_ref
+
+log = logging.getLogger(__name__)
+
+# Ürünü değiştirmeyen kampanya / takip parametreleri
+TRACKING_PARAMS = {
+    "gclid", "gclsrc", "dclid", "fbclid", "msclkid", "igshid", "yclid", "ttclid",
+    "mc_cid", "mc_eid", "_ga", "_gl", "srsltid", "ref", "ref_src", "source",
+}
+TRACKING_PREFIXES = ("utm_",)
+
+_ZARA_PRODUCT_RE = re.compile(r"-p(\d{6,})\.html")
+_HM_PRODUCT_RE = re.compile(r"productpage\.(\d+)")
+INDITEX_STORES = ("bershka", "stradivarius", "oysho")
+SCHEDULE_OVERRIDES = ("interval", "min_interval", "max_interval")   # watchScheduler'a aktarılır
+
+
+def _is_tracking(name: str) -> bool:
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def strip_tracking(url: str) -> str:
+    """Takip parametrelerini ve fragment'i atar; kalan parametreler sıralanır."""
+    parts = urlsplit((url or "").strip())
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not _is_tracking(k))
+    return urlunsplit((parts.scheme, parts.netloc.lower(), parts.path, urlencode(query), ""))
+
+
+def _locale(path: str, segments: int) -> str:
+    return "/".join([p for p in (path or "").split("/") if p][:segments])
+
+
+def canonical_key(store: str | None, url: str) -> str:
+    """
+    Mağaza bazında kanonik ürün anahtarı:
+      zara          → host/ülke/dil + ürün id + v1 (renk)
+      hm            → host/yerel + tam ürün kodu (renk dahil)
+      inditex       → host/ülke + ürün id + renk
+      roborock      → host + ürün handle'ı + variant parametresi
+      diğer/çözülemeyen → takip parametresiz URL
+    """
+    store = "hm" if store == "h&m" else (store or "")
+    clean = strip_tracking(url)
+    parts = urlsplit(clean)
+    host = parts.netloc
+    query = dict(parse_qsl(parts.query))
+    key = None
+    if store == "zara":
+        ref = zara_product_ref(clean)
+        m = _ZARA_PRODUCT_RE.search(parts.path or "")
+        if ref and m:
+            key = f"{host}{ref['locale']}/p{m.group(1)}" + (f"?v1={ref['v1']}" if ref.get("v1") else "")
+    elif store == "hm":
+        m = _HM_PRODUCT_RE.search(parts.path or "")
+        if m:
+            key = f"{host}/{_locale(parts.path, 1)}/{m.group(1)}"
+    elif store in INDITEX_STORES:
+        ref = inditex_product_ref(clean)
+        if ref:
+            key = f"{host}/{_locale(parts.path, 1)}/p{ref['product_id']}" + (
+                f"?color={ref['color_id']}" if ref.get("color_id") else "")
+    elif store == "roborock":
+        path = (parts.path or "").rstrip("/")
+        if "/products/" in path:
+            handle = path.split("/products/", 1)[1].split("/")[0]
+            key = f"{host}/products/{handle}" + (f"?variant={query['variant']}" if query.get("variant") else "")
+    return f"{store}:{key or clean}"
+
+
+def watch_key(canonical: str, sizes) -> str:
+    """Watch anahtarı: kanonik ürün + istenen bedenler (sırasız, büyük harf)."""
+    wanted = sorted({str(s).strip().upper() for s in (sizes or []) if str(s).strip()})
+    return f"{canonical}#{','.join(wanted) or '*'}"
+
+
+def _fetch_sizes(watches: list[dict]) -> list[str]:
+    """Kontrolde istenecek bedenler: birleşim; bir watch 'herhangi' istiyorsa boş liste."""
+    if any(not w.get("sizes") for w in watches):
+        return []
+    out = []
+    for w in watches:
+        for s in w.get("sizes") or []:
+            if s not in out:
+                out.append(s)
+    return out
+
+
+def build_registry(items: list[dict]) -> tuple[list[dict], list[dict]]:
+    """
+    config["urls"] → (fetch item'ları, watch'lar).
+    fetch item: {"url", "store", "sizes" (birleşim), "key", "canonical", "watches": [watch...]}
+    watch     : orijinal girdi + {"key": watch anahtarı, "canonical": kanonik anahtar}
+    """
+    fetches: dict[str, dict] = {}
+    watches: dict[str, dict] = {}
+    for item in items:
+        store = item.get("store")
+        canonical = canonical_key(store, item.get("url"))
+        # Roborock: varyant listesi verilmeyen kontrol 'STOCK' döndürür; varyantlı watch'larla aynı
+        # kontrolü paylaşamaz → ayrı fetch
+        fetch_key = canonical + ("#*" if store == "roborock" and not item.get("sizes") else "")
+        wkey = watch_key(canonical, item.get("sizes"))
+        if wkey in watches:
+            log.info("[REGISTRY] tekrar eden watch atlandı: %s", item.get("url"))
+            continue
+        watch = dict(item, key=wkey, canonical=canonical)
+        watches[wkey] = watch
+        fetch = fetches.get(fetch_key)
+        if fetch is None:
+            fetch = fetches[fetch_key] = {
+                "url": strip_tracking(item.get("url")),
+                "store": store,
+                "key": fetch_key,
+                "canonical": canonical,
+                "watches": [],
+            }
+        fetch["watches"].append(watch)
+    for fetch in fetches.values():
+        fetch["sizes"] = _fetch_sizes(fetch["watches"])
+        # Takvim override'ları: watch'lar arasında en sık kontrol isteyen geçerli
+        for name in SCHEDULE_OVERRIDES:
+            values = [w[name] for w in fetch["watches"] if w.get(name)]
+            if values:
+                fetch[name] = min(values)
+    log.info("[REGISTRY] %s girdi → %s watch, %s ürün kontrolü", len(items), len(watches), len(fetches))
+    return list(fetches.values()), list(watches.values())
@@ -0,0 +1,161 @@
+# ============================
+# watchScheduler.py — URL (watch) başına uyarlanabilir kontrol takvimi
+# - Her watch için bir sonraki kontrol zamanı; heapq ile en erken due olan önce
+# - Temel aralık: sleep_min/max_seconds arası (ya da watch'a özel "interval")
+# - Yakın zamanda stok durumu değişen watch'lar daha sık (hot_factor), uzun süredir
+#   değişmeyenler giderek seyrek (growth, max_interval'a kadar) kontrol edilir
+# - Opsiyonel çarpan (factor): ör. restock geçmişinden tahmin edilen saatlerde daha sık kontrol;
+#   aralık boyunca saat başları da yoklanır: biri tahmin penceresiyse due o saat başına çekilir
+#   (sakin saatteki uzun aralık pencereyi kaçırmasın)
+# - Watch bazlı override: config["urls"][i] içinde interval / min_interval / max_interval
+# ============================
+
+import time
+import heapq
+import random
+import logging
+
+log = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "min_interval": 10,     # sn; hiçbir watch bundan sık kontrol edilmez
+    "max_interval": 900,    # sn; ölü ürünler için üst sınır
+    "hot_factor": 0.5,      # son değişimden sonra aralık çarpanı
+    "hot_window": 3600,     # sn; bu süre içinde değişim olduysa watch "sıcak"
+    "dead_after": 20,       # art arda bu kadar değişmeyen kontrolden sonra aralık büyümeye başlar
+    "growth": 1.25,         # her ek değişmeyen kontrolde aralık çarpanı
+    "jitter": 0.1,          # ±%10 rastgelelik (istekler aynı ana yığılmasın)
+    "batch_window": 5,      # sn; bu kadar içinde due olan watch'lar aynı turda kontrol edilir
+}
+
+
+class WatchScheduler:
+    """
+    key → watch kaydı; heap (due zamanı, sıra, key) tutar.
+    pop_due() ile due olan watch'lar alınır, kontrol sonrası record() ile yeniden takvimlenir.
+    """
+
+    def __init__(self, base_min: float, base_max: float, settings: dict | None = None, factor=None):
+        self.base_min = float(base_min)
+        self.base_max = float(max(base_min, base_max))
+        self.settings = dict(DEFAULTS, **(settings or {}))
+        self.factor = factor    # factor(item, epoch) -> o andaki aralık çarpanı (1 = etkisiz, < 1 = pencere)
+        self._heap: list[tuple[float, int, str]] = []
+        self._watches: dict[str, dict] = {}
+        self._seq = 0
+
+    def add(self, key: str, item: dict | None = None, due: float | None = None) -> None:
+        """Watch ekler (aynı key ikinci kez eklenmez); varsayılan olarak hemen due."""
+        if key in self._watches:
+            return
+        item = item or {}
+        self._watches[key] = {
+            "item": item,
+            "interval": item.get("interval"),
+            "min_interval": float(item.get("min_interval", self.settings["min_interval"])),
+            "max_interval": float(item.get("max_interval", self.settings["max_interval"])),
+            "last_change": None,
+            "streak": 0,
+            "due": None,
+        }
+        self._push(key, time.monotonic() if due is None else due)
+
+    def _push(self, key: str, due: float) -> None:
+        # Eski heap kayıtları silinmez; pop sırasında watch["due"] ile eşleşmeyenler atlanır
+        self._watches[key]["due"] = due
+        self._seq += 1
+        heapq.heappush(self._heap, (due, self._seq, key))
+
+    def _base_interval(self, watch: dict) -> float:
+        if watch["interval"]:
+            return float(watch["interval"])
+        return random.uniform(self.base_min, self.base_max)
+
+    def interval_for(self, key: str, now: float | None = None) -> float:
+        """Watch'ın sıradaki aralığı (sn): temel × sıcak/ölü çarpanı, sınırlar içinde, jitter'lı."""
+        now = time.monotonic() if now is None else now
+        watch = self._watches[key]
+        s = self.settings
+        interval = self._base_interval(watch)
+        if watch["last_change"] is not None and now - watch["last_change"] <= s["hot_window"]:
+            interval *= s["hot_factor"]
+        elif watch["streak"] > s["dead_after"]:
+            interval *= s["growth"] ** (watch["streak"] - s["dead_after"])
+        interval *= 1 + random.uniform(-s["jitter"], s["jitter"])
+        if self.factor is not None:
+            try:
+                interval = self._apply_factor(watch, now, interval)
+            except Exception as e:
+                log.warning("[SCHED] aralık çarpanı hatası (%s): %s", key, e)
+        return max(watch["min_interval"], min(watch["max_interval"], interval))
+
+    def _apply_factor(self, watch: dict, now: float, interval: float) -> float:
+        """
+        Aralık şimdiki slotun çarpanıyla ölçeklenir; aradaki saat başlarından ilk tahmin penceresi
+        (çarpan < 1) due'dan önce başlıyorsa due o saat başına çekilir.
+        """
+        wall_now = time.time() + (now - time.monotonic())   # monotonic → epoch (histogram yerel saatle)
+        item = watch["item"]
+        interval *= self.factor(item, wall_now)
+        interval = max(watch["min_interval"], min(watch["max_interval"], interval))
+        t = time.localtime(wall_now)
+        boundary = wall_now - t.tm_min * 60 - t.tm_sec + 3600
+        while boundary < wall_now + interval:
+            if self.factor(item, boundary) < 1:
+                return boundary - wall_now
+            boundary += 3600
+        return interval
+
+    def record(self, key: str, changed: bool, now: float | None = None) -> float:
+        """Kontrol sonucu: stok durumu değiştiyse changed=True. Watch yeniden takvimlenir; aralık döner."""
+        now = time.monotonic() if now is None else now
+        watch = self._watches.get(key)
+        if watch is None:
+            return 0.0
+        if changed:
+            watch["last_change"] = now
+            watch["streak"] = 0
+        else:
+            watch["streak"] += 1
+        interval = self.interval_for(key, now)
+        if changed:
+            log.info("[SCHED] %s stok durumu değişti → aralık=%.0fs (sıcak)", key, interval)
+        elif watch["streak"] == self.settings["dead_after"] + 1:
+            log.info("[SCHED] %s %s kontroldür değişmiyor → aralık uzatılıyor (%.0fs)", key, watch["streak"], interval)
+        self._push(key, now + interval)
+        return interval
+
+    def defer(self, key: str, delay: float, now: float | None = None) -> None:
+        """Kontrol edilmeden atlanan watch'ı delay sn sonraya erteler (sayaçlar değişmez)."""
+        now = time.monotonic() if now is None else now
+        watch = self._watches.get(key)
+        if watch is not None:
+            self._push(key, now + max(float(delay), watch["min_interval"]))
+
+    def pop_due(self, now: float | None = None) -> list[dict]:
+        """Due olan (ve batch_window içinde due olacak) watch'ların item'ları, due sırasıyla."""
+        now = time.monotonic() if now is None else now
+        horizon = now + self.settings["batch_window"]
+        out = []
+        while self._heap and self._heap[0][0] <= horizon:
+            due, _, key = heapq.heappop(self._heap)
+            watch = self._watches.get(key)
+            if watch is None or watch["due"] != due:
+                continue
+            watch["due"] = None
+            out.append(watch["item"])
+        return out
+
+    def seconds_until_next(self, now: float | None = None) -> float:
+        """Sıradaki due zamanına kalan süre (boş takvimde max_interval)."""
+        now = time.monotonic() if now is None else now
+        while self._heap:
+            due, _, key = self._heap[0]
+            watch = self._watches.get(key)
+            if watch is not None and watch["due"] == due:
+                return max(0.0, due - now)
+            heapq.heappop(self._heap)
+        return float(self.settings["max_interval"])
+
+    def __len__(self) -> int:
+        return len(self._watches)